@@ -0,0 +1,127 @@
+"""Content-addressed blob stores for StateBackend file contents.
+
+With a blob store, `StateBackend` keeps only a reference in agent state: the
+SHA-256 digest of the content plus the file's size and timestamps. Checkpoints
+then no longer contain file contents, and a file that did not change is shared
+by every checkpoint and subagent state that refers to it.
+
+Blobs are immutable and never deleted; the same content is stored once.
+`InMemoryBlobStore` lives in the current process only, so threads that must
+survive a restart should use `StoreBlobStore` on a persistent `BaseStore`.
+"""
+
+import abc
+import hashlib
+import threading
+from collections.abc import Iterable
+from typing import Any
+
+from langgraph.store.base import BaseStore, GetOp, Item
+
+BLOB_ENCODING = "blob"
+"""`encoding` of compact FileData whose `content` is a blob digest."""
+
+
+def blob_digest(content: str) -> str:
+    """Return the hex SHA-256 digest identifying content."""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class BlobStore(abc.ABC):
+    """Immutable string blobs addressed by the digest of their content."""
+
+    @abc.abstractmethod
+    def put(self, content: str) -> str:
+        """Store content and return its digest."""
+
+    @abc.abstractmethod
+    def get_many(self, digests: Iterable[str]) -> list[str | None]:
+        """Return the content of each digest, or None if it is unknown."""
+
+    def get(self, digest: str) -> str | None:
+        """Return the content of digest, or None if it is unknown."""
+        return self.get_many([digest])[0]
+
+
+class InMemoryBlobStore(BlobStore):
+    """Blob store kept in a dictionary in the current process."""
+
+    def __init__(self) -> None:
+        """Create an empty blob store."""
+        self._blobs: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return the number of stored blobs."""
+        return len(self._blobs)
+
+    def put(self, content: str) -> str:
+        """Store content and return its digest."""
+        digest = blob_digest(content)
+        with self._lock:
+            self._blobs.setdefault(digest, content)
+        return digest
+
+    def get_many(self, digests: Iterable[str]) -> list[str | None]:
+        """Return the content of each digest, or None if it is unknown."""
+        return [self._blobs.get(digest) for digest in digests]
+
+
+class StoreBlobStore(BlobStore):
+    """Blob store backed by a namespace of a LangGraph `BaseStore`."""
+
+    def __init__(self, store: BaseStore, namespace: tuple[str, ...] = ("blobs",)) -> None:
+        """Create a blob store.
+
+        Args:
+            store: Store holding the blobs.
+            namespace: Namespace the blobs are stored under, keyed by digest.
+        """
+        self.store = store
+        self.namespace = namespace
+
+    def put(self, content: str) -> str:
+        """Store content and return its digest."""
+        digest = blob_digest(content)
+        self.store.put(self.namespace, digest, {"content": content}, index=False)
+        return digest
+
+    def get_many(self, digests: Iterable[str]) -> list[str | None]:
+        """Return the content of each digest, or None if it is unknown.
+
+        All digests are fetched with a single `store.batch` call.
+        """
+        items = self.store.batch([GetOp(self.namespace, digest) for digest in digests])
+        return [item.value.get("content") if isinstance(item, Item) else None for item in items]
+
+
+def is_blob_ref(file_data: dict[str, Any]) -> bool:
+    """Return whether file_data refers to its content by blob digest."""
+    return file_data.get("encoding") == BLOB_ENCODING
+
+
+def to_blob_ref(file_data: dict[str, Any], blob_store: BlobStore) -> dict[str, Any]:
+    """Move the content of compact, uncompressed FileData into blob_store.
+
+    Returns:
+        FileData with the same metadata whose `content` is the blob digest.
+    """
+    return {**file_data, "encoding": BLOB_ENCODING, "content": blob_store.put(file_data["content"])}
+
+
+def resolve_blob_refs(files: dict[str, dict[str, Any]], blob_store: BlobStore) -> dict[str, dict[str, Any] | None]:
+    """Replace blob references in files by FileData carrying the content inline.
+
+    Other entries are returned unchanged. All blobs are fetched at once.
+
+    Returns:
+        Mapping of the same paths; a reference whose blob is missing maps to None.
+    """
+    refs = [(path, fd) for path, fd in files.items() if is_blob_ref(fd)]
+    if not refs:
+        return dict(files)
+    contents = blob_store.get_many(fd["content"] for _, fd in refs)
+    resolved: dict[str, dict[str, Any] | None] = dict(files)
+    for (path, fd), content in zip(refs, contents, strict=True):
+        resolved[path] = None if content is None else {**fd, "encoding": "utf-8", "content": content}
+    return resolved
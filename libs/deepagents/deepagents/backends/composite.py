@@ -1,6 +1,15 @@
 """CompositeBackend: Route operations to different backends based on path prefix."""
 
+import asyncio
+import contextvars
+import logging
+import threading
+import time
 from collections import defaultdict
+from collections.abc import Awaitable, Callable, Iterable, Sequence
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from functools import partial
+from typing import TypeVar
 
 from deepagents.backends.protocol import (
     BackendProtocol,
@@ -8,20 +17,212 @@ from deepagents.backends.protocol import (
     ExecuteResponse,
     FileDownloadResponse,
     FileInfo,
+    FileInfoList,
+    FileOperationError,
     FileUploadResponse,
     GrepMatch,
+    GrepMatchList,
     SandboxBackendProtocol,
     WriteResult,
 )
 from deepagents.backends.state import StateBackend
 
+logger = logging.getLogger(__name__)
+
+_R = TypeVar("_R")
+
+# (route prefix, backend, path to search); the default backend has prefix ""
+_Target = tuple[str, BackendProtocol, str | None]
+
+
+# Backends build fresh result dicts on every call, so route prefixes are added
+# to their paths in place rather than by copying every match or file info.
+
+
+def _prefix_matches(raw: list[GrepMatch] | str, route_prefix: str) -> list[GrepMatch] | str:
+    """Add a route prefix to the paths of a backend's grep matches, in place."""
+    if isinstance(raw, str) or not route_prefix:
+        return raw
+    base = route_prefix[:-1]
+    for m in raw:
+        m["path"] = base + m["path"]
+    return raw if isinstance(raw, GrepMatchList) else GrepMatchList(raw)
+
+
+def _prefix_infos(infos: list[FileInfo], route_prefix: str) -> list[FileInfo]:
+    """Add a route prefix to the paths of a backend's file infos, in place."""
+    if route_prefix:
+        base = route_prefix[:-1]
+        for fi in infos:
+            fi["path"] = base + fi["path"]
+    return infos
+
+
+_Route = tuple[str, BackendProtocol]
+
+
+class _RouteNode:
+    __slots__ = ("children", "partials", "route")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _RouteNode] = {}
+        # Routes whose prefix ends inside the next segment, longest first
+        self.partials: list[tuple[str, _Route]] = []
+        self.route: _Route | None = None
+
+
+class _RouteTable:
+    """Longest-prefix lookup of route prefixes in a trie of path segments.
+
+    Gives the same answer as testing `path.startswith(prefix)` for every prefix,
+    longest first, but only visits one node per segment of the path.
+    """
+
+    def __init__(self, routes: Iterable[tuple[str, _Route]]) -> None:
+        """Build the table; for prefixes given twice, the first route wins."""
+        self._root = _RouteNode()
+        for prefix, route in routes:
+            *segments, partial = prefix.split("/")
+            node = self._root
+            for segment in segments:
+                node = node.children.setdefault(segment, _RouteNode())
+            if partial:
+                if all(p != partial for p, _ in node.partials):
+                    node.partials.append((partial, route))
+                    node.partials.sort(key=lambda x: len(x[0]), reverse=True)
+            elif node.route is None:
+                node.route = route
+
+    def longest(self, path: str) -> _Route | None:
+        """Return the route with the longest prefix of path, if any."""
+        node = self._root
+        pos = 0
+        best = None
+        while True:
+            match = next((route for partial, route in node.partials if path.startswith(partial, pos)), node.route)
+            if match is not None:
+                best = match
+            slash = path.find("/", pos)
+            if slash == -1:
+                return best
+            child = node.children.get(path[pos:slash])
+            if child is None:
+                return best
+            node = child
+            pos = slash + 1
+
+
+def _raise_if_all_failed(outcomes: list[object]) -> None:
+    """Re-raise the first error if no backend produced a result; timeouts alone yield empty results."""
+    errors = [o for o in outcomes if isinstance(o, BaseException)]
+    if outcomes and len(errors) == len(outcomes) and not all(isinstance(e, TimeoutError) for e in errors):
+        raise next(e for e in errors if not isinstance(e, TimeoutError))
+
+
+def _batch_results(outcomes: list[_R | Exception]) -> list[_R | None]:
+    """Turn per-backend batch outcomes into results, None marking a failed batch.
+
+    A backend that does not implement the operation is a programming error
+    and its NotImplementedError is raised, as is the first error when every
+    batch failed.
+    """
+    for outcome in outcomes:
+        if isinstance(outcome, NotImplementedError):
+            raise outcome
+    _raise_if_all_failed(list(outcomes))
+    return [None if isinstance(outcome, Exception) else outcome for outcome in outcomes]
+
+
+def _run_into(future: Future[_R], call: Callable[..., _R], *args: object) -> None:
+    """Run call and resolve future with its result or exception."""
+    if not future.set_running_or_notify_cancel():
+        return
+    try:
+        result = call(*args)
+    except BaseException as e:  # noqa: BLE001  # handed to the waiting caller
+        future.set_exception(e)
+    else:
+        future.set_result(result)
+
+
+def _unavailable(targets: list[_Target], outcomes: Sequence[object]) -> list[str]:
+    """Log the backends that failed or timed out and return the locations they cover."""
+    unavailable: list[str] = []
+    for (route_prefix, _, search_path), outcome in zip(targets, outcomes, strict=True):
+        if not isinstance(outcome, BaseException):
+            continue
+        location = route_prefix or search_path or "/"
+        if isinstance(outcome, TimeoutError):
+            logger.warning("Searching %s timed out", location)
+        else:
+            logger.error("Searching %s failed", location, exc_info=outcome)
+        unavailable.append(location)
+    return unavailable
+
+
+def _merge_grep(targets: list[_Target], outcomes: list[list[GrepMatch] | str | BaseException]) -> list[GrepMatch] | str:
+    """Merge fanned-out grep results in target order.
+
+    The first error message is returned as is. Backends that failed or timed
+    out are logged, left out and listed in the result's `unavailable`.
+    """
+    unavailable = _unavailable(targets, outcomes)
+    _raise_if_all_failed(list(outcomes))
+    all_matches = GrepMatchList(unavailable=unavailable)
+    for outcome in outcomes:
+        if isinstance(outcome, str):
+            return outcome
+        if isinstance(outcome, BaseException):
+            continue
+        all_matches.extend(outcome)
+        all_matches.truncated |= getattr(outcome, "truncated", False)
+    return all_matches
+
+
+def _merge_glob(targets: list[_Target], outcomes: list[list[FileInfo] | BaseException]) -> list[FileInfo]:
+    """Merge fanned-out glob results; backends that failed or timed out are logged and listed in `unavailable`."""
+    unavailable = _unavailable(targets, outcomes)
+    _raise_if_all_failed(list(outcomes))
+    results = FileInfoList(unavailable=unavailable)
+    for outcome in outcomes:
+        if not isinstance(outcome, BaseException):
+            results.extend(outcome)
+    # Deterministic ordering
+    results.sort(key=lambda x: x.get("path", ""))
+    return results
+
 
 class CompositeBackend:
     def __init__(
         self,
         default: BackendProtocol | StateBackend,
         routes: dict[str, BackendProtocol],
+        *,
+        timeouts: dict[str, float] | None = None,
+        max_concurrent_batches: int = 4,
     ) -> None:
+        """Create a backend routing paths to backends by prefix.
+
+        A grep or glob whose path is not under a route searches the default
+        backend and every routed backend concurrently: as tasks for the async
+        methods, and on one short-lived thread per backend for the sync ones.
+        Results are merged in route order. A backend that raises or
+        exceeds its timeout is logged and left out of the results, which list
+        its route in `unavailable` (see `GrepMatchList` and `FileInfoList`);
+        the call only fails if every backend raised.
+
+        Args:
+            default: Backend for paths that match no route.
+            routes: Backends by path prefix, e.g. `{"/memories/": store_backend}`.
+            timeouts: Time limits in seconds for searching each backend during
+                a grep or glob fan-out, keyed by route prefix, or by "default"
+                for the default backend. Backends without an entry are waited
+                for. A sync call that times out keeps running in its own
+                thread, but its result is discarded; it does not delay later
+                calls.
+            max_concurrent_batches: Maximum number of backends that upload or
+                download their batch of files at the same time.
+        """
         # Default backend
         self.default = default
 
@@ -31,6 +232,87 @@ class CompositeBackend:
         # Sort routes by length (longest first) for correct prefix matching
         self.sorted_routes = sorted(routes.items(), key=lambda x: len(x[0]), reverse=True)
 
+        # Files are routed by their full prefix; directories to search (ls,
+        # grep, glob) also match a prefix without its trailing slash
+        self._file_routes = _RouteTable((prefix, (prefix, backend)) for prefix, backend in self.sorted_routes)
+        self._dir_routes = _RouteTable((prefix.rstrip("/"), (prefix, backend)) for prefix, backend in self.sorted_routes)
+
+        self.timeouts = dict(timeouts or {})
+        self.max_concurrent_batches = max_concurrent_batches
+        self._executor: ThreadPoolExecutor | None = None
+        self._executor_lock = threading.Lock()
+
+    def _fanout_targets(self, path: str | None) -> list[_Target]:
+        """Return the default backend searched at path, then every route searched from its root."""
+        return [("", self.default, path), *((route_prefix, backend, "/") for route_prefix, backend in self.routes.items())]
+
+    def _timeout(self, route_prefix: str) -> float | None:
+        return self.timeouts.get(route_prefix or "default")
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Return the pool running sync upload and download batches, creating it on first use."""
+        with self._executor_lock:
+            if self._executor is None:
+                workers = max(1, min(self.max_concurrent_batches, len(self.routes) + 1))
+                self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="deepagents-composite")
+            return self._executor
+
+    def _fan_out(self, targets: list[_Target], call: Callable[[str, BackendProtocol, str | None], _R]) -> list[_R | BaseException]:
+        """Run call for every target concurrently.
+
+        Returns:
+            Per target, in order, the result of call or the exception it
+            raised; TimeoutError if it did not finish within its timeout.
+        """
+        if len(targets) == 1 and self._timeout(targets[0][0]) is None:
+            route_prefix, backend, search_path = targets[0]
+            return [call(route_prefix, backend, search_path)]
+        start = time.monotonic()
+        outcomes: list[_R | BaseException] = [TimeoutError()] * len(targets)
+        pending: dict[Future[_R], int] = {}
+        deadlines: dict[int, float] = {}
+        for slot, (route_prefix, backend, search_path) in enumerate(targets):
+            # A thread per call rather than a pool: a call abandoned at its
+            # timeout must not hold up the calls of later fan-outs
+            future: Future[_R] = Future()
+            thread = threading.Thread(
+                # Copy the context so backends still see the caller's LangGraph config
+                target=contextvars.copy_context().run,
+                args=(_run_into, future, call, route_prefix, backend, search_path),
+                name="deepagents-composite-search",
+                daemon=True,
+            )
+            thread.start()
+            pending[future] = slot
+            timeout = self._timeout(route_prefix)
+            if timeout is not None:
+                deadlines[slot] = start + timeout
+        while pending:
+            next_deadline = min((deadlines[slot] for slot in pending.values() if slot in deadlines), default=None)
+            wait_for = None if next_deadline is None else max(0.0, next_deadline - time.monotonic())
+            done, _ = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+            for future in done:
+                slot = pending.pop(future)
+                error = future.exception()
+                outcomes[slot] = error if error is not None else future.result()
+            now = time.monotonic()
+            for future, slot in list(pending.items()):
+                if slot in deadlines and deadlines[slot] <= now:
+                    future.cancel()
+                    del pending[future]
+        return outcomes
+
+    async def _afan_out(self, targets: list[_Target], call: Callable[[str, BackendProtocol, str | None], Awaitable[_R]]) -> list[_R | BaseException]:
+        """Async version of _fan_out, running every target as a task."""
+
+        async def run(route_prefix: str, backend: BackendProtocol, search_path: str | None) -> _R | BaseException:
+            try:
+                return await asyncio.wait_for(call(route_prefix, backend, search_path), self._timeout(route_prefix))
+            except Exception as e:  # noqa: BLE001  # reported as a partial result
+                return e
+
+        return list(await asyncio.gather(*(run(*target) for target in targets)))
+
     def _get_backend_and_key(self, key: str) -> tuple[BackendProtocol, str]:
         """Determine which backend handles this key and strip prefix.
 
@@ -41,14 +323,15 @@ class CompositeBackend:
             Tuple of (backend, stripped_key) where stripped_key has the route
             prefix removed (but keeps leading slash).
         """
-        # Check routes in order of length (longest first)
-        for prefix, backend in self.sorted_routes:
-            if key.startswith(prefix):
-                # Strip full prefix and ensure a leading slash remains
-                # e.g., "/memories/notes.txt" → "/notes.txt"; "/memories/" → "/"
-                suffix = key[len(prefix) :]
-                stripped_key = f"/{suffix}" if suffix else "/"
-                return backend, stripped_key
+        # Longest matching route prefix
+        match = self._file_routes.longest(key)
+        if match is not None:
+            prefix, backend = match
+            # Strip full prefix and ensure a leading slash remains
+            # e.g., "/memories/notes.txt" → "/notes.txt"; "/memories/" → "/"
+            suffix = key[len(prefix) :]
+            stripped_key = f"/{suffix}" if suffix else "/"
+            return backend, stripped_key
 
         return self.default, key
 
@@ -63,18 +346,13 @@ class CompositeBackend:
             Directories have a trailing / in their path and is_dir=True.
         """
         # Check if path matches a specific route
-        for route_prefix, backend in self.sorted_routes:
-            if path.startswith(route_prefix.rstrip("/")):
-                # Query only the matching routed backend
-                suffix = path[len(route_prefix) :]
-                search_path = f"/{suffix}" if suffix else "/"
-                infos = backend.ls_info(search_path)
-                prefixed: list[FileInfo] = []
-                for fi in infos:
-                    fi = dict(fi)
-                    fi["path"] = f"{route_prefix[:-1]}{fi['path']}"
-                    prefixed.append(fi)
-                return prefixed
+        match = self._dir_routes.longest(path)
+        if match is not None:
+            # Query only the matching routed backend
+            route_prefix, backend = match
+            suffix = path[len(route_prefix) :]
+            search_path = f"/{suffix}" if suffix else "/"
+            return _prefix_infos(backend.ls_info(search_path), route_prefix)
 
         # At root, aggregate default and all routed backends
         if path == "/":
@@ -100,18 +378,13 @@ class CompositeBackend:
     async def als_info(self, path: str) -> list[FileInfo]:
         """Async version of ls_info."""
         # Check if path matches a specific route
-        for route_prefix, backend in self.sorted_routes:
-            if path.startswith(route_prefix.rstrip("/")):
-                # Query only the matching routed backend
-                suffix = path[len(route_prefix) :]
-                search_path = f"/{suffix}" if suffix else "/"
-                infos = await backend.als_info(search_path)
-                prefixed: list[FileInfo] = []
-                for fi in infos:
-                    fi = dict(fi)
-                    fi["path"] = f"{route_prefix[:-1]}{fi['path']}"
-                    prefixed.append(fi)
-                return prefixed
+        match = self._dir_routes.longest(path)
+        if match is not None:
+            # Query only the matching routed backend
+            route_prefix, backend = match
+            suffix = path[len(route_prefix) :]
+            search_path = f"/{suffix}" if suffix else "/"
+            return _prefix_infos(await backend.als_info(search_path), route_prefix)
 
         # At root, aggregate default and all routed backends
         if path == "/":
@@ -170,30 +443,21 @@ class CompositeBackend:
         glob: str | None = None,
     ) -> list[GrepMatch] | str:
         # If path targets a specific route, search only that backend
-        for route_prefix, backend in self.sorted_routes:
-            if path is not None and path.startswith(route_prefix.rstrip("/")):
-                search_path = path[len(route_prefix) - 1 :]
-                raw = backend.grep_raw(pattern, search_path if search_path else "/", glob)
-                if isinstance(raw, str):
-                    return raw
-                return [{**m, "path": f"{route_prefix[:-1]}{m['path']}"} for m in raw]
-
-        # Otherwise, search default and all routed backends and merge
-        all_matches: list[GrepMatch] = []
-        raw_default = self.default.grep_raw(pattern, path, glob)  # type: ignore[attr-defined]
-        if isinstance(raw_default, str):
-            # This happens if error occurs
-            return raw_default
-        all_matches.extend(raw_default)
-
-        for route_prefix, backend in self.routes.items():
-            raw = backend.grep_raw(pattern, "/", glob)
-            if isinstance(raw, str):
-                # This happens if error occurs
-                return raw
-            all_matches.extend({**m, "path": f"{route_prefix[:-1]}{m['path']}"} for m in raw)
-
-        return all_matches
+        match = self._dir_routes.longest(path) if path is not None else None
+        if match is not None and path is not None:
+            route_prefix, backend = match
+            search_path = path[len(route_prefix) - 1 :]
+            return _prefix_matches(backend.grep_raw(pattern, search_path if search_path else "/", glob), route_prefix)
+
+        # Otherwise, search default and all routed backends concurrently and merge
+        targets = self._fanout_targets(path)
+        return _merge_grep(
+            targets,
+            self._fan_out(
+                targets,
+                lambda route_prefix, backend, search_path: _prefix_matches(backend.grep_raw(pattern, search_path, glob), route_prefix),
+            ),
+        )
 
     async def agrep_raw(
         self,
@@ -203,73 +467,52 @@ class CompositeBackend:
     ) -> list[GrepMatch] | str:
         """Async version of grep_raw."""
         # If path targets a specific route, search only that backend
-        for route_prefix, backend in self.sorted_routes:
-            if path is not None and path.startswith(route_prefix.rstrip("/")):
-                search_path = path[len(route_prefix) - 1 :]
-                raw = await backend.agrep_raw(pattern, search_path if search_path else "/", glob)
-                if isinstance(raw, str):
-                    return raw
-                return [{**m, "path": f"{route_prefix[:-1]}{m['path']}"} for m in raw]
-
-        # Otherwise, search default and all routed backends and merge
-        all_matches: list[GrepMatch] = []
-        raw_default = await self.default.agrep_raw(pattern, path, glob)  # type: ignore[attr-defined]
-        if isinstance(raw_default, str):
-            # This happens if error occurs
-            return raw_default
-        all_matches.extend(raw_default)
-
-        for route_prefix, backend in self.routes.items():
-            raw = await backend.agrep_raw(pattern, "/", glob)
-            if isinstance(raw, str):
-                # This happens if error occurs
-                return raw
-            all_matches.extend({**m, "path": f"{route_prefix[:-1]}{m['path']}"} for m in raw)
-
-        return all_matches
+        match = self._dir_routes.longest(path) if path is not None else None
+        if match is not None and path is not None:
+            route_prefix, backend = match
+            search_path = path[len(route_prefix) - 1 :]
+            return _prefix_matches(await backend.agrep_raw(pattern, search_path if search_path else "/", glob), route_prefix)
 
-    def glob_info(self, pattern: str, path: str = "/") -> list[FileInfo]:
-        results: list[FileInfo] = []
+        # Otherwise, search default and all routed backends concurrently and merge
+        async def search(route_prefix: str, backend: BackendProtocol, search_path: str | None) -> list[GrepMatch] | str:
+            return _prefix_matches(await backend.agrep_raw(pattern, search_path, glob), route_prefix)
 
+        targets = self._fanout_targets(path)
+        return _merge_grep(targets, await self._afan_out(targets, search))
+
+    def glob_info(self, pattern: str, path: str = "/") -> list[FileInfo]:
         # Route based on path, not pattern
-        for route_prefix, backend in self.sorted_routes:
-            if path.startswith(route_prefix.rstrip("/")):
-                search_path = path[len(route_prefix) - 1 :]
-                infos = backend.glob_info(pattern, search_path if search_path else "/")
-                return [{**fi, "path": f"{route_prefix[:-1]}{fi['path']}"} for fi in infos]
+        match = self._dir_routes.longest(path)
+        if match is not None:
+            route_prefix, backend = match
+            search_path = path[len(route_prefix) - 1 :]
+            return _prefix_infos(backend.glob_info(pattern, search_path if search_path else "/"), route_prefix)
 
         # Path doesn't match any specific route - search default backend AND all routed backends
-        results.extend(self.default.glob_info(pattern, path))
-
-        for route_prefix, backend in self.routes.items():
-            infos = backend.glob_info(pattern, "/")
-            results.extend({**fi, "path": f"{route_prefix[:-1]}{fi['path']}"} for fi in infos)
-
-        # Deterministic ordering
-        results.sort(key=lambda x: x.get("path", ""))
-        return results
+        targets = self._fanout_targets(path)
+        return _merge_glob(
+            targets,
+            self._fan_out(
+                targets,
+                lambda route_prefix, backend, search_path: _prefix_infos(backend.glob_info(pattern, search_path or "/"), route_prefix),
+            ),
+        )
 
     async def aglob_info(self, pattern: str, path: str = "/") -> list[FileInfo]:
         """Async version of glob_info."""
-        results: list[FileInfo] = []
-
         # Route based on path, not pattern
-        for route_prefix, backend in self.sorted_routes:
-            if path.startswith(route_prefix.rstrip("/")):
-                search_path = path[len(route_prefix) - 1 :]
-                infos = await backend.aglob_info(pattern, search_path if search_path else "/")
-                return [{**fi, "path": f"{route_prefix[:-1]}{fi['path']}"} for fi in infos]
+        match = self._dir_routes.longest(path)
+        if match is not None:
+            route_prefix, backend = match
+            search_path = path[len(route_prefix) - 1 :]
+            return _prefix_infos(await backend.aglob_info(pattern, search_path if search_path else "/"), route_prefix)
 
         # Path doesn't match any specific route - search default backend AND all routed backends
-        results.extend(await self.default.aglob_info(pattern, path))
+        async def search(route_prefix: str, backend: BackendProtocol, search_path: str | None) -> list[FileInfo]:
+            return _prefix_infos(await backend.aglob_info(pattern, search_path or "/"), route_prefix)
 
-        for route_prefix, backend in self.routes.items():
-            infos = await backend.aglob_info(pattern, "/")
-            results.extend({**fi, "path": f"{route_prefix[:-1]}{fi['path']}"} for fi in infos)
-
-        # Deterministic ordering
-        results.sort(key=lambda x: x.get("path", ""))
-        return results
+        targets = self._fanout_targets(path)
+        return _merge_glob(targets, await self._afan_out(targets, search))
 
     def write(
         self,
@@ -418,84 +661,143 @@ class CompositeBackend:
             "To enable execution, provide a default backend that implements SandboxBackendProtocol."
         )
 
-    def upload_files(self, files: list[tuple[str, bytes]]) -> list[FileUploadResponse]:
-        """Upload multiple files, batching by backend for efficiency.
-
-        Groups files by their target backend, calls each backend's upload_files
-        once with all files for that backend, then merges results in original order.
-
-        Args:
-            files: List of (path, content) tuples to upload.
+    def _batches(self, paths: list[str]) -> list[tuple[BackendProtocol, list[int], list[str]]]:
+        """Group paths by their target backend.
 
         Returns:
-            List of FileUploadResponse objects, one per input file.
-            Response order matches input order.
+            Per backend, the indices of its paths in the input and the paths
+            with the route prefix stripped.
         """
-        # Pre-allocate result list
-        results: list[FileUploadResponse | None] = [None] * len(files)
-
-        # Group files by backend, tracking original indices
-        from collections import defaultdict
+        grouped: dict[BackendProtocol, tuple[list[int], list[str]]] = defaultdict(lambda: ([], []))
+        for idx, path in enumerate(paths):
+            backend, stripped_path = self._get_backend_and_key(path)
+            indices, stripped_paths = grouped[backend]
+            indices.append(idx)
+            stripped_paths.append(stripped_path)
+        return [(backend, indices, stripped_paths) for backend, (indices, stripped_paths) in grouped.items()]
 
-        backend_batches: dict[BackendProtocol, list[tuple[int, str, bytes]]] = defaultdict(list)
+    def _run_batches(self, calls: Sequence[Callable[[], _R]]) -> list[_R | None]:
+        """Run per-backend batch calls, concurrently up to `max_concurrent_batches`.
 
-        for idx, (path, content) in enumerate(files):
-            backend, stripped_path = self._get_backend_and_key(path)
-            backend_batches[backend].append((idx, stripped_path, content))
+        Returns:
+            Each call's result, or None if it raised.
 
-        # Process each backend's batch
-        for backend, batch in backend_batches.items():
-            # Extract data for backend call
-            indices, stripped_paths, contents = zip(*batch, strict=False)
-            batch_files = list(zip(stripped_paths, contents, strict=False))
+        Raises:
+            NotImplementedError: If a backend does not support the operation.
+            Exception: The first error, if every call raised.
+        """
 
-            # Call backend once with all its files
-            batch_responses = backend.upload_files(batch_files)
+        def guarded(call: Callable[[], _R]) -> _R | Exception:
+            try:
+                return call()
+            except Exception as e:
+                logger.exception("Batch file operation failed")
+                return e
+
+        if len(calls) <= 1 or self.max_concurrent_batches <= 1:
+            return _batch_results([guarded(call) for call in calls])
+        limit = threading.Semaphore(self.max_concurrent_batches)
+
+        def limited(call: Callable[[], _R]) -> _R | Exception:
+            with limit:
+                return guarded(call)
+
+        executor = self._get_executor()
+        futures = [executor.submit(contextvars.copy_context().run, limited, call) for call in calls]
+        return _batch_results([future.result() for future in futures])
+
+    async def _arun_batches(self, calls: Sequence[Callable[[], Awaitable[_R]]]) -> list[_R | None]:
+        """Async version of _run_batches."""
+        limit = asyncio.Semaphore(max(1, self.max_concurrent_batches))
+
+        async def limited(call: Callable[[], Awaitable[_R]]) -> _R | Exception:
+            async with limit:
+                try:
+                    return await call()
+                except Exception as e:
+                    logger.exception("Batch file operation failed")
+                    return e
+
+        return _batch_results(list(await asyncio.gather(*(limited(call) for call in calls))))
+
+    @staticmethod
+    def _upload_results(
+        files: list[tuple[str, bytes]],
+        batches: list[tuple[BackendProtocol, list[int], list[str]]],
+        batch_responses: list[list[FileUploadResponse] | None],
+    ) -> list[FileUploadResponse]:
+        """Place each backend's responses at the original indices, with the original paths."""
+        results: list[FileUploadResponse | None] = [None] * len(files)
+        for (_, indices, _), responses in zip(batches, batch_responses, strict=True):
+            for i, orig_idx in enumerate(indices):
+                if responses is None:
+                    error: FileOperationError | None = "backend_unavailable"
+                else:
+                    error = responses[i].error if i < len(responses) else None
+                results[orig_idx] = FileUploadResponse(path=files[orig_idx][0], error=error)
+        return results  # type: ignore[return-value]
 
-            # Place responses at original indices with original paths
+    @staticmethod
+    def _download_results(
+        paths: list[str],
+        batches: list[tuple[BackendProtocol, list[int], list[str]]],
+        batch_responses: list[list[FileDownloadResponse] | None],
+    ) -> list[FileDownloadResponse]:
+        """Place each backend's responses at the original indices, with the original paths."""
+        results: list[FileDownloadResponse | None] = [None] * len(paths)
+        for (_, indices, _), responses in zip(batches, batch_responses, strict=True):
             for i, orig_idx in enumerate(indices):
-                results[orig_idx] = FileUploadResponse(
-                    path=files[orig_idx][0],  # Original path
-                    error=batch_responses[i].error if i < len(batch_responses) else None,
+                if responses is None:
+                    results[orig_idx] = FileDownloadResponse(path=paths[orig_idx], content=None, error="backend_unavailable")
+                    continue
+                results[orig_idx] = FileDownloadResponse(
+                    path=paths[orig_idx],  # Original path
+                    content=responses[i].content if i < len(responses) else None,
+                    error=responses[i].error if i < len(responses) else None,
                 )
-
         return results  # type: ignore[return-value]
 
-    async def aupload_files(self, files: list[tuple[str, bytes]]) -> list[FileUploadResponse]:
-        """Async version of upload_files."""
-        # Pre-allocate result list
-        results: list[FileUploadResponse | None] = [None] * len(files)
-
-        # Group files by backend, tracking original indices
-        backend_batches: dict[BackendProtocol, list[tuple[int, str, bytes]]] = defaultdict(list)
-
-        for idx, (path, content) in enumerate(files):
-            backend, stripped_path = self._get_backend_and_key(path)
-            backend_batches[backend].append((idx, stripped_path, content))
+    def upload_files(self, files: list[tuple[str, bytes]]) -> list[FileUploadResponse]:
+        """Upload multiple files, batching by backend for efficiency.
 
-        # Process each backend's batch
-        for backend, batch in backend_batches.items():
-            # Extract data for backend call
-            indices, stripped_paths, contents = zip(*batch, strict=False)
-            batch_files = list(zip(stripped_paths, contents, strict=False))
+        Groups files by their target backend and calls each backend's
+        upload_files once with all files for that backend. The batches of
+        different backends run concurrently, at most `max_concurrent_batches`
+        at a time. Results are merged in original order; if a backend raises,
+        the error is logged, its files get the error "backend_unavailable"
+        and the others are unaffected. If every backend raises, the first
+        error is raised, and NotImplementedError is always raised.
 
-            # Call backend once with all its files
-            batch_responses = await backend.aupload_files(batch_files)
+        Args:
+            files: List of (path, content) tuples to upload.
 
-            # Place responses at original indices with original paths
-            for i, orig_idx in enumerate(indices):
-                results[orig_idx] = FileUploadResponse(
-                    path=files[orig_idx][0],  # Original path
-                    error=batch_responses[i].error if i < len(batch_responses) else None,
-                )
+        Returns:
+            List of FileUploadResponse objects, one per input file.
+            Response order matches input order.
+        """
+        batches = self._batches([path for path, _ in files])
+        calls = [
+            partial(backend.upload_files, [(p, files[i][1]) for i, p in zip(indices, stripped, strict=True)])
+            for backend, indices, stripped in batches
+        ]
+        return self._upload_results(files, batches, self._run_batches(calls))
 
-        return results  # type: ignore[return-value]
+    async def aupload_files(self, files: list[tuple[str, bytes]]) -> list[FileUploadResponse]:
+        """Async version of upload_files; per-backend batches run as concurrent tasks."""
+        batches = self._batches([path for path, _ in files])
+        calls = [
+            partial(backend.aupload_files, [(p, files[i][1]) for i, p in zip(indices, stripped, strict=True)])
+            for backend, indices, stripped in batches
+        ]
+        return self._upload_results(files, batches, await self._arun_batches(calls))
 
     def download_files(self, paths: list[str]) -> list[FileDownloadResponse]:
         """Download multiple files, batching by backend for efficiency.
 
-        Groups paths by their target backend, calls each backend's download_files
-        once with all paths for that backend, then merges results in original order.
+        Groups paths by their target backend and calls each backend's
+        download_files once with all paths for that backend, concurrently
+        across backends as in `upload_files`. Results are merged in original
+        order; backend errors are handled as in `upload_files`.
 
         Args:
             paths: List of file paths to download.
@@ -504,58 +806,12 @@ class CompositeBackend:
             List of FileDownloadResponse objects, one per input path.
             Response order matches input order.
         """
-        # Pre-allocate result list
-        results: list[FileDownloadResponse | None] = [None] * len(paths)
-
-        backend_batches: dict[BackendProtocol, list[tuple[int, str]]] = defaultdict(list)
-
-        for idx, path in enumerate(paths):
-            backend, stripped_path = self._get_backend_and_key(path)
-            backend_batches[backend].append((idx, stripped_path))
-
-        # Process each backend's batch
-        for backend, batch in backend_batches.items():
-            # Extract data for backend call
-            indices, stripped_paths = zip(*batch, strict=False)
-
-            # Call backend once with all its paths
-            batch_responses = backend.download_files(list(stripped_paths))
-
-            # Place responses at original indices with original paths
-            for i, orig_idx in enumerate(indices):
-                results[orig_idx] = FileDownloadResponse(
-                    path=paths[orig_idx],  # Original path
-                    content=batch_responses[i].content if i < len(batch_responses) else None,
-                    error=batch_responses[i].error if i < len(batch_responses) else None,
-                )
-
-        return results  # type: ignore[return-value]
+        batches = self._batches(paths)
+        calls = [partial(backend.download_files, stripped) for backend, _, stripped in batches]
+        return self._download_results(paths, batches, self._run_batches(calls))
 
     async def adownload_files(self, paths: list[str]) -> list[FileDownloadResponse]:
-        """Async version of download_files."""
-        # Pre-allocate result list
-        results: list[FileDownloadResponse | None] = [None] * len(paths)
-
-        backend_batches: dict[BackendProtocol, list[tuple[int, str]]] = defaultdict(list)
-
-        for idx, path in enumerate(paths):
-            backend, stripped_path = self._get_backend_and_key(path)
-            backend_batches[backend].append((idx, stripped_path))
-
-        # Process each backend's batch
-        for backend, batch in backend_batches.items():
-            # Extract data for backend call
-            indices, stripped_paths = zip(*batch, strict=False)
-
-            # Call backend once with all its paths
-            batch_responses = await backend.adownload_files(list(stripped_paths))
-
-            # Place responses at original indices with original paths
-            for i, orig_idx in enumerate(indices):
-                results[orig_idx] = FileDownloadResponse(
-                    path=paths[orig_idx],  # Original path
-                    content=batch_responses[i].content if i < len(batch_responses) else None,
-                    error=batch_responses[i].error if i < len(batch_responses) else None,
-                )
-
-        return results  # type: ignore[return-value]
+        """Async version of download_files; per-backend batches run as concurrent tasks."""
+        batches = self._batches(paths)
+        calls = [partial(backend.adownload_files, stripped) for backend, _, stripped in batches]
+        return self._download_results(paths, batches, await self._arun_batches(calls))
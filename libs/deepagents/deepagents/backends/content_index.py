@@ -0,0 +1,281 @@
+"""Persistent trigram index used to narrow FilesystemBackend grep candidates.
+
+The index lives in a SQLite database on disk and maps case-folded trigrams to
+the files that contain them. Each file row is keyed by its absolute path and
+remembers the mtime and size it was indexed at, so a refresh only re-reads
+files whose stat data changed since the last search.
+
+A query never decides whether a line matches. It only returns the files that
+could contain every trigram of the pattern's required literals; the caller
+still runs the regex over those files.
+"""
+
+import hashlib
+import os
+import sqlite3
+import stat
+import threading
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+from deepagents.backends.tree_cache import CachedEntry
+from deepagents.backends.utils import extract_required_literals
+
+_SCHEMA_VERSION = "1"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    indexed INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    trigram TEXT NOT NULL,
+    file_id INTEGER NOT NULL,
+    PRIMARY KEY (trigram, file_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_file ON postings (file_id);
+"""
+
+
+def default_index_path(root: Path) -> Path:
+    """Return the default on-disk location of the index for a root directory.
+
+    Indexes are stored under `$XDG_CACHE_HOME/deepagents/content-index/`
+    (falling back to `~/.cache`), one database per root directory.
+    """
+    cache_home = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    digest = hashlib.sha256(str(root).encode("utf-8")).hexdigest()[:16]
+    return Path(cache_home) / "deepagents" / "content-index" / f"{digest}.sqlite3"
+
+
+def text_trigrams(text: str) -> set[str]:
+    """Return the set of case-folded trigrams occurring in text."""
+    folded = text.casefold()
+    return {folded[i : i + 3] for i in range(len(folded) - 2)}
+
+
+def pattern_trigrams(pattern: str) -> set[str]:
+    """Return the trigrams every line matching pattern must contain.
+
+    An empty set means the pattern cannot be used to narrow candidates.
+    """
+    trigrams: set[str] = set()
+    for literal in extract_required_literals(pattern):
+        if len(literal) >= 3:  # noqa: PLR2004  # trigram length
+            trigrams |= text_trigrams(literal)
+    return trigrams
+
+
+class TrigramIndex:
+    """On-disk trigram index over the files of a directory tree.
+
+    The index is safe to share between threads. It is updated lazily by
+    `refresh()` and eagerly by `update_file()` / `remove_file()` when the
+    owning backend changes a file itself.
+    """
+
+    def __init__(self, index_path: Path, *, max_file_size_bytes: int) -> None:
+        """Open (or create) the index database.
+
+        Args:
+            index_path: Location of the SQLite database file.
+            max_file_size_bytes: Files larger than this are recorded but not
+                indexed, mirroring the size cap of the Python grep fallback.
+        """
+        self.index_path = index_path
+        self.max_file_size_bytes = max_file_size_bytes
+        self._lock = threading.Lock()
+
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(index_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._lock:
+            self._conn.executescript(_SCHEMA)
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+            if row is None or row[0] != _SCHEMA_VERSION:
+                self._conn.executescript("DELETE FROM postings; DELETE FROM files;")
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('schema_version', ?)",
+                    (_SCHEMA_VERSION,),
+                )
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def _is_own_file(self, path: str) -> bool:
+        index_str = str(self.index_path)
+        return path == index_str or path.startswith((index_str + "-", index_str + "."))
+
+    def _walk(self, base: Path) -> Iterator[tuple[str, int, int]]:
+        if base.is_file():
+            st = base.stat()
+            yield str(base), st.st_mtime_ns, st.st_size
+            return
+        for dirpath, _dirnames, filenames in os.walk(base):
+            for name in filenames:
+                full = os.path.join(dirpath, name)  # noqa: PTH118  # hot loop, avoid Path objects
+                try:
+                    st = os.stat(full)  # noqa: PTH116
+                except OSError:
+                    continue
+                if stat.S_ISREG(st.st_mode):
+                    yield full, st.st_mtime_ns, st.st_size
+
+    def _read_trigrams(self, path: str, size: int) -> set[str] | None:
+        if size > self.max_file_size_bytes:
+            return None
+        try:
+            with open(path, "rb") as f:  # noqa: PTH123
+                data = f.read()
+        except OSError:
+            return None
+        # Binary files are never searched, so they are never candidates
+        if b"\0" in data:
+            return None
+        return text_trigrams(data.decode("utf-8", errors="replace"))
+
+    def _store(self, path: str, mtime_ns: int, size: int, trigrams: set[str] | None) -> None:
+        conn = self._conn
+        row = conn.execute("SELECT id FROM files WHERE path = ?", (path,)).fetchone()
+        if row is not None:
+            conn.execute("DELETE FROM postings WHERE file_id = ?", (row[0],))
+            conn.execute(
+                "UPDATE files SET mtime_ns = ?, size = ?, indexed = ? WHERE id = ?",
+                (mtime_ns, size, trigrams is not None, row[0]),
+            )
+            file_id = row[0]
+        else:
+            cur = conn.execute(
+                "INSERT INTO files (path, mtime_ns, size, indexed) VALUES (?, ?, ?, ?)",
+                (path, mtime_ns, size, trigrams is not None),
+            )
+            file_id = cur.lastrowid
+        if trigrams:
+            conn.executemany(
+                "INSERT INTO postings (trigram, file_id) VALUES (?, ?)",
+                ((t, file_id) for t in trigrams),
+            )
+
+    def _delete(self, paths: Iterable[str]) -> None:
+        conn = self._conn
+        for path in paths:
+            row = conn.execute("SELECT id FROM files WHERE path = ?", (path,)).fetchone()
+            if row is None:
+                continue
+            conn.execute("DELETE FROM postings WHERE file_id = ?", (row[0],))
+            conn.execute("DELETE FROM files WHERE id = ?", (row[0],))
+
+    @staticmethod
+    def _prefix_bounds(base: Path) -> tuple[str, str]:
+        prefix = str(base).rstrip("/") + "/"
+        # "0" sorts directly after "/", so [prefix, upper) is exactly the subtree
+        return prefix, prefix[:-1] + "0"
+
+    def _known(self, base: Path) -> dict[str, tuple[int, int]]:
+        if base.is_file():
+            rows = self._conn.execute("SELECT path, mtime_ns, size FROM files WHERE path = ?", (str(base),))
+        else:
+            lower, upper = self._prefix_bounds(base)
+            rows = self._conn.execute(
+                "SELECT path, mtime_ns, size FROM files WHERE path >= ? AND path < ?",
+                (lower, upper),
+            )
+        return {path: (mtime_ns, size) for path, mtime_ns, size in rows}
+
+    def refresh(self, base: Path, files: Iterable[CachedEntry] | None = None) -> None:
+        """Bring the index up to date for every file under base.
+
+        Files are compared to the index by mtime and size; only changed or new
+        files are read. Entries for files that disappeared are dropped.
+
+        Args:
+            base: File or directory to refresh.
+            files: The files under base that should be indexed, e.g. from a
+                walk that honours ignore files. Defaults to every regular file.
+        """
+        stats = self._walk(base) if files is None else ((entry.path, entry.mtime_ns or 0, entry.size or 0) for entry in files)
+        with self._lock:
+            known = self._known(base)
+            self._conn.execute("BEGIN")
+            try:
+                for path, mtime_ns, size in stats:
+                    if self._is_own_file(path):
+                        continue
+                    previous = known.pop(path, None)
+                    if previous == (mtime_ns, size):
+                        continue
+                    self._store(path, mtime_ns, size, self._read_trigrams(path, size))
+                self._delete(known)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def update_file(self, path: Path) -> None:
+        """Re-index a single file after it was written through the backend."""
+        path_str = str(path)
+        try:
+            st = os.stat(path_str)  # noqa: PTH116
+        except OSError:
+            self.remove_file(path)
+            return
+        trigrams = self._read_trigrams(path_str, st.st_size)
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._store(path_str, st.st_mtime_ns, st.st_size, trigrams)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def remove_file(self, path: Path) -> None:
+        """Drop a file from the index."""
+        with self._lock:
+            self._delete([str(path)])
+
+    def candidates(self, pattern: str, base: Path) -> list[str]:
+        """Return the indexed files under base that may contain a match.
+
+        Call `refresh()` first; files that are not indexed (too large or
+        binary) are never returned, matching the Python grep fallback.
+
+        Args:
+            pattern: Regex pattern being searched.
+            base: File or directory the search is restricted to.
+
+        Returns:
+            Sorted absolute paths of candidate files.
+        """
+        trigrams = sorted(pattern_trigrams(pattern))
+        if base.is_file():
+            scope_sql, scope_args = "f.path = ?", [str(base)]
+        else:
+            lower, upper = self._prefix_bounds(base)
+            scope_sql, scope_args = "f.path >= ? AND f.path < ?", [lower, upper]
+
+        with self._lock:
+            if not trigrams:
+                rows = self._conn.execute(
+                    f"SELECT f.path FROM files f WHERE f.indexed = 1 AND {scope_sql} ORDER BY f.path",  # noqa: S608
+                    scope_args,
+                )
+            else:
+                placeholders = ", ".join("?" for _ in trigrams)
+                rows = self._conn.execute(
+                    f"SELECT f.path FROM files f JOIN postings p ON p.file_id = f.id "  # noqa: S608
+                    f"WHERE f.indexed = 1 AND {scope_sql} AND p.trigram IN ({placeholders}) "
+                    f"GROUP BY f.id HAVING COUNT(*) = ? ORDER BY f.path",
+                    [*scope_args, *trigrams, len(trigrams)],
+                )
+            return [row[0] for row in rows]
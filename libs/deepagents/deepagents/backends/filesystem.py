@@ -5,17 +5,31 @@ Security and search upgrades:
 - Prevent symlink-following on file I/O using O_NOFOLLOW when available
 - Ripgrep-powered grep with JSON parsing, plus Python fallback with regex
   and optional glob include filtering, while preserving virtual path behavior
+- Optional persistent trigram index that narrows grep to candidate files
 """
 
+import asyncio
+import base64
+import functools
+import itertools
 import json
+import multiprocessing
 import os
 import re
 import subprocess
+import threading
+from collections.abc import Callable, Iterable
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 from pathlib import Path
+from typing import TYPE_CHECKING, TypeVar
 
 import wcmatch.glob as wcglob
 
+from deepagents.backends.content_index import TrigramIndex, default_index_path
+from deepagents.backends.line_index import LineIndexCache, read_bytes, read_page
+from deepagents.backends.patterns import compile_glob, compile_regex
 from deepagents.backends.protocol import (
     BackendProtocol,
     EditResult,
@@ -23,13 +37,74 @@ from deepagents.backends.protocol import (
     FileInfo,
     FileUploadResponse,
     GrepMatch,
+    GrepMatchList,
     WriteResult,
 )
+from deepagents.backends.python_grep import search_files
+from deepagents.backends.tree_cache import CachedEntry, DirectoryCache, scan_directory
 from deepagents.backends.utils import (
     check_empty_content,
     format_content_with_line_numbers,
     perform_string_replacement,
 )
+from deepagents.backends.walk import DEFAULT_PRUNE_DIRS, walk_files
+
+if TYPE_CHECKING:
+    from multiprocessing.context import BaseContext
+
+_RIPGREP_TIMEOUT_SECONDS = 30
+_RIPGREP_MAX_LINE_BYTES = 64 * 1024 * 1024
+_MMAP_THRESHOLD_BYTES = 1024 * 1024
+_PARALLEL_GREP_MIN_FILES = 1000
+
+_T = TypeVar("_T")
+_R = TypeVar("_R")
+
+
+class _RipgrepCollector:
+    """Accumulate ripgrep JSON events into per-file matches under a budget."""
+
+    def __init__(self, backend: "FilesystemBackend") -> None:
+        self.backend = backend
+        self.results: dict[str, list[tuple[int, str]]] = {}
+        self.truncated = False
+        self._virtual_paths: dict[str, str | None] = {}
+        self._match_count = 0
+        self._bytes_read = 0
+
+    def feed(self, raw: bytes) -> bool:
+        """Consume one line of rg output. Returns False once a budget is spent."""
+        backend = self.backend
+        self._bytes_read += len(raw)
+        if backend.grep_max_output_bytes is not None and self._bytes_read > backend.grep_max_output_bytes:
+            self.truncated = True
+            return False
+        try:
+            data = json.loads(raw)
+        except json.JSONDecodeError:
+            data = {}
+        if data.get("type") != "match":
+            return True
+        pdata = data.get("data", {})
+        ftext = pdata.get("path", {}).get("text")
+        ln = pdata.get("line_number")
+        if not ftext or ln is None:
+            return True
+        if ftext not in self._virtual_paths:
+            self._virtual_paths[ftext] = backend._to_virtual_path(Path(ftext))
+        virt = self._virtual_paths[ftext]
+        if virt is None:
+            return True
+        lines = pdata.get("lines", {})
+        # rg reports lines that are not valid UTF-8 base64-encoded
+        lt = lines["text"] if "text" in lines else base64.b64decode(lines.get("bytes", "")).decode("utf-8", errors="replace")
+        lt = lt.rstrip("\n")
+        if backend.grep_max_matches is not None and self._match_count >= backend.grep_max_matches:
+            self.truncated = True
+            return False
+        self.results.setdefault(virt, []).append((int(ln), lt))
+        self._match_count += 1
+        return True
 
 
 class FilesystemBackend(BackendProtocol):
@@ -45,6 +120,18 @@ class FilesystemBackend(BackendProtocol):
         root_dir: str | Path | None = None,
         virtual_mode: bool = False,
         max_file_size_mb: int = 10,
+        *,
+        content_index: bool = False,
+        content_index_path: str | Path | None = None,
+        grep_max_matches: int | None = None,
+        grep_max_output_bytes: int | None = None,
+        max_io_workers: int = 1,
+        tree_cache: bool = False,
+        respect_ignore_files: bool = True,
+        glob_respect_ignore_files: bool = False,
+        prune_dirs: Iterable[str] = DEFAULT_PRUNE_DIRS,
+        walk_workers: int = 1,
+        grep_processes: int | None = None,
     ) -> None:
         """Initialize filesystem backend.
 
@@ -52,10 +139,66 @@ class FilesystemBackend(BackendProtocol):
             root_dir: Optional root directory for file operations. If provided,
                      all file paths will be resolved relative to this directory.
                      If not provided, uses the current working directory.
+            content_index: If True, keep a persistent trigram index of file
+                     contents and use it to narrow grep to candidate files
+                     instead of running ripgrep or scanning the whole tree.
+            content_index_path: Location of the index database. Defaults to a
+                     per-root file under the user cache directory.
+            grep_max_matches: Optional cap on the number of matches a single grep
+                     returns. ripgrep is stopped as soon as the cap is exceeded and
+                     the result is flagged as truncated.
+            grep_max_output_bytes: Optional cap on the bytes of ripgrep JSON output
+                     consumed by a single grep. ripgrep is stopped once the budget
+                     is spent and the result is flagged as truncated.
+            max_io_workers: Size of the backend's dedicated I/O thread pool.
+                     With more than 1 worker, the pool runs the files of a
+                     batched upload_files/download_files concurrently, and
+                     every async method except ripgrep (an asyncio
+                     subprocess). Worth raising for network filesystems.
+                     Defaults to 1: batches run serially and async methods use
+                     the event loop's default executor. The pool is released
+                     by close().
+            tree_cache: If True, cache directory listings and their stat data
+                     in memory for ls_info and glob_info. The cache is kept
+                     current with inotify on Linux and by polling elsewhere.
+            respect_ignore_files: If True, the Python grep fallback skips
+                     files excluded by .gitignore / .ignore files, as ripgrep
+                     does.
+            glob_respect_ignore_files: If True, glob_info also skips files
+                     excluded by ignore files and does not descend into
+                     prune_dirs. Off by default, so glob matches every file
+                     under the path, including ignored files and .git.
+            prune_dirs: Directory name patterns grep (and glob, with
+                     glob_respect_ignore_files) never descends into. Defaults
+                     to VCS metadata directories.
+            walk_workers: Number of threads used to walk directory trees.
+            grep_processes: Number of processes the Python grep fallback shards
+                     large searches across. Defaults to 1, which keeps the
+                     search in-process. The worker pool is started on first
+                     use and released by close().
         """
         self.cwd = Path(root_dir).resolve() if root_dir else Path.cwd()
         self.virtual_mode = virtual_mode
         self.max_file_size_bytes = max_file_size_mb * 1024 * 1024
+        self.grep_max_matches = grep_max_matches
+        self.grep_max_output_bytes = grep_max_output_bytes
+        # Files at least this large are paged via mmap and a cached line index
+        self.mmap_threshold_bytes = _MMAP_THRESHOLD_BYTES
+        self._line_indexes = LineIndexCache()
+        self.max_io_workers = max_io_workers
+        self._io_executor: ThreadPoolExecutor | None = None
+        self._io_executor_lock = threading.Lock()
+        self.tree_cache = DirectoryCache() if tree_cache else None
+        self.respect_ignore_files = respect_ignore_files
+        self.glob_respect_ignore_files = glob_respect_ignore_files
+        self.prune_dirs = tuple(prune_dirs)
+        self.walk_workers = walk_workers
+        self.grep_processes = grep_processes if grep_processes is not None else 1
+        self._grep_pool: ProcessPoolExecutor | None = None
+        self.content_index: TrigramIndex | None = None
+        if content_index:
+            index_path = Path(content_index_path).resolve() if content_index_path else default_index_path(self.cwd)
+            self.content_index = TrigramIndex(index_path, max_file_size_bytes=self.max_file_size_bytes)
 
     def _resolve_path(self, key: str) -> Path:
         """Resolve a file path with security checks.
@@ -87,6 +230,39 @@ class FilesystemBackend(BackendProtocol):
             return path
         return (self.cwd / path).resolve()
 
+    def _list_dir(self, dir_path: str) -> list[CachedEntry]:
+        """List a directory through the tree cache when enabled."""
+        if self.tree_cache is not None:
+            return self.tree_cache.listdir(dir_path)
+        return scan_directory(dir_path)
+
+    def _display_path(self, abs_path: str) -> str:
+        """Map an absolute path to the path reported to callers."""
+        if not self.virtual_mode:
+            return abs_path
+        cwd_str = str(self.cwd)
+        if not cwd_str.endswith("/"):
+            cwd_str += "/"
+        if abs_path.startswith(cwd_str):
+            relative_path = abs_path[len(cwd_str) :]
+        elif abs_path.startswith(str(self.cwd)):
+            # Handle case where cwd doesn't end with /
+            relative_path = abs_path[len(str(self.cwd)) :].lstrip("/")
+        else:
+            # Path is outside cwd, return as-is
+            relative_path = abs_path
+        return "/" + relative_path
+
+    def _entry_info(self, entry: CachedEntry) -> FileInfo:
+        display = self._display_path(entry.path)
+        if entry.is_dir:
+            info: FileInfo = {"path": display + "/", "is_dir": True, "size": 0}
+        else:
+            info = {"path": display, "is_dir": False, "size": int(entry.size or 0)}
+        if entry.mtime is not None:
+            info["modified_at"] = datetime.fromtimestamp(entry.mtime).isoformat()
+        return info
+
     def ls_info(self, path: str) -> list[FileInfo]:
         """List files and directories in the specified directory (non-recursive).
 
@@ -101,98 +277,21 @@ class FilesystemBackend(BackendProtocol):
         if not dir_path.exists() or not dir_path.is_dir():
             return []
 
-        results: list[FileInfo] = []
-
-        # Convert cwd to string for comparison
-        cwd_str = str(self.cwd)
-        if not cwd_str.endswith("/"):
-            cwd_str += "/"
-
         # List only direct children (non-recursive)
         try:
-            for child_path in dir_path.iterdir():
-                try:
-                    is_file = child_path.is_file()
-                    is_dir = child_path.is_dir()
-                except OSError:
-                    continue
-
-                abs_path = str(child_path)
-
-                if not self.virtual_mode:
-                    # Non-virtual mode: use absolute paths
-                    if is_file:
-                        try:
-                            st = child_path.stat()
-                            results.append(
-                                {
-                                    "path": abs_path,
-                                    "is_dir": False,
-                                    "size": int(st.st_size),
-                                    "modified_at": datetime.fromtimestamp(st.st_mtime).isoformat(),
-                                }
-                            )
-                        except OSError:
-                            results.append({"path": abs_path, "is_dir": False})
-                    elif is_dir:
-                        try:
-                            st = child_path.stat()
-                            results.append(
-                                {
-                                    "path": abs_path + "/",
-                                    "is_dir": True,
-                                    "size": 0,
-                                    "modified_at": datetime.fromtimestamp(st.st_mtime).isoformat(),
-                                }
-                            )
-                        except OSError:
-                            results.append({"path": abs_path + "/", "is_dir": True})
-                else:
-                    # Virtual mode: strip cwd prefix
-                    if abs_path.startswith(cwd_str):
-                        relative_path = abs_path[len(cwd_str) :]
-                    elif abs_path.startswith(str(self.cwd)):
-                        # Handle case where cwd doesn't end with /
-                        relative_path = abs_path[len(str(self.cwd)) :].lstrip("/")
-                    else:
-                        # Path is outside cwd, return as-is or skip
-                        relative_path = abs_path
-
-                    virt_path = "/" + relative_path
-
-                    if is_file:
-                        try:
-                            st = child_path.stat()
-                            results.append(
-                                {
-                                    "path": virt_path,
-                                    "is_dir": False,
-                                    "size": int(st.st_size),
-                                    "modified_at": datetime.fromtimestamp(st.st_mtime).isoformat(),
-                                }
-                            )
-                        except OSError:
-                            results.append({"path": virt_path, "is_dir": False})
-                    elif is_dir:
-                        try:
-                            st = child_path.stat()
-                            results.append(
-                                {
-                                    "path": virt_path + "/",
-                                    "is_dir": True,
-                                    "size": 0,
-                                    "modified_at": datetime.fromtimestamp(st.st_mtime).isoformat(),
-                                }
-                            )
-                        except OSError:
-                            results.append({"path": virt_path + "/", "is_dir": True})
-        except (OSError, PermissionError):
-            pass
+            entries = self._list_dir(str(dir_path))
+        except OSError:
+            return []
+        results = [self._entry_info(entry) for entry in entries if entry.is_file or entry.is_dir]
 
         # Keep deterministic order by path
         results.sort(key=lambda x: x.get("path", ""))
         return results
 
+    async def als_info(self, path: str) -> list[FileInfo]:
+        """Async version of ls_info."""
+        return await self._run_io(self.ls_info, path)
+
     def read(
         self,
         file_path: str,
@@ -217,8 +316,12 @@ class FilesystemBackend(BackendProtocol):
         try:
             # Open with O_NOFOLLOW where available to avoid symlink traversal
             fd = os.open(resolved_path, os.O_RDONLY | getattr(os, "O_NOFOLLOW", 0))
-            with os.fdopen(fd, "r", encoding="utf-8") as f:
-                content = f.read()
+            with os.fdopen(fd, "rb") as f:
+                if os.fstat(fd).st_size >= self.mmap_threshold_bytes:
+                    page = read_page(fd, str(resolved_path), offset, limit, self._line_indexes)
+                    if page is not None:
+                        return page if isinstance(page, str) else format_content_with_line_numbers(page, start_line=offset + 1)
+                content = f.read().decode("utf-8")
 
             empty_msg = check_empty_content(content)
             if empty_msg:
@@ -236,6 +339,15 @@ class FilesystemBackend(BackendProtocol):
         except (OSError, UnicodeDecodeError) as e:
             return f"Error reading file '{file_path}': {e}"
 
+    async def aread(
+        self,
+        file_path: str,
+        offset: int = 0,
+        limit: int = 2000,
+    ) -> str:
+        """Async version of read."""
+        return await self._run_io(self.read, file_path, offset, limit)
+
     def write(
         self,
         file_path: str,
@@ -261,10 +373,23 @@ class FilesystemBackend(BackendProtocol):
             with os.fdopen(fd, "w", encoding="utf-8") as f:
                 f.write(content)
 
+            self._line_indexes.invalidate(str(resolved_path))
+            if self.tree_cache is not None:
+                self.tree_cache.invalidate(str(resolved_path))
+            if self.content_index is not None:
+                self.content_index.update_file(resolved_path)
             return WriteResult(path=file_path, files_update=None)
         except (OSError, UnicodeEncodeError) as e:
             return WriteResult(error=f"Error writing file '{file_path}': {e}")
 
+    async def awrite(
+        self,
+        file_path: str,
+        content: str,
+    ) -> WriteResult:
+        """Async version of write."""
+        return await self._run_io(self.write, file_path, content)
+
     def edit(
         self,
         file_path: str,
@@ -301,19 +426,34 @@ class FilesystemBackend(BackendProtocol):
             with os.fdopen(fd, "w", encoding="utf-8") as f:
                 f.write(new_content)
 
+            self._line_indexes.invalidate(str(resolved_path))
+            if self.tree_cache is not None:
+                self.tree_cache.invalidate(str(resolved_path))
+            if self.content_index is not None:
+                self.content_index.update_file(resolved_path)
             return EditResult(path=file_path, files_update=None, occurrences=int(occurrences))
         except (OSError, UnicodeDecodeError, UnicodeEncodeError) as e:
             return EditResult(error=f"Error editing file '{file_path}': {e}")
 
-    def grep_raw(
+    async def aedit(
         self,
-        pattern: str,
-        path: str | None = None,
-        glob: str | None = None,
-    ) -> list[GrepMatch] | str:
+        file_path: str,
+        old_string: str,
+        new_string: str,
+        replace_all: bool = False,
+    ) -> EditResult:
+        """Async version of edit."""
+        return await self._run_io(self.edit, file_path, old_string, new_string, replace_all)
+
+    def _grep_base(self, pattern: str, path: str | None) -> Path | list[GrepMatch] | str:
+        """Validate a grep request and resolve its base path.
+
+        Returns the base path to search, or the final grep result (an error
+        string or an empty list) when there is nothing to search.
+        """
         # Validate regex
         try:
-            re.compile(pattern)
+            compile_regex(pattern)
         except re.error as e:
             return f"Invalid regex pattern: {e}"
 
@@ -325,98 +465,286 @@ class FilesystemBackend(BackendProtocol):
 
         if not base_full.exists():
             return []
+        return base_full
 
-        # Try ripgrep first
-        results = self._ripgrep_search(pattern, base_full, glob)
-        if results is None:
-            results = self._python_search(pattern, base_full, glob)
-
-        matches: list[GrepMatch] = []
+    def _grep_matches(self, results: dict[str, list[tuple[int, str]]], truncated: bool) -> GrepMatchList:
+        matches = GrepMatchList(truncated=truncated)
         for fpath, items in results.items():
             for line_num, line_text in items:
+                if self.grep_max_matches is not None and len(matches) >= self.grep_max_matches:
+                    matches.truncated = True
+                    return matches
                 matches.append({"path": fpath, "line": int(line_num), "text": line_text})
         return matches
 
-    def _ripgrep_search(self, pattern: str, base_full: Path, include_glob: str | None) -> dict[str, list[tuple[int, str]]] | None:
+    def grep_raw(
+        self,
+        pattern: str,
+        path: str | None = None,
+        glob: str | None = None,
+    ) -> list[GrepMatch] | str:
+        base_full = self._grep_base(pattern, path)
+        if not isinstance(base_full, Path):
+            return base_full
+
+        results: dict[str, list[tuple[int, str]]]
+        truncated = False
+        if self.content_index is not None:
+            results = self._indexed_search(pattern, base_full, glob)
+        else:
+            # Try ripgrep first
+            rg_results = self._ripgrep_search(pattern, base_full, glob)
+            if rg_results is not None:
+                results, truncated = rg_results
+            else:
+                results = self._python_search(pattern, base_full, glob)
+        return self._grep_matches(results, truncated)
+
+    async def agrep_raw(
+        self,
+        pattern: str,
+        path: str | None = None,
+        glob: str | None = None,
+    ) -> list[GrepMatch] | str:
+        """Async version of grep_raw.
+
+        ripgrep runs as an asyncio subprocess; validating the request and the
+        index and Python fallbacks run off the event loop, like the other
+        async methods.
+        """
+        base_full = await self._run_io(self._grep_base, pattern, path)
+        if not isinstance(base_full, Path):
+            return base_full
+
+        results: dict[str, list[tuple[int, str]]]
+        truncated = False
+        if self.content_index is not None:
+            results = await self._run_io(self._indexed_search, pattern, base_full, glob)
+        else:
+            rg_results = await self._aripgrep_search(pattern, base_full, glob)
+            if rg_results is not None:
+                results, truncated = rg_results
+            else:
+                results = await self._run_io(self._python_search, pattern, base_full, glob)
+        return self._grep_matches(results, truncated)
+
+    def _ripgrep_command(self, pattern: str, base_full: Path, include_glob: str | None) -> list[str]:
         cmd = ["rg", "--json"]
         if include_glob:
             cmd.extend(["--glob", include_glob])
         cmd.extend(["--", pattern, str(base_full)])
+        return cmd
 
+    def _ripgrep_search(
+        self,
+        pattern: str,
+        base_full: Path,
+        include_glob: str | None,
+    ) -> tuple[dict[str, list[tuple[int, str]]], bool] | None:
+        """Run ripgrep and parse its JSON events as they are produced.
+
+        rg's stdout is consumed line by line instead of being buffered in full,
+        and the process is killed as soon as the configured match or output
+        byte budget is exhausted.
+
+        Returns:
+            Tuple of (results, truncated), or None if ripgrep is unavailable or
+            timed out so the caller can fall back to the Python search.
+        """
         try:
-            proc = subprocess.run(  # noqa: S603
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=30,
-                check=False,
+            proc = subprocess.Popen(  # noqa: S603
+                self._ripgrep_command(pattern, base_full, include_glob),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
             )
-        except (subprocess.TimeoutExpired, FileNotFoundError):
+        except FileNotFoundError:
             return None
 
-        results: dict[str, list[tuple[int, str]]] = {}
-        for line in proc.stdout.splitlines():
-            try:
-                data = json.loads(line)
-            except json.JSONDecodeError:
-                continue
-            if data.get("type") != "match":
-                continue
-            pdata = data.get("data", {})
-            ftext = pdata.get("path", {}).get("text")
-            if not ftext:
-                continue
-            p = Path(ftext)
-            if self.virtual_mode:
-                try:
-                    virt = "/" + str(p.resolve().relative_to(self.cwd))
-                except Exception:
-                    continue
-            else:
-                virt = str(p)
-            ln = pdata.get("line_number")
-            lt = pdata.get("lines", {}).get("text", "").rstrip("\n")
-            if ln is None:
-                continue
-            results.setdefault(virt, []).append((int(ln), lt))
+        timed_out = threading.Event()
+
+        def _on_timeout() -> None:
+            timed_out.set()
+            proc.kill()
 
+        timer = threading.Timer(_RIPGREP_TIMEOUT_SECONDS, _on_timeout)
+        timer.start()
+
+        collector = _RipgrepCollector(self)
+        try:
+            for raw in proc.stdout or ():
+                if not collector.feed(raw):
+                    break
+        finally:
+            timer.cancel()
+            if proc.poll() is None:
+                proc.kill()
+            if proc.stdout is not None:
+                proc.stdout.close()
+            proc.wait()
+
+        if timed_out.is_set():
+            return None
+        return collector.results, collector.truncated
+
+    async def _aripgrep_search(
+        self,
+        pattern: str,
+        base_full: Path,
+        include_glob: str | None,
+    ) -> tuple[dict[str, list[tuple[int, str]]], bool] | None:
+        """Async version of _ripgrep_search built on asyncio subprocesses."""
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *self._ripgrep_command(pattern, base_full, include_glob),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+                limit=_RIPGREP_MAX_LINE_BYTES,
+            )
+        except FileNotFoundError:
+            return None
+
+        collector = _RipgrepCollector(self)
+        try:
+            async with asyncio.timeout(_RIPGREP_TIMEOUT_SECONDS):
+                while proc.stdout is not None and (raw := await proc.stdout.readline()):
+                    if not collector.feed(raw):
+                        break
+        except (TimeoutError, ValueError):
+            # Timed out, or a single output line exceeded the stream limit
+            return None
+        finally:
+            if proc.returncode is None:
+                proc.kill()
+            await proc.wait()
+        return collector.results, collector.truncated
+
+    def _to_virtual_path(self, fp: Path) -> str | None:
+        if not self.virtual_mode:
+            return str(fp)
+        try:
+            return "/" + str(fp.resolve().relative_to(self.cwd))
+        except Exception:
+            return None
+
+    def _walk(self, root: str, *, hidden: bool, ignore_files: bool, prune_dirs: tuple[str, ...]) -> list[CachedEntry]:
+        """Walk root with the backend's walker and cache settings."""
+        return walk_files(
+            root,
+            ignore_files=ignore_files,
+            hidden=hidden,
+            prune_dirs=prune_dirs,
+            workers=self.walk_workers,
+            listdir=self.tree_cache.listdir if self.tree_cache is not None else scan_directory,
+        )
+
+    def _grep_files(self, base_full: Path) -> list[CachedEntry]:
+        """Files a grep under base_full covers, selected the way ripgrep selects them.
+
+        Hidden and ignored files are skipped, except that an explicitly named
+        file is always searched.
+        """
+        if base_full.is_dir():
+            return self._walk(str(base_full), hidden=False, ignore_files=self.respect_ignore_files, prune_dirs=self.prune_dirs)
+        parent = str(base_full.parent)
+        try:
+            return [entry for entry in self._list_dir(parent) if entry.path == str(base_full) and entry.is_file]
+        except OSError:
+            return []
+
+    def _get_grep_pool(self) -> ProcessPoolExecutor:
+        """Return the process pool used by the Python grep fallback, creating it on first use."""
+        with self._io_executor_lock:
+            if self._grep_pool is None:
+                # fork is unsafe once the backend's own threads exist
+                context: BaseContext
+                if "forkserver" in multiprocessing.get_all_start_methods():
+                    context = multiprocessing.get_context("forkserver")
+                else:
+                    context = multiprocessing.get_context("spawn")
+                self._grep_pool = ProcessPoolExecutor(max_workers=self.grep_processes, mp_context=context)
+            return self._grep_pool
+
+    def _search_paths(self, pattern: str, paths: list[str]) -> list[tuple[str, list[tuple[int, str]]]]:
+        """Search files serially, or sharded across the grep process pool for large batches."""
+        if self.grep_processes <= 1 or len(paths) < _PARALLEL_GREP_MIN_FILES:
+            return search_files(pattern, paths)
+        # Several chunks per process so a few large files don't leave workers idle
+        size = max(1, -(-len(paths) // (self.grep_processes * 4)))
+        chunks = [paths[i : i + size] for i in range(0, len(paths), size)]
+        pool = self._get_grep_pool()
+        results: list[tuple[str, list[tuple[int, str]]]] = []
+        try:
+            for chunk_results in pool.map(search_files, itertools.repeat(pattern), chunks):
+                results.extend(chunk_results)
+        except BrokenProcessPool:
+            # A worker died (OOM killer, missing __main__ guard, ...). Drop the
+            # pool so the next search starts a fresh one and finish serially.
+            self._discard_grep_pool(pool)
+            return search_files(pattern, paths)
+        return results
+
+    def _discard_grep_pool(self, pool: ProcessPoolExecutor) -> None:
+        with self._io_executor_lock:
+            if self._grep_pool is pool:
+                self._grep_pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def close(self) -> None:
+        """Release the backend's worker pools, directory cache and content index.
+
+        Shuts down the I/O thread pool and grep worker processes, if they
+        were started, and closes the directory cache and the content index
+        database. The backend stays usable; later calls start new pools as
+        needed, list directories without the cache and grep without the
+        index.
+        """
+        with self._io_executor_lock:
+            pool, self._grep_pool = self._grep_pool, None
+            executor, self._io_executor = self._io_executor, None
+            tree_cache, self.tree_cache = self.tree_cache, None
+            content_index, self.content_index = self.content_index, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+        if executor is not None:
+            executor.shutdown(wait=True)
+        if tree_cache is not None:
+            # Releases the inotify instance, of which a user gets 128 by default
+            tree_cache.close()
+        if content_index is not None:
+            content_index.close()
+
+    def _collect_matches(self, pattern: str, paths: list[str], include_glob: str | None) -> dict[str, list[tuple[int, str]]]:
+        if include_glob:
+            matcher = compile_glob(include_glob, wcglob.BRACE)
+            paths = [p for p in paths if matcher.match(os.path.basename(p))]  # noqa: PTH119
+        results: dict[str, list[tuple[int, str]]] = {}
+        for path, file_matches in self._search_paths(pattern, paths):
+            virt_path = self._to_virtual_path(Path(path))
+            if virt_path is not None:
+                results[virt_path] = file_matches
         return results
 
     def _python_search(self, pattern: str, base_full: Path, include_glob: str | None) -> dict[str, list[tuple[int, str]]]:
         try:
-            regex = re.compile(pattern)
+            compile_regex(pattern)
         except re.error:
             return {}
 
-        results: dict[str, list[tuple[int, str]]] = {}
-        root = base_full if base_full.is_dir() else base_full.parent
+        paths = [entry.path for entry in self._grep_files(base_full) if entry.size is not None and entry.size <= self.max_file_size_bytes]
+        return self._collect_matches(pattern, paths, include_glob)
 
-        for fp in root.rglob("*"):
-            if not fp.is_file():
-                continue
-            if include_glob and not wcglob.globmatch(fp.name, include_glob, flags=wcglob.BRACE):
-                continue
-            try:
-                if fp.stat().st_size > self.max_file_size_bytes:
-                    continue
-            except OSError:
-                continue
-            try:
-                content = fp.read_text()
-            except (UnicodeDecodeError, PermissionError, OSError):
-                continue
-            for line_num, line in enumerate(content.splitlines(), 1):
-                if regex.search(line):
-                    if self.virtual_mode:
-                        try:
-                            virt_path = "/" + str(fp.resolve().relative_to(self.cwd))
-                        except Exception:
-                            continue
-                    else:
-                        virt_path = str(fp)
-                    results.setdefault(virt_path, []).append((line_num, line))
+    def _indexed_search(self, pattern: str, base_full: Path, include_glob: str | None) -> dict[str, list[tuple[int, str]]]:
+        """Search only the files the trigram index reports as candidates."""
+        try:
+            compile_regex(pattern)
+        except re.error:
+            return {}
 
-        return results
+        index = self.content_index
+        if index is None:
+            return {}
+        index.refresh(base_full, self._grep_files(base_full))
+        return self._collect_matches(pattern, index.candidates(pattern, base_full), include_glob)
 
     def glob_info(self, pattern: str, path: str = "/") -> list[FileInfo]:
         if pattern.startswith("/"):
@@ -426,62 +754,93 @@ class FilesystemBackend(BackendProtocol):
         if not search_path.exists() or not search_path.is_dir():
             return []
 
-        results: list[FileInfo] = []
-        try:
-            # Use recursive globbing to match files in subdirectories as tests expect
-            for matched_path in search_path.rglob(pattern):
-                try:
-                    is_file = matched_path.is_file()
-                except OSError:
-                    continue
-                if not is_file:
-                    continue
-                abs_path = str(matched_path)
-                if not self.virtual_mode:
-                    try:
-                        st = matched_path.stat()
-                        results.append(
-                            {
-                                "path": abs_path,
-                                "is_dir": False,
-                                "size": int(st.st_size),
-                                "modified_at": datetime.fromtimestamp(st.st_mtime).isoformat(),
-                            }
-                        )
-                    except OSError:
-                        results.append({"path": abs_path, "is_dir": False})
-                else:
-                    cwd_str = str(self.cwd)
-                    if not cwd_str.endswith("/"):
-                        cwd_str += "/"
-                    if abs_path.startswith(cwd_str):
-                        relative_path = abs_path[len(cwd_str) :]
-                    elif abs_path.startswith(str(self.cwd)):
-                        relative_path = abs_path[len(str(self.cwd)) :].lstrip("/")
-                    else:
-                        relative_path = abs_path
-                    virt = "/" + relative_path
-                    try:
-                        st = matched_path.stat()
-                        results.append(
-                            {
-                                "path": virt,
-                                "is_dir": False,
-                                "size": int(st.st_size),
-                                "modified_at": datetime.fromtimestamp(st.st_mtime).isoformat(),
-                            }
-                        )
-                    except OSError:
-                        results.append({"path": virt, "is_dir": False})
-        except (OSError, ValueError):
-            pass
-
+        # Path.rglob(pattern) semantics: match "**/" + pattern, where "*" also
+        # matches dotfiles
+        full_pattern = "**/" + pattern
+        matcher = compile_glob(full_pattern, wcglob.GLOBSTAR | wcglob.DOTGLOB)
+        base = str(search_path)
+        prefix_len = len(base.rstrip("/")) + 1
+        filtered = self.glob_respect_ignore_files
+        entries = self._walk(base, hidden=True, ignore_files=filtered, prune_dirs=self.prune_dirs if filtered else ())
+        results = [self._entry_info(entry) for entry in entries if matcher.match(entry.path[prefix_len:])]
         results.sort(key=lambda x: x.get("path", ""))
         return results
 
+    async def aglob_info(self, pattern: str, path: str = "/") -> list[FileInfo]:
+        """Async version of glob_info."""
+        return await self._run_io(self.glob_info, pattern, path)
+
+    def _get_io_executor(self) -> ThreadPoolExecutor:
+        """Return the shared pool used for batched file I/O, creating it on first use."""
+        with self._io_executor_lock:
+            if self._io_executor is None:
+                self._io_executor = ThreadPoolExecutor(max_workers=self.max_io_workers, thread_name_prefix="deepagents-fs-io")
+            return self._io_executor
+
+    async def _run_io(self, fn: Callable[..., _R], *args: object) -> _R:
+        """Run a blocking call on the backend's I/O pool, or the loop's default executor without one."""
+        loop = asyncio.get_running_loop()
+        executor = self._get_io_executor() if self.max_io_workers > 1 else None
+        return await loop.run_in_executor(executor, functools.partial(fn, *args))
+
+    def _io_chunks(self, items: list[_T]) -> list[list[_T]]:
+        # One contiguous slice per worker keeps per-task overhead negligible for
+        # batches of many small files
+        size = -(-len(items) // self.max_io_workers)
+        return [items[i : i + size] for i in range(0, len(items), size)]
+
+    def _map_io(self, fn: Callable[[_T], _R], items: list[_T]) -> list[_R]:
+        """Apply fn to every item, concurrently when worthwhile, preserving order."""
+        if self.max_io_workers <= 1 or len(items) <= 1:
+            return [fn(item) for item in items]
+        results: list[_R] = []
+        for chunk_results in self._get_io_executor().map(lambda chunk: [fn(item) for item in chunk], self._io_chunks(items)):
+            results.extend(chunk_results)
+        return results
+
+    async def _amap_io(self, fn: Callable[[_T], _R], items: list[_T]) -> list[_R]:
+        """Async version of _map_io; never blocks a pool worker on other pool work."""
+        if self.max_io_workers <= 1 or len(items) <= 1:
+            return await self._run_io(lambda: [fn(item) for item in items])
+        chunk_results = await asyncio.gather(*(self._run_io(lambda chunk=chunk: [fn(item) for item in chunk]) for chunk in self._io_chunks(items)))
+        return [result for chunk in chunk_results for result in chunk]
+
+    def _upload_one(self, path: str, content: bytes) -> FileUploadResponse:
+        try:
+            resolved_path = self._resolve_path(path)
+
+            # Create parent directories if needed
+            resolved_path.parent.mkdir(parents=True, exist_ok=True)
+
+            flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC
+            if hasattr(os, "O_NOFOLLOW"):
+                flags |= os.O_NOFOLLOW
+            fd = os.open(resolved_path, flags, 0o644)
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+
+            self._line_indexes.invalidate(str(resolved_path))
+            if self.tree_cache is not None:
+                self.tree_cache.invalidate(str(resolved_path))
+            if self.content_index is not None:
+                self.content_index.update_file(resolved_path)
+            return FileUploadResponse(path=path, error=None)
+        except FileNotFoundError:
+            return FileUploadResponse(path=path, error="file_not_found")
+        except PermissionError:
+            return FileUploadResponse(path=path, error="permission_denied")
+        except (ValueError, OSError):
+            # ValueError from _resolve_path for path traversal, OSError for other file errors
+            return FileUploadResponse(path=path, error="invalid_path")
+
     def upload_files(self, files: list[tuple[str, bytes]]) -> list[FileUploadResponse]:
         """Upload multiple files to the filesystem.
 
+        With `max_io_workers` > 1, files are written concurrently on a bounded
+        thread pool. A batch in which several paths resolve to the same file
+        is written serially so the last entry wins, as it would in a plain
+        loop.
+
         Args:
             files: List of (path, content) tuples where content is bytes.
 
@@ -489,62 +848,64 @@ class FilesystemBackend(BackendProtocol):
             List of FileUploadResponse objects, one per input file.
             Response order matches input order.
         """
-        responses: list[FileUploadResponse] = []
-        for path, content in files:
+        if self.max_io_workers <= 1 or self._has_shared_targets([path for path, _ in files]):
+            return [self._upload_one(path, content) for path, content in files]
+        return self._map_io(lambda item: self._upload_one(*item), files)
+
+    async def aupload_files(self, files: list[tuple[str, bytes]]) -> list[FileUploadResponse]:
+        """Async version of upload_files."""
+        if self.max_io_workers <= 1 or self._has_shared_targets([path for path, _ in files]):
+            return await self._run_io(lambda: [self._upload_one(path, content) for path, content in files])
+        return await self._amap_io(lambda item: self._upload_one(*item), files)
+
+    def _has_shared_targets(self, paths: list[str]) -> bool:
+        """Whether two paths, such as "/a" and "a", resolve to the same file."""
+        targets: set[str] = set()
+        for path in paths:
             try:
-                resolved_path = self._resolve_path(path)
-
-                # Create parent directories if needed
-                resolved_path.parent.mkdir(parents=True, exist_ok=True)
-
-                flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC
-                if hasattr(os, "O_NOFOLLOW"):
-                    flags |= os.O_NOFOLLOW
-                fd = os.open(resolved_path, flags, 0o644)
-                with os.fdopen(fd, "wb") as f:
-                    f.write(content)
-
-                responses.append(FileUploadResponse(path=path, error=None))
-            except FileNotFoundError:
-                responses.append(FileUploadResponse(path=path, error="file_not_found"))
-            except PermissionError:
-                responses.append(FileUploadResponse(path=path, error="permission_denied"))
-            except (ValueError, OSError) as e:
-                # ValueError from _resolve_path for path traversal, OSError for other file errors
-                if isinstance(e, ValueError) or "invalid" in str(e).lower():
-                    responses.append(FileUploadResponse(path=path, error="invalid_path"))
-                else:
-                    # Generic error fallback
-                    responses.append(FileUploadResponse(path=path, error="invalid_path"))
+                target = str(self._resolve_path(path))
+            except ValueError:
+                # Rejected by _upload_one without touching the filesystem
+                continue
+            if target in targets:
+                return True
+            targets.add(target)
+        return False
 
-        return responses
+    def _download_one(self, path: str) -> FileDownloadResponse:
+        try:
+            resolved_path = self._resolve_path(path)
+            # Use flags to optionally prevent symlink following if
+            # supported by the OS
+            fd = os.open(resolved_path, os.O_RDONLY | getattr(os, "O_NOFOLLOW", 0))
+            with os.fdopen(fd, "rb") as f:
+                content = read_bytes(f, mmap_threshold=self.mmap_threshold_bytes)
+            return FileDownloadResponse(path=path, content=content, error=None)
+        except FileNotFoundError:
+            return FileDownloadResponse(path=path, content=None, error="file_not_found")
+        except PermissionError:
+            return FileDownloadResponse(path=path, content=None, error="permission_denied")
+        except IsADirectoryError:
+            return FileDownloadResponse(path=path, content=None, error="is_directory")
+        except ValueError:
+            return FileDownloadResponse(path=path, content=None, error="invalid_path")
+        # Let other errors propagate
 
     def download_files(self, paths: list[str]) -> list[FileDownloadResponse]:
         """Download multiple files from the filesystem.
 
+        With `max_io_workers` > 1, files are read concurrently on a bounded
+        thread pool.
+
         Args:
             paths: List of file paths to download.
 
         Returns:
             List of FileDownloadResponse objects, one per input path.
+            Response order matches input order.
         """
-        responses: list[FileDownloadResponse] = []
-        for path in paths:
-            try:
-                resolved_path = self._resolve_path(path)
-                # Use flags to optionally prevent symlink following if
-                # supported by the OS
-                fd = os.open(resolved_path, os.O_RDONLY | getattr(os, "O_NOFOLLOW", 0))
-                with os.fdopen(fd, "rb") as f:
-                    content = f.read()
-                responses.append(FileDownloadResponse(path=path, content=content, error=None))
-            except FileNotFoundError:
-                responses.append(FileDownloadResponse(path=path, content=None, error="file_not_found"))
-            except PermissionError:
-                responses.append(FileDownloadResponse(path=path, content=None, error="permission_denied"))
-            except IsADirectoryError:
-                responses.append(FileDownloadResponse(path=path, content=None, error="is_directory"))
-            except ValueError:
-                responses.append(FileDownloadResponse(path=path, content=None, error="invalid_path"))
-            # Let other errors propagate
-        return responses
+        return self._map_io(self._download_one, paths)
+
+    async def adownload_files(self, paths: list[str]) -> list[FileDownloadResponse]:
+        """Async version of download_files."""
+        return await self._amap_io(self._download_one, paths)
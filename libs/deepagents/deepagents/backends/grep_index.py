@@ -0,0 +1,182 @@
+"""Trigram index narrowing `StoreBackend.grep_raw` to candidate files.
+
+Without an index, grep has to fetch and scan every file of a store namespace.
+With `StoreBackend(grep_index=True)`, every write also records which
+three-character substrings (trigrams) the file contains, in a sibling
+namespace `<namespace>_grep`:
+
+- `(<namespace>_grep, "t", <hex of trigram>)` holds one empty item per file
+  containing the trigram, keyed by file path (the posting list).
+- `(<namespace>_grep, "f")` holds, per file path, the trigrams it was last
+  indexed with, so a later edit only adds and removes the difference.
+
+Trigrams are taken after lowercasing ASCII letters, so case-insensitive
+patterns can use the index too. A grep pattern narrows the search if it
+contains a literal run of at least three characters that every match must
+include; the candidates are the files listed under each of its trigrams. The
+regex is still run on the candidates, so the index only has to be a superset.
+Patterns without such a run fall back to scanning.
+
+`rebuild_store_grep_index` (re)builds the index of an existing namespace.
+"""
+
+import re
+from collections.abc import Iterable
+from re import _parser as sre_parse  # type: ignore[attr-defined]
+from typing import Any
+
+from langgraph.store.base import BaseStore, GetOp, Item, PutOp
+
+from deepagents.backends.utils import file_data_to_string
+
+_GREP_SUFFIX = "_grep"
+_TRIGRAM_LEN = 3
+_MAX_QUERY_TRIGRAMS = 8
+_REBUILD_PAGE_SIZE = 500
+_REBUILD_BATCH_SIZE = 1000
+
+_ASCII_LOWER = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+
+# Under re.IGNORECASE without re.ASCII these also match non-ASCII characters
+# (e.g. "k" matches the Kelvin sign), which ASCII lowercasing does not cover.
+_UNICODE_FOLDING = frozenset("IKSiks")
+
+_REPEATS = (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT, getattr(sre_parse, "POSSESSIVE_REPEAT", None))
+
+
+def grep_index_namespace(namespace: tuple[str, ...]) -> tuple[str, ...]:
+    """Return the namespace holding the grep index of namespace."""
+    return (*namespace[:-1], namespace[-1] + _GREP_SUFFIX)
+
+
+def _posting_namespace(namespace: tuple[str, ...], trigram: str) -> tuple[str, ...]:
+    # Hex keeps labels free of periods and other characters stores reject
+    return (*grep_index_namespace(namespace), "t", trigram.encode("utf-8").hex())
+
+
+def _manifest_namespace(namespace: tuple[str, ...]) -> tuple[str, ...]:
+    return (*grep_index_namespace(namespace), "f")
+
+
+def file_trigrams(content: str) -> set[str]:
+    """Return the trigrams content is indexed under."""
+    text = content.translate(_ASCII_LOWER)
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def _literal_runs(items: Iterable[tuple[Any, Any]], *, ignorecase: bool, ascii_only: bool) -> list[str]:
+    """Return literal strings that every match of the parsed pattern contains."""
+    runs: list[str] = []
+    run: list[str] = []
+    for op, av in items:
+        if op is sre_parse.LITERAL:
+            char = chr(av)
+            if not ignorecase or (char.isascii() and (ascii_only or char not in _UNICODE_FOLDING)):
+                run.append(char)
+                continue
+        runs.append("".join(run))
+        run = []
+        if op is sre_parse.SUBPATTERN:
+            _group, add_flags, del_flags, sub = av
+            inner = (ignorecase or bool(add_flags & re.IGNORECASE)) and not del_flags & re.IGNORECASE
+            runs.extend(_literal_runs(sub, ignorecase=inner, ascii_only=ascii_only))
+        elif op in _REPEATS and av[0] >= 1:
+            runs.extend(_literal_runs(av[2], ignorecase=ignorecase, ascii_only=ascii_only))
+    runs.append("".join(run))
+    return [r for r in runs if len(r) >= _TRIGRAM_LEN]
+
+
+def required_trigrams(pattern: str) -> list[str] | None:
+    """Return trigrams every file matching pattern contains, or None if there are none.
+
+    At most eight trigrams are returned, non-overlapping ones first.
+    """
+    try:
+        parsed = sre_parse.parse(pattern)
+    except re.error:
+        return None
+    flags = parsed.state.flags
+    runs = _literal_runs(parsed, ignorecase=bool(flags & re.IGNORECASE), ascii_only=bool(flags & re.ASCII))
+    trigrams: list[str] = []
+    for offset in (0, 1, 2):
+        for run in runs:
+            text = run.translate(_ASCII_LOWER)
+            trigrams.extend(text[i : i + 3] for i in range(offset, len(text) - 2, 3))
+    unique = list(dict.fromkeys(trigrams))[:_MAX_QUERY_TRIGRAMS]
+    return unique or None
+
+
+def manifest_get_ops(namespace: tuple[str, ...], paths: Iterable[str]) -> list[GetOp]:
+    """Return the ops fetching the trigrams the given files were last indexed with."""
+    return [GetOp(_manifest_namespace(namespace), path) for path in paths]
+
+
+def index_ops(namespace: tuple[str, ...], path: str, content: str | None, previous: object) -> list[PutOp]:
+    """Return the ops updating the index of the file at path.
+
+    Args:
+        namespace: Namespace of the files.
+        path: Path of the file.
+        content: New content of the file, or None if it was removed.
+        previous: Result of the file's `manifest_get_ops` op.
+    """
+    old = set(previous.value.get("trigrams", [])) if isinstance(previous, Item) else set()
+    new = file_trigrams(content) if content is not None else set()
+    ops = [PutOp(_posting_namespace(namespace, t), path, None) for t in sorted(old - new)]
+    ops.extend(PutOp(_posting_namespace(namespace, t), path, {}, index=False) for t in sorted(new - old))
+    if content is None:
+        ops.append(PutOp(_manifest_namespace(namespace), path, None))
+    elif old != new or not isinstance(previous, Item):
+        ops.append(PutOp(_manifest_namespace(namespace), path, {"trigrams": sorted(new)}, index=False))
+    return ops
+
+
+def posting_namespaces(namespace: tuple[str, ...], trigrams: Iterable[str]) -> list[tuple[str, ...]]:
+    """Return the namespaces listing the files that contain each trigram."""
+    return [_posting_namespace(namespace, t) for t in trigrams]
+
+
+def _search_all(store: BaseStore, namespace: tuple[str, ...]) -> list[Item]:
+    items: list[Item] = []
+    while True:
+        page = store.search(namespace, limit=_REBUILD_PAGE_SIZE, offset=len(items))
+        items.extend(page)
+        if len(page) < _REBUILD_PAGE_SIZE:
+            return items
+
+
+def _item_content(item: Item) -> str | None:
+    try:
+        return file_data_to_string(item.value)
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def rebuild_store_grep_index(store: BaseStore, namespace: tuple[str, ...] = ("filesystem",)) -> int:
+    """Bring the grep index of a store namespace up to date with its files.
+
+    Meant to be run once, e.g. from a maintenance script, before enabling
+    `grep_index` on a namespace that already holds files, or after files were
+    written without the index. Files whose index is current are not rewritten,
+    and index entries of files that no longer exist are removed. The content of
+    every file is read once.
+
+    Args:
+        store: Store holding the files.
+        namespace: Namespace of the files, as used by `StoreBackend`
+            (`("filesystem",)`, or `(assistant_id, "filesystem")`).
+
+    Returns:
+        Number of files indexed.
+    """
+    contents = {item.key: _item_content(item) for item in _search_all(store, namespace) if item.namespace == namespace}
+    contents = {path: content for path, content in contents.items() if content is not None}
+    indexed = {item.key: item for item in _search_all(store, _manifest_namespace(namespace))}
+    ops: list[PutOp] = []
+    for path, content in contents.items():
+        ops.extend(index_ops(namespace, path, content, indexed.get(path)))
+    for path in indexed.keys() - contents.keys():
+        ops.extend(index_ops(namespace, path, None, indexed[path]))
+    for start in range(0, len(ops), _REBUILD_BATCH_SIZE):
+        store.batch(ops[start : start + _REBUILD_BATCH_SIZE])
+    return len(contents)
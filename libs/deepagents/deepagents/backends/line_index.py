@@ -0,0 +1,172 @@
+r"""Sparse newline index and mmap-backed paging for large files.
+
+Paging through a large file with `offset`/`limit` should not require decoding
+and splitting the whole file on every call. `LineIndex` records, for fixed-size
+byte chunks of a file, how many newlines precede each chunk. Locating a line
+is then a bisection over the chunk table plus a short forward scan inside one
+chunk, so a page read costs time proportional to the page, not to the file.
+
+Indexes are cached per path in a `LineIndexCache` and invalidated whenever the
+file's mtime or size changes.
+
+Lines are split on `\n`, with a trailing `\r` stripped, which matches
+`str.splitlines()` for LF and CRLF files. `str.splitlines()` also breaks on
+lone `\r`, `\v`, `\f`, `\x1c`-`\x1e`, U+0085, U+2028 and U+2029; the index
+records whether a file contains any of them, and `read_page` returns None for
+such files so callers read them through their regular path.
+"""
+
+import mmap
+import os
+import re
+import stat
+import threading
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import BinaryIO
+
+CHUNK_BYTES = 64 * 1024
+"""Byte distance between consecutive checkpoints of a LineIndex."""
+
+_NON_WHITESPACE = re.compile(rb"\S")
+# Line boundaries of str.splitlines() other than \n and \r\n, in UTF-8
+_OTHER_LINE_BREAKS = re.compile(rb"[\x0b\x0c\x1c-\x1e]|\xc2\x85|\xe2\x80[\xa8\xa9]|\r(?=[^\n])")
+
+
+@dataclass
+class LineIndex:
+    r"""Sparse newline offset table for one version of a file.
+
+    Attributes:
+        mtime_ns: Modification time of the file the index was built from.
+        size: Size in bytes of the file the index was built from.
+        total_lines: Number of lines, counted like `str.splitlines()` for
+            newline-terminated text.
+        lines_before: Number of newlines before the start of each chunk.
+        newline_only: Whether `\n` and `\r\n` are the only line boundaries in
+            the file, so that splitting on `\n` matches `str.splitlines()`.
+    """
+
+    mtime_ns: int
+    size: int
+    total_lines: int
+    lines_before: array
+    newline_only: bool = True
+
+    @classmethod
+    def build(cls, mm: mmap.mmap, *, mtime_ns: int, size: int) -> "LineIndex":
+        """Scan a mapped file once and build its chunk table."""
+        lines_before = array("q")
+        newlines = 0
+        newline_only = True
+        for chunk_start in range(0, size, CHUNK_BYTES):
+            lines_before.append(newlines)
+            # mmap.count() is 3.13+, so count over a bounded per-chunk copy
+            chunk = mm[chunk_start : chunk_start + CHUNK_BYTES]
+            newlines += chunk.count(b"\n")
+            if newline_only:
+                # Two bytes of overlap catch breaks spanning the chunk boundary
+                newline_only = _OTHER_LINE_BREAKS.search(chunk + mm[chunk_start + CHUNK_BYTES : chunk_start + CHUNK_BYTES + 2]) is None
+        total_lines = newlines
+        if size and mm[size - 1 : size] != b"\n":
+            total_lines += 1
+        return cls(mtime_ns=mtime_ns, size=size, total_lines=total_lines, lines_before=lines_before, newline_only=newline_only)
+
+    def line_start(self, mm: mmap.mmap, line: int) -> int:
+        """Return the byte offset at which the 0-indexed line begins."""
+        if line <= 0:
+            return 0
+        # The line starts right after the line-th newline; find the chunk holding it
+        chunk = bisect_left(self.lines_before, line) - 1
+        pos = chunk * CHUNK_BYTES - 1
+        for _ in range(line - self.lines_before[chunk]):
+            pos = mm.find(b"\n", pos + 1)
+        return pos + 1
+
+
+class LineIndexCache:
+    """Bounded, thread-safe LRU cache of LineIndex objects keyed by path."""
+
+    def __init__(self, max_entries: int = 32) -> None:
+        """Create an empty cache holding at most max_entries indexes."""
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, LineIndex] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: str, mm: mmap.mmap, st: os.stat_result) -> LineIndex:
+        """Return the index for path, rebuilding it if the file changed."""
+        with self._lock:
+            index = self._entries.get(path)
+            if index is not None and index.mtime_ns == st.st_mtime_ns and index.size == st.st_size:
+                self._entries.move_to_end(path)
+                return index
+        index = LineIndex.build(mm, mtime_ns=st.st_mtime_ns, size=st.st_size)
+        with self._lock:
+            self._entries[path] = index
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return index
+
+    def invalidate(self, path: str) -> None:
+        """Forget the index for path, if any."""
+        with self._lock:
+            self._entries.pop(path, None)
+
+
+def read_page(fd: int, path: str, offset: int, limit: int, cache: LineIndexCache) -> list[str] | str | None:
+    r"""Read lines [offset, offset + limit) of an open file via mmap.
+
+    Args:
+        fd: Open, readable file descriptor. It is not closed.
+        path: Path used as the cache key.
+        offset: First line to return (0-indexed).
+        limit: Maximum number of lines to return.
+        cache: Cache holding the file's LineIndex.
+
+    Returns:
+        The selected lines, or an error/warning string matching the wording
+        of the regular read path. None if the file has line boundaries other
+        than `\n` and `\r\n`, which the caller must split itself.
+
+    Raises:
+        UnicodeDecodeError: If the selected lines are not valid UTF-8.
+    """
+    st = os.fstat(fd)
+    if st.st_size == 0:
+        return "System reminder: File exists but has empty contents"
+    with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mm:
+        if _NON_WHITESPACE.search(mm) is None:
+            return "System reminder: File exists but has empty contents"
+        index = cache.get(path, mm, st)
+        if not index.newline_only:
+            return None
+        if offset >= index.total_lines:
+            return f"Error: Line offset {offset} exceeds file length ({index.total_lines} lines)"
+
+        start = index.line_start(mm, offset)
+        end = start - 1
+        count = min(limit, index.total_lines - offset)
+        for _ in range(count):
+            end = mm.find(b"\n", end + 1)
+            if end == -1:
+                end = st.st_size
+                break
+        text = mm[start:end].decode("utf-8")
+
+    return [line.removesuffix("\r") for line in text.split("\n")][:count]
+
+
+def read_bytes(f: BinaryIO, *, mmap_threshold: int) -> bytes:
+    """Read a whole open binary file, copying large payloads from a mapping.
+
+    Regular files of at least mmap_threshold bytes are copied out of a
+    read-only mapping in a single slice instead of through the buffered reader.
+    """
+    st = os.fstat(f.fileno())
+    if stat.S_ISREG(st.st_mode) and st.st_size >= mmap_threshold:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return mm[:]
+    return f.read()
@@ -0,0 +1,91 @@
+"""Sorted-key index over a StateBackend `files` mapping.
+
+Listing, globbing and grepping agent state used to test every key with
+`startswith` on each call. `PathIndex` keeps the keys sorted, so the keys under
+a prefix form one contiguous run that is found by bisection. A directory
+listing jumps over each subdirectory's run instead of visiting its files.
+
+Backends are usually created per tool call, so indexes are cached at module
+level by the identity of the files dict. LangGraph's reducer builds a new dict
+for every state update, but dicts can also be changed in place (e.g. by
+`CompositeBackend`), and a freed dict's id can be reused. A cached index is
+therefore only used while the dict has exactly the keys it was built from.
+Indexes hold the keys only, never the files dict or its FileData, so the
+cache does not keep agent state alive.
+"""
+
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Any
+
+_MAX_INDEXES = 8
+
+# "0" is the character right after "/", so "<dir>0" sorts after every "<dir>/..." key
+_AFTER_SLASH = chr(ord("/") + 1)
+
+
+class PathIndex:
+    """Sorted keys of one files mapping."""
+
+    def __init__(self, files: dict[str, Any]) -> None:
+        """Index the keys of files."""
+        self.keys = sorted(files)
+        self._key_set = frozenset(self.keys)
+
+    def is_current(self, files: dict[str, Any]) -> bool:
+        """Return whether files has exactly the keys this index was built from."""
+        return len(files) == len(self.keys) and files.keys() == self._key_set
+
+    def with_prefix(self, prefix: str) -> list[str]:
+        """Return the keys starting with prefix, sorted."""
+        keys = self.keys
+        start = bisect_left(keys, prefix)
+        end = start
+        while end < len(keys) and keys[end].startswith(prefix):
+            end += 1
+        return keys[start:end]
+
+    def list_dir(self, prefix: str) -> tuple[list[str], list[str]]:
+        """Return the files directly under prefix and its immediate subdirectories.
+
+        Args:
+            prefix: Directory path ending with "/".
+
+        Returns:
+            File keys and subdirectory paths (ending with "/"), both sorted.
+        """
+        keys = self.keys
+        files: list[str] = []
+        subdirs: list[str] = []
+        i = bisect_left(keys, prefix)
+        while i < len(keys) and keys[i].startswith(prefix):
+            slash = keys[i].find("/", len(prefix))
+            if slash == -1:
+                files.append(keys[i])
+                i += 1
+                continue
+            subdir = keys[i][:slash]
+            subdirs.append(subdir + "/")
+            i = bisect_left(keys, subdir + _AFTER_SLASH, i)
+        return files, subdirs
+
+
+_indexes: OrderedDict[int, PathIndex] = OrderedDict()
+_lock = threading.Lock()
+
+
+def get_path_index(files: dict[str, Any]) -> PathIndex:
+    """Return the index of files, building it on first use."""
+    with _lock:
+        index = _indexes.get(id(files))
+        if index is not None and index.is_current(files):
+            _indexes.move_to_end(id(files))
+            return index
+    index = PathIndex(files)
+    with _lock:
+        _indexes[id(files)] = index
+        _indexes.move_to_end(id(files))
+        while len(_indexes) > _MAX_INDEXES:
+            _indexes.popitem(last=False)
+    return index
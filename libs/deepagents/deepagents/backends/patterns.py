@@ -0,0 +1,31 @@
+"""Process-wide caches of compiled regexes and glob matchers.
+
+Backends see the same grep patterns and globs over and over, and
+`wcglob.globmatch` re-parses its pattern for every path it tests. Compiling
+through these caches parses each pattern once and reuses the compiled object
+for every path and every later call. Both caches are bounded LRUs.
+"""
+
+import functools
+import re
+
+import wcmatch.glob as wcglob
+
+REGEX_CACHE_SIZE = 256
+GLOB_CACHE_SIZE = 256
+
+
+@functools.lru_cache(maxsize=REGEX_CACHE_SIZE)
+def compile_regex(pattern: str, flags: int = 0) -> re.Pattern[str]:
+    """Return `re.compile(pattern, flags)`, cached.
+
+    Raises:
+        re.error: If pattern is not a valid regex.
+    """
+    return re.compile(pattern, flags)
+
+
+@functools.lru_cache(maxsize=GLOB_CACHE_SIZE)
+def compile_glob(pattern: str, flags: int = 0) -> wcglob.WcMatcher[str]:
+    """Return a matcher equivalent to `wcglob.globmatch(path, pattern, flags=flags)`, cached."""
+    return wcglob.compile(pattern, flags=flags)
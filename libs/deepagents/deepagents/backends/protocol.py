@@ -7,7 +7,7 @@ database, etc.) and provide a uniform interface for file operations.
 
 import abc
 import asyncio
-from collections.abc import Callable
+from collections.abc import Callable, Iterable
 from dataclasses import dataclass
 from typing import Any, Literal, NotRequired, TypeAlias
 
@@ -19,6 +19,7 @@ FileOperationError = Literal[
     "permission_denied",  # Both: access denied
     "is_directory",  # Download: tried to download directory as file
     "invalid_path",  # Both: path syntax malformed (parent dir missing, invalid chars)
+    "backend_unavailable",  # Both: the backend holding the path failed to process the batch
 ]
 """Standardized error codes for file upload/download operations.
 
@@ -28,6 +29,8 @@ These represent common, recoverable errors that an LLM can understand and potent
 - permission_denied: Access denied for the operation
 - is_directory: Attempted to download a directory as a file
 - invalid_path: Path syntax is malformed or contains invalid characters
+- backend_unavailable: The backend holding the path raised an error; set by
+  `CompositeBackend` for the files of a failed backend
 """
 
 
@@ -106,6 +109,49 @@ class GrepMatch(TypedDict):
     text: str
 
 
+class GrepMatchList(list[GrepMatch]):
+    """List of grep matches that also records whether the search stopped early.
+
+    Backends that cap the amount of work a single grep may do return this
+    instead of a plain list. It is a regular list in every other respect, so
+    callers that only iterate over matches are unaffected.
+
+    Attributes:
+        truncated: True if the backend stopped searching before it had seen
+            every match, e.g. because a match or output budget was reached.
+        unavailable: Locations that could not be searched at all because
+            their backend failed or timed out (see `CompositeBackend`).
+    """
+
+    truncated: bool
+    unavailable: list[str]
+
+    def __init__(self, matches: Iterable[GrepMatch] = (), *, truncated: bool = False, unavailable: Iterable[str] = ()) -> None:
+        """Initialize from an iterable of matches, a truncation flag and the unsearched locations."""
+        super().__init__(matches)
+        self.truncated = truncated
+        self.unavailable = list(unavailable)
+
+
+class FileInfoList(list[FileInfo]):
+    """List of file infos that also records the locations that could not be listed.
+
+    It is a regular list in every other respect, so callers that only iterate
+    over the infos are unaffected.
+
+    Attributes:
+        unavailable: Locations that could not be searched because their
+            backend failed or timed out (see `CompositeBackend`).
+    """
+
+    unavailable: list[str]
+
+    def __init__(self, infos: Iterable[FileInfo] = (), *, unavailable: Iterable[str] = ()) -> None:
+        """Initialize from an iterable of file infos and the unsearched locations."""
+        super().__init__(infos)
+        self.unavailable = list(unavailable)
+
+
 @dataclass
 class WriteResult:
     """Result from backend write operations.
@@ -170,6 +216,15 @@ class BackendProtocol(abc.ABC):
         "created_at": str, # ISO format timestamp
         "modified_at": str, # ISO format timestamp
     }
+    or, in the compact encoding (see `deepagents.backends.utils.create_file_data`):
+    {
+        "version": 2,
+        "encoding": "utf-8" | "zstd",
+        "content": str | bytes, # Whole content, optionally zstd-compressed
+        "size": int, # Content length in characters
+        "created_at": int, # Epoch microseconds
+        "modified_at": int, # Epoch microseconds
+    }
     """
 
     def ls_info(self, path: str) -> list["FileInfo"]:
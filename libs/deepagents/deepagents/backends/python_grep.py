@@ -0,0 +1,66 @@
+r"""Pure-Python grep used by FilesystemBackend when ripgrep is unavailable.
+
+Files are matched the way `rg --json` reports them, so the fallback returns the
+same lines as the ripgrep path:
+
+- binary files (containing a NUL byte) are skipped;
+- lines are split on `\n` only, keeping any `\r`;
+- invalid UTF-8 is decoded with replacement characters instead of skipping
+  the file.
+
+Before a file is decoded, its raw bytes are checked with `bytes.find` for the
+longest literal every match must contain. Most files in a large tree are
+rejected by that check alone. The check is skipped for case-insensitive
+patterns.
+
+`search_files()` is a top-level function so it can run in a process pool.
+Compiled patterns are cached per process, so each worker compiles a pattern
+once no matter how many chunks of files it receives.
+"""
+
+import functools
+import re
+from collections.abc import Iterable
+
+from deepagents.backends.patterns import compile_regex
+from deepagents.backends.utils import extract_required_literals
+
+
+@functools.lru_cache(maxsize=64)
+def compile_search(pattern: str) -> tuple[re.Pattern[str], bytes | None]:
+    """Compile pattern and pick the literal used to prefilter raw file bytes."""
+    regex = compile_regex(pattern)
+    literal = None
+    if not regex.flags & re.IGNORECASE:
+        literals = extract_required_literals(pattern)
+        if literals:
+            literal = literals[0].encode("utf-8")
+    return regex, literal
+
+
+def search_file(path: str, pattern: str) -> list[tuple[int, str]]:
+    """Return the (line number, line) pairs of path that match pattern."""
+    regex, literal = compile_search(pattern)
+    try:
+        with open(path, "rb") as f:  # noqa: PTH123
+            data = f.read()
+    except OSError:
+        return []
+    if literal is not None and data.find(literal) == -1:
+        return []
+    if b"\0" in data:
+        return []
+    lines = data.decode("utf-8", errors="replace").split("\n")
+    if lines[-1] == "":
+        lines.pop()
+    return [(line_num, line) for line_num, line in enumerate(lines, 1) if regex.search(line)]
+
+
+def search_files(pattern: str, paths: Iterable[str]) -> list[tuple[str, list[tuple[int, str]]]]:
+    """Search several files, returning only those with matches, in input order."""
+    results: list[tuple[str, list[tuple[int, str]]]] = []
+    for path in paths:
+        matches = search_file(path, pattern)
+        if matches:
+            results.append((path, matches))
+    return results
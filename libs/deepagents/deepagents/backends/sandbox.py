@@ -7,10 +7,16 @@ only need to implement the execute() method.
 
 from __future__ import annotations
 
+import asyncio
 import base64
 import json
 import shlex
+import uuid
+import zlib
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from functools import partial
+from typing import TYPE_CHECKING, Any
 
 from deepagents.backends.protocol import (
     EditResult,
@@ -19,9 +25,22 @@ from deepagents.backends.protocol import (
     FileInfo,
     FileUploadResponse,
     GrepMatch,
+    GrepMatchList,
     SandboxBackendProtocol,
     WriteResult,
 )
+from deepagents.backends.sandbox_helper import (
+    HELPER_DIR,
+    READ_PAGE_FUNCTION,
+    helper_request_command,
+    helper_start_command,
+    helper_stop_command,
+    parse_helper_response,
+)
+from deepagents.backends.utils import MAX_LINE_LENGTH
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
 
 _GLOB_COMMAND_TEMPLATE = """python3 -c "
 import glob
@@ -102,49 +121,294 @@ with open('{file_path}', 'w') as f:
 print(count)
 " 2>&1"""
 
-_READ_COMMAND_TEMPLATE = """python3 -c "
+# Writes and edits of large content: the content was staged to files first
+_WRITE_STAGED_COMMAND_TEMPLATE = """python3 -c "
 import os
+import shutil
 import sys
 
 file_path = '{file_path}'
-offset = {offset}
-limit = {limit}
+staged = '{staged}'
 
-# Check if file exists
-if not os.path.isfile(file_path):
-    print('Error: File not found')
+# Check if file already exists (atomic with write)
+if os.path.exists(file_path):
+    os.remove(staged)
+    print(f'Error: File \\'{file_path}\\' already exists', file=sys.stderr)
     sys.exit(1)
 
-# Check if file is empty
-if os.path.getsize(file_path) == 0:
-    print('System reminder: File exists but has empty contents')
-    sys.exit(0)
-
-# Read file with offset and limit
-with open(file_path, 'r') as f:
-    lines = f.readlines()
-
-# Apply offset and limit
-start_idx = offset
-end_idx = offset + limit
-selected_lines = lines[start_idx:end_idx]
-
-# Format with line numbers (1-indexed, starting from offset + 1)
-for i, line in enumerate(selected_lines):
-    line_num = offset + i + 1
-    # Remove trailing newline for formatting, then add it back
-    line_content = line.rstrip('\\n')
-    print(f'{{line_num:6d}}\\t{{line_content}}')
+# Create parent directory if needed
+parent_dir = os.path.dirname(file_path) or '.'
+os.makedirs(parent_dir, exist_ok=True)
+
+shutil.copyfile(staged, file_path)
+os.remove(staged)
+" 2>&1"""
+
+_EDIT_STAGED_COMMAND_TEMPLATE = """python3 -c "
+import os
+import sys
+
+def take(path):
+    with open(path, 'rb') as f:
+        data = f.read().decode('utf-8')
+    os.remove(path)
+    return data
+
+old = take('{old_staged}')
+new = take('{new_staged}')
+
+with open('{file_path}', 'r') as f:
+    text = f.read()
+
+count = text.count(old)
+if count == 0:
+    sys.exit(1)  # String not found
+elif count > 1 and not {replace_all}:
+    sys.exit(2)  # Multiple occurrences without replace_all
+
+if {replace_all}:
+    result = text.replace(old, new)
+else:
+    result = text.replace(old, new, 1)
+
+with open('{file_path}', 'w') as f:
+    f.write(result)
+
+print(count)
+" 2>&1"""
+
+# Decodes a file staged in base64 chunks (optionally zlib-compressed)
+_DECODE_STAGED_COMMAND_TEMPLATE = """python3 -c "
+import base64
+import os
+import zlib
+
+staged = '{staged}'
+with open(staged + '.b64') as f:
+    data = base64.b64decode(f.read())
+if {compressed}:
+    data = zlib.decompress(data)
+with open(staged, 'wb') as f:
+    f.write(data)
+os.remove(staged + '.b64')
 " 2>&1"""
 
+# Literal search with ripgrep when the sandbox has it, else grep. rg's JSON
+# events are filtered down to matches; grep separates the path with NUL (-Z),
+# so paths containing colons parse. Both stop once `caps` closes the pipe.
+_GREP_COMMAND_TEMPLATE = """if command -v rg >/dev/null 2>&1; then
+echo rg
+rg --json --fixed-strings --hidden --no-ignore --no-messages {rg_glob} -e {pattern} -- {path} | grep -F '{{"type":"match"'{caps}
+else
+echo grep
+grep -rHnFIZ {grep_glob} -e {pattern} -- {path} 2>/dev/null{caps}
+fi"""
+
+# Base64 characters per chunk command, well below the 128 KiB limit on one
+# argument (MAX_ARG_STRLEN) that a `sh -c` command string is subject to
+_STAGE_CHUNK_CHARS = 96 * 1024
+
+_READ_COMMAND_TEMPLATE = """python3 -c "
+import sys
+{read_page}
+out = []
+code = read_page('{file_path}', {offset}, {limit}, {index_dir}, {max_line}, out)
+sys.stdout.write(''.join(out))
+sys.exit(code)
+" 2>&1"""
+
+
+@dataclass
+class _PreparedOp:
+    """A file operation as a command, plus the parser of the command's result."""
+
+    op: str | None
+    """Name of the operation in the sandbox helper, or None if it does not serve it."""
+
+    args: dict[str, Any]
+    command: str
+    parse: Callable[[ExecuteResponse], Any]
+
+
+def _parse_ls(result: ExecuteResponse) -> list[FileInfo]:
+    file_infos: list[FileInfo] = []
+    for line in result.output.strip().split("\n"):
+        if not line:
+            continue
+        try:
+            data = json.loads(line)
+            file_infos.append({"path": data["path"], "is_dir": data["is_dir"]})
+        except json.JSONDecodeError:
+            continue
+
+    return file_infos
+
+
+def _parse_read(file_path: str, result: ExecuteResponse) -> str:
+    output = result.output.rstrip()
+    exit_code = result.exit_code
+
+    if exit_code != 0 or "Error: File not found" in output:
+        return f"Error: File '{file_path}' not found"
+
+    return output
+
+
+def _parse_write(file_path: str, result: ExecuteResponse) -> WriteResult:
+    # Check for errors (exit code or error message in output)
+    if result.exit_code != 0 or "Error:" in result.output:
+        error_msg = result.output.strip() or f"Failed to write file '{file_path}'"
+        return WriteResult(error=error_msg)
+
+    # External storage - no files_update needed
+    return WriteResult(path=file_path, files_update=None)
+
+
+def _parse_edit(file_path: str, old_string: str, result: ExecuteResponse) -> EditResult:
+    exit_code = result.exit_code
+    output = result.output.strip()
+
+    if exit_code == 1:
+        return EditResult(error=f"Error: String not found in file: '{old_string}'")
+    if exit_code == 2:  # noqa: PLR2004
+        return EditResult(error=f"Error: String '{old_string}' appears multiple times. Use replace_all=True to replace all occurrences.")
+    if exit_code != 0:
+        return EditResult(error=f"Error: File '{file_path}' not found")
+
+    count = int(output)
+    # External storage - no files_update needed
+    return EditResult(path=file_path, files_update=None, occurrences=count)
+
+
+def _parse_rg_match(line: str) -> GrepMatch | None:
+    try:
+        data = json.loads(line)["data"]
+        path = data["path"]
+        lines = data["lines"]
+        # rg reports paths and lines that are not valid UTF-8 base64-encoded
+        path_text = path["text"] if "text" in path else base64.b64decode(path["bytes"]).decode("utf-8", errors="replace")
+        text = lines["text"] if "text" in lines else base64.b64decode(lines["bytes"]).decode("utf-8", errors="replace")
+        return {"path": path_text, "line": int(data["line_number"]), "text": text.rstrip("\n")}
+    except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+        return None
+
+
+def _parse_grep_match(line: str) -> GrepMatch | None:
+    # Format is: path NUL line_number:text
+    path, sep, rest = line.partition("\0")
+    line_number, _, text = rest.partition(":")
+    if not sep or not line_number.isdigit():
+        return None
+    return {"path": path, "line": int(line_number), "text": text}
+
+
+def _parse_grep(max_matches: int | None, max_output_bytes: int | None, result: ExecuteResponse) -> GrepMatchList:
+    # The first line names the tool that searched; the caps were applied by
+    # reading one match line and one byte more than allowed
+    engine, _, output = result.output.partition("\n")
+    truncated = result.truncated
+    encoded = output.encode("utf-8")
+    if max_output_bytes is not None and len(encoded) > max_output_bytes:
+        truncated = True
+        output = encoded[:max_output_bytes].decode("utf-8", errors="ignore")
+    lines = output.split("\n")
+    lines.pop()  # Empty, or a line that was cut off
+    if max_matches is not None and len(lines) > max_matches:
+        truncated = True
+        del lines[max_matches:]
+
+    parse = _parse_rg_match if engine == "rg" else _parse_grep_match
+    matches = GrepMatchList(truncated=truncated)
+    for line in lines:
+        match = parse(line)
+        if match is not None:
+            matches.append(match)
+    return matches
+
+
+def _parse_glob(result: ExecuteResponse) -> list[FileInfo]:
+    output = result.output.strip()
+    if not output:
+        return []
+
+    # Parse JSON output into FileInfo dicts
+    file_infos: list[FileInfo] = []
+    for line in output.split("\n"):
+        try:
+            data = json.loads(line)
+            file_infos.append(
+                {
+                    "path": data["path"],
+                    "is_dir": data["is_dir"],
+                }
+            )
+        except json.JSONDecodeError:
+            continue
+
+    return file_infos
+
+
+_BATCH_METHODS = ("ls_info", "read", "write", "edit", "glob_info", "grep_raw")
+
+# Flushes of coalesced calls still running, referenced so they are not garbage collected
+_flush_tasks: set[asyncio.Task[None]] = set()
+
 
 class BaseSandbox(SandboxBackendProtocol, ABC):
     """Base sandbox implementation with execute() as abstract method.
 
     This class provides default implementations for all protocol methods
     using shell commands. Subclasses only need to implement execute().
+
+    Set `use_helper` to serve file operations from a long-lived helper
+    process inside the sandbox instead of starting `python3` for each one (see
+    `deepagents.backends.sandbox_helper`). If the helper cannot be installed,
+    the commands are run as usual.
+    """
+
+    use_helper: bool = False
+    """Whether to run ls/read/write/edit/glob through the sandbox helper process."""
+
+    helper_dir: str = HELPER_DIR
+    """Directory inside the sandbox the helper is installed in."""
+
+    batch_window: float | None = 0.0
+    """Seconds concurrent async ls/read/glob/grep calls wait to be sent as one batch.
+
+    With 0, the calls made in the same event loop iteration (e.g. the tool
+    calls of one model turn) are batched. None runs every call on its own.
+    """
+
+    large_write_threshold: int = 64 * 1024
+    """Size in bytes above which write content and edit strings are staged in files.
+
+    Smaller content is embedded in the command. Larger content is uploaded
+    with `upload_files`, or sent in base64 chunks of separate commands if
+    that fails, and the write or edit then runs on the staged files.
     """
 
+    max_write_size: int = 64 * 1024 * 1024
+    """Largest write content, or edit old and new strings together, in bytes."""
+
+    compress_transfers: bool = True
+    """Whether content sent in chunks is zlib-compressed when that makes it smaller."""
+
+    grep_max_matches: int | None = 1000
+    """Most matches a grep returns; None for no limit. Capped results are flagged truncated."""
+
+    grep_max_output_bytes: int | None = 1024 * 1024
+    """Most bytes of search output a grep transfers; None for no limit. Capped results are flagged truncated."""
+
+    read_index_dir: str | None = "/tmp/deepagents-line-index"  # noqa: S108
+    """Sandbox directory caching the line offsets of files read, or None to not cache them.
+
+    With the cache, reading a later page of a large file seeks close to the
+    page instead of scanning the file from the start.
+    """
+
+    _helper_ready: bool | None = None
+    _pending: tuple[asyncio.AbstractEventLoop, list[tuple[_PreparedOp, asyncio.Future[Any]]]] | None = None
+
     @abstractmethod
     def execute(
         self,
@@ -160,8 +424,162 @@ class BaseSandbox(SandboxBackendProtocol, ABC):
         """
         ...
 
-    def ls_info(self, path: str) -> list[FileInfo]:
-        """Structured listing with file metadata using os.scandir."""
+    def _run_file_op(self, op: str | None, args: dict[str, Any], command: str) -> ExecuteResponse:
+        """Run a file operation through the helper if enabled, otherwise run command.
+
+        Args:
+            op: Name of the operation in the helper, or None if it does not serve it.
+            args: Arguments of the operation.
+            command: Equivalent command template, run when the helper is not used.
+
+        Returns:
+            Output and exit code of the operation.
+        """
+        if op is None or not self.use_helper or self._helper_ready is False:
+            return self.execute(command)
+        request = helper_request_command(op, args, self.helper_dir)
+        if request is None:
+            return self.execute(command)
+        for _attempt in range(2):
+            if self._helper_ready is None:
+                self._helper_ready = self.execute(helper_start_command(self.helper_dir)).exit_code == 0
+                if not self._helper_ready:
+                    break
+            response = parse_helper_response(self.execute(request))
+            if response is not None:
+                return response
+            # The helper exited (e.g. after idling): start it again once
+            self._helper_ready = None
+        return self.execute(command)
+
+    def stop_helper(self) -> None:
+        """Stop the sandbox helper process, if it is running."""
+        if self.use_helper:
+            self.execute(helper_stop_command(self.helper_dir))
+        self._helper_ready = None
+
+    def _run_file_ops(self, prepared: list[_PreparedOp]) -> list[ExecuteResponse]:
+        """Run several file operations with a single execute() call.
+
+        Operations whose output was lost (e.g. to truncation), or that the
+        helper failed to answer, are run again on their own.
+        """
+        if len(prepared) == 1:
+            return [self._run_file_op(prepared[0].op, prepared[0].args, prepared[0].command)]
+        use_helper = self.use_helper and self._helper_ready is not False
+        if use_helper and self._helper_ready is None:
+            self._helper_ready = use_helper = self.execute(helper_start_command(self.helper_dir)).exit_code == 0
+        requests = [helper_request_command(p.op, p.args, self.helper_dir) if use_helper and p.op is not None else None for p in prepared]
+        commands = [request or p.command for p, request in zip(prepared, requests, strict=True)]
+        responses = self._execute_many(commands)
+        results: list[ExecuteResponse] = []
+        for p, command, raw in zip(prepared, commands, responses, strict=True):
+            response = parse_helper_response(raw) if raw is not None and command is not p.command else raw
+            results.append(response if response is not None else self._run_file_op(p.op, p.args, p.command))
+        return results
+
+    def _execute_many(self, commands: list[str]) -> list[ExecuteResponse | None]:
+        """Run commands in sequence in one execute() call.
+
+        Each command runs in a subshell and is followed by a marker line with
+        its exit code, which splits the combined output.
+
+        Returns:
+            Output and exit code per command, or None where the output is
+            incomplete.
+        """
+        marker = f"__deepagents_batch_{uuid.uuid4().hex}__"
+        script = "\n".join(f"(\n{command}\n)\nprintf '\\n{marker} %s\\n' $?" for command in commands)
+        parts = self.execute(script).output.split(f"\n{marker} ")
+        responses: list[ExecuteResponse | None] = [None] * len(commands)
+        output = parts[0]
+        for i, part in enumerate(parts[1 : len(commands) + 1]):
+            exit_code, _, rest = part.partition("\n")
+            if not exit_code.isdigit():
+                break
+            responses[i] = ExecuteResponse(output=output, exit_code=int(exit_code))
+            output = rest
+        return responses
+
+    def _run_prepared(self, prepared: _PreparedOp) -> Any:  # noqa: ANN401
+        return prepared.parse(self._run_file_op(prepared.op, prepared.args, prepared.command))
+
+    def batch(self, operations: list[tuple[str, dict[str, Any]]]) -> list[Any]:
+        """Run several file operations in one round trip to the sandbox.
+
+        The operations run in order, in a single execute() call.
+
+        Args:
+            operations: (method name, keyword arguments) pairs, where the
+                method is one of ls_info, read, write, edit, glob_info and
+                grep_raw, e.g. `("read", {"file_path": "/a.txt"})`.
+
+        Returns:
+            The result of each operation, as its method returns it, in order.
+
+        Raises:
+            ValueError: If an operation names another method.
+        """
+        prepared = []
+        for name, kwargs in operations:
+            if name not in _BATCH_METHODS:
+                msg = f"Cannot batch {name!r}; expected one of {', '.join(_BATCH_METHODS)}"
+                raise ValueError(msg)
+            prepared.append(getattr(self, f"_prepare_{name}")(**kwargs))
+        if not prepared:
+            return []
+        return [p.parse(response) for p, response in zip(prepared, self._run_file_ops(prepared), strict=True)]
+
+    async def abatch(self, operations: list[tuple[str, dict[str, Any]]]) -> list[Any]:
+        """Async version of batch."""
+        return await asyncio.to_thread(self.batch, operations)
+
+    async def _acoalesce(self, name: str, **kwargs: Any) -> Any:  # noqa: ANN401
+        """Run a read-only file operation, batched with the concurrent ones.
+
+        Calls made within `batch_window` of the first one are sent together
+        in one execute() call. Methods overridden by a subclass run on their
+        own.
+        """
+        if self.batch_window is None or getattr(type(self), name) is not getattr(BaseSandbox, name):
+            return await asyncio.to_thread(getattr(self, name), **kwargs)
+        prepared = getattr(self, f"_prepare_{name}")(**kwargs)
+        loop = asyncio.get_running_loop()
+        if self._pending is not None and self._pending[0] is not loop:
+            return await asyncio.to_thread(self._run_prepared, prepared)
+        future: asyncio.Future[Any] = loop.create_future()
+        if self._pending is None:
+            self._pending = (loop, [])
+            loop.call_later(self.batch_window, self._start_flush)
+        self._pending[1].append((prepared, future))
+        return await future
+
+    def _start_flush(self) -> None:
+        if self._pending is None:
+            return
+        loop, pending = self._pending
+        self._pending = None
+        task = loop.create_task(self._flush(pending))
+        _flush_tasks.add(task)
+        task.add_done_callback(_flush_tasks.discard)
+
+    async def _flush(self, pending: list[tuple[_PreparedOp, asyncio.Future[Any]]]) -> None:
+        try:
+            responses = await asyncio.to_thread(self._run_file_ops, [prepared for prepared, _ in pending])
+        except Exception as e:  # noqa: BLE001  # delivered to every caller
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (prepared, future), response in zip(pending, responses, strict=True):
+            if future.done():  # The caller was cancelled
+                continue
+            try:
+                future.set_result(prepared.parse(response))
+            except Exception as e:  # noqa: BLE001
+                future.set_exception(e)
+
+    def _prepare_ls_info(self, path: str) -> _PreparedOp:
         cmd = f"""python3 -c "
 import os
 import json
@@ -181,20 +599,28 @@ except FileNotFoundError:
 except PermissionError:
     pass
 " 2>/dev/null"""
+        return _PreparedOp("ls", {"path": path}, cmd, _parse_ls)
 
-        result = self.execute(cmd)
+    def ls_info(self, path: str) -> list[FileInfo]:
+        """Structured listing with file metadata using os.scandir."""
+        return self._run_prepared(self._prepare_ls_info(path))
 
-        file_infos: list[FileInfo] = []
-        for line in result.output.strip().split("\n"):
-            if not line:
-                continue
-            try:
-                data = json.loads(line)
-                file_infos.append({"path": data["path"], "is_dir": data["is_dir"]})
-            except json.JSONDecodeError:
-                continue
+    async def als_info(self, path: str) -> list[FileInfo]:
+        """Async version of ls_info, batched with concurrent calls."""
+        return await self._acoalesce("ls_info", path=path)
 
-        return file_infos
+    def _prepare_read(self, file_path: str, offset: int = 0, limit: int = 2000) -> _PreparedOp:
+        # Use template for reading file with offset and limit
+        cmd = _READ_COMMAND_TEMPLATE.format(
+            read_page=READ_PAGE_FUNCTION,
+            file_path=file_path,
+            offset=offset,
+            limit=limit,
+            index_dir=repr(self.read_index_dir),
+            max_line=MAX_LINE_LENGTH,
+        )
+        args = {"file_path": file_path, "offset": offset, "limit": limit, "index_dir": self.read_index_dir, "max_line": MAX_LINE_LENGTH}
+        return _PreparedOp("read", args, cmd, partial(_parse_read, file_path))
 
     def read(
         self,
@@ -203,17 +629,66 @@ except PermissionError:
         limit: int = 2000,
     ) -> str:
         """Read file content with line numbers using a single shell command."""
-        # Use template for reading file with offset and limit
-        cmd = _READ_COMMAND_TEMPLATE.format(file_path=file_path, offset=offset, limit=limit)
-        result = self.execute(cmd)
+        return self._run_prepared(self._prepare_read(file_path, offset, limit))
+
+    async def aread(
+        self,
+        file_path: str,
+        offset: int = 0,
+        limit: int = 2000,
+    ) -> str:
+        """Async version of read, batched with concurrent calls."""
+        return await self._acoalesce("read", file_path=file_path, offset=offset, limit=limit)
+
+    def _stage(self, blobs: list[bytes]) -> list[str] | None:
+        """Put blobs into temporary files in the sandbox.
 
-        output = result.output.rstrip()
-        exit_code = result.exit_code
+        Returns:
+            Paths of the files, or None if the transfer failed.
+        """
+        paths = [f"/tmp/.deepagents-staged-{uuid.uuid4().hex}" for _ in blobs]  # noqa: S108
+        try:
+            responses = self.upload_files(list(zip(paths, blobs, strict=True)))
+        except Exception:  # noqa: BLE001  # e.g. NotImplementedError: send the content in chunks
+            responses = []
+        if len(responses) == len(paths) and all(r.error is None for r in responses):
+            return paths
+        for path, blob in zip(paths, blobs, strict=True):
+            if not self._stage_chunked(path, blob):
+                return None
+        return paths
+
+    def _stage_chunked(self, path: str, blob: bytes) -> bool:
+        """Write blob to path with commands carrying base64 chunks of it."""
+        compressed = zlib.compress(blob) if self.compress_transfers else blob
+        use_compressed = len(compressed) < len(blob)
+        encoded = base64.b64encode(compressed if use_compressed else blob).decode("ascii")
+        target = shlex.quote(path + ".b64")
+        for start in range(0, len(encoded), _STAGE_CHUNK_CHARS):
+            redirect = ">" if start == 0 else ">>"
+            if self.execute(f"printf '%s' '{encoded[start : start + _STAGE_CHUNK_CHARS]}' {redirect} {target}").exit_code != 0:
+                return False
+        return self.execute(_DECODE_STAGED_COMMAND_TEMPLATE.format(staged=path, compressed=use_compressed)).exit_code == 0
+
+    def _prepare_write(self, file_path: str, content: str) -> _PreparedOp:
+        data = content.encode("utf-8")
+        if len(data) > self.max_write_size:
+            error = WriteResult(error=f"Error: Content of {len(data)} bytes exceeds the {self.max_write_size} byte limit for writing '{file_path}'")
+            return _PreparedOp(None, {}, "true", lambda _: error)
+        if len(data) > self.large_write_threshold:
+            staged = self._stage([data])
+            if staged is None:
+                error = WriteResult(error=f"Error: Failed to transfer content for '{file_path}' to the sandbox")
+                return _PreparedOp(None, {}, "true", lambda _: error)
+            cmd = _WRITE_STAGED_COMMAND_TEMPLATE.format(file_path=file_path, staged=staged[0])
+            return _PreparedOp(None, {}, cmd, partial(_parse_write, file_path))
 
-        if exit_code != 0 or "Error: File not found" in output:
-            return f"Error: File '{file_path}' not found"
+        # Encode content as base64 to avoid any escaping issues
+        content_b64 = base64.b64encode(data).decode("ascii")
 
-        return output
+        # Single atomic check + write command
+        cmd = _WRITE_COMMAND_TEMPLATE.format(file_path=file_path, content_b64=content_b64)
+        return _PreparedOp("write", {"file_path": file_path, "content": content}, cmd, partial(_parse_write, file_path))
 
     def write(
         self,
@@ -221,20 +696,30 @@ except PermissionError:
         content: str,
     ) -> WriteResult:
         """Create a new file. Returns WriteResult; error populated on failure."""
-        # Encode content as base64 to avoid any escaping issues
-        content_b64 = base64.b64encode(content.encode("utf-8")).decode("ascii")
+        return self._run_prepared(self._prepare_write(file_path, content))
+
+    def _prepare_edit(self, file_path: str, old_string: str, new_string: str, replace_all: bool = False) -> _PreparedOp:  # noqa: FBT001, FBT002
+        old_data, new_data = old_string.encode("utf-8"), new_string.encode("utf-8")
+        size = len(old_data) + len(new_data)
+        if size > self.max_write_size:
+            error = EditResult(error=f"Error: Edit strings of {size} bytes exceed the {self.max_write_size} byte limit for editing '{file_path}'")
+            return _PreparedOp(None, {}, "true", lambda _: error)
+        if size > self.large_write_threshold:
+            staged = self._stage([old_data, new_data])
+            if staged is None:
+                error = EditResult(error=f"Error: Failed to transfer edit strings for '{file_path}' to the sandbox")
+                return _PreparedOp(None, {}, "true", lambda _: error)
+            cmd = _EDIT_STAGED_COMMAND_TEMPLATE.format(file_path=file_path, old_staged=staged[0], new_staged=staged[1], replace_all=replace_all)
+            return _PreparedOp(None, {}, cmd, partial(_parse_edit, file_path, old_string))
 
-        # Single atomic check + write command
-        cmd = _WRITE_COMMAND_TEMPLATE.format(file_path=file_path, content_b64=content_b64)
-        result = self.execute(cmd)
-
-        # Check for errors (exit code or error message in output)
-        if result.exit_code != 0 or "Error:" in result.output:
-            error_msg = result.output.strip() or f"Failed to write file '{file_path}'"
-            return WriteResult(error=error_msg)
+        # Encode strings as base64 to avoid any escaping issues
+        old_b64 = base64.b64encode(old_data).decode("ascii")
+        new_b64 = base64.b64encode(new_data).decode("ascii")
 
-        # External storage - no files_update needed
-        return WriteResult(path=file_path, files_update=None)
+        # Use template for string replacement
+        cmd = _EDIT_COMMAND_TEMPLATE.format(file_path=file_path, old_b64=old_b64, new_b64=new_b64, replace_all=replace_all)
+        args = {"file_path": file_path, "old": old_string, "new": new_string, "replace_all": replace_all}
+        return _PreparedOp("edit", args, cmd, partial(_parse_edit, file_path, old_string))
 
     def edit(
         self,
@@ -244,27 +729,24 @@ except PermissionError:
         replace_all: bool = False,
     ) -> EditResult:
         """Edit a file by replacing string occurrences. Returns EditResult."""
-        # Encode strings as base64 to avoid any escaping issues
-        old_b64 = base64.b64encode(old_string.encode("utf-8")).decode("ascii")
-        new_b64 = base64.b64encode(new_string.encode("utf-8")).decode("ascii")
-
-        # Use template for string replacement
-        cmd = _EDIT_COMMAND_TEMPLATE.format(file_path=file_path, old_b64=old_b64, new_b64=new_b64, replace_all=replace_all)
-        result = self.execute(cmd)
-
-        exit_code = result.exit_code
-        output = result.output.strip()
-
-        if exit_code == 1:
-            return EditResult(error=f"Error: String not found in file: '{old_string}'")
-        if exit_code == 2:
-            return EditResult(error=f"Error: String '{old_string}' appears multiple times. Use replace_all=True to replace all occurrences.")
-        if exit_code != 0:
-            return EditResult(error=f"Error: File '{file_path}' not found")
-
-        count = int(output)
-        # External storage - no files_update needed
-        return EditResult(path=file_path, files_update=None, occurrences=count)
+        return self._run_prepared(self._prepare_edit(file_path, old_string, new_string, replace_all))
+
+    def _prepare_grep_raw(self, pattern: str, path: str | None = None, glob: str | None = None) -> _PreparedOp:
+        # Keep at most one match line and one byte more than the caps, so
+        # parsing can tell a capped result from one that just fits
+        caps = ""
+        if self.grep_max_matches is not None:
+            caps += f" | head -n {self.grep_max_matches + 1}"
+        if self.grep_max_output_bytes is not None:
+            caps += f" | head -c {self.grep_max_output_bytes + 1}"
+        cmd = _GREP_COMMAND_TEMPLATE.format(
+            pattern=shlex.quote(pattern),
+            path=shlex.quote(path or "."),
+            rg_glob=f"--glob {shlex.quote(glob)}" if glob else "",
+            grep_glob=f"--include={shlex.quote(glob)}" if glob else "",
+            caps=caps,
+        )
+        return _PreparedOp(None, {}, cmd, partial(_parse_grep, self.grep_max_matches, self.grep_max_output_bytes))
 
     def grep_raw(
         self,
@@ -273,70 +755,32 @@ except PermissionError:
         glob: str | None = None,
     ) -> list[GrepMatch] | str:
         """Structured search results or error string for invalid input."""
-        search_path = shlex.quote(path or ".")
+        return self._run_prepared(self._prepare_grep_raw(pattern, path, glob))
 
-        # Build grep command to get structured output
-        grep_opts = "-rHnF"  # recursive, with filename, with line number, fixed-strings (literal)
-
-        # Add glob pattern if specified
-        glob_pattern = ""
-        if glob:
-            glob_pattern = f"--include='{glob}'"
-
-        # Escape pattern for shell
-        pattern_escaped = shlex.quote(pattern)
-
-        cmd = f"grep {grep_opts} {glob_pattern} -e {pattern_escaped} {search_path} 2>/dev/null || true"
-        result = self.execute(cmd)
-
-        output = result.output.rstrip()
-        if not output:
-            return []
-
-        # Parse grep output into GrepMatch objects
-        matches: list[GrepMatch] = []
-        for line in output.split("\n"):
-            # Format is: path:line_number:text
-            parts = line.split(":", 2)
-            if len(parts) >= 3:
-                matches.append(
-                    {
-                        "path": parts[0],
-                        "line": int(parts[1]),
-                        "text": parts[2],
-                    }
-                )
-
-        return matches
+    async def agrep_raw(
+        self,
+        pattern: str,
+        path: str | None = None,
+        glob: str | None = None,
+    ) -> list[GrepMatch] | str:
+        """Async version of grep_raw, batched with concurrent calls."""
+        return await self._acoalesce("grep_raw", pattern=pattern, path=path, glob=glob)
 
-    def glob_info(self, pattern: str, path: str = "/") -> list[FileInfo]:
-        """Structured glob matching returning FileInfo dicts."""
+    def _prepare_glob_info(self, pattern: str, path: str = "/") -> _PreparedOp:
         # Encode pattern and path as base64 to avoid escaping issues
         pattern_b64 = base64.b64encode(pattern.encode("utf-8")).decode("ascii")
         path_b64 = base64.b64encode(path.encode("utf-8")).decode("ascii")
 
         cmd = _GLOB_COMMAND_TEMPLATE.format(path_b64=path_b64, pattern_b64=pattern_b64)
-        result = self.execute(cmd)
-
-        output = result.output.strip()
-        if not output:
-            return []
+        return _PreparedOp("glob", {"path": path, "pattern": pattern}, cmd, _parse_glob)
 
-        # Parse JSON output into FileInfo dicts
-        file_infos: list[FileInfo] = []
-        for line in output.split("\n"):
-            try:
-                data = json.loads(line)
-                file_infos.append(
-                    {
-                        "path": data["path"],
-                        "is_dir": data["is_dir"],
-                    }
-                )
-            except json.JSONDecodeError:
-                continue
+    def glob_info(self, pattern: str, path: str = "/") -> list[FileInfo]:
+        """Structured glob matching returning FileInfo dicts."""
+        return self._run_prepared(self._prepare_glob_info(pattern, path))
 
-        return file_infos
+    async def aglob_info(self, pattern: str, path: str = "/") -> list[FileInfo]:
+        """Async version of glob_info, batched with concurrent calls."""
+        return await self._acoalesce("glob_info", pattern=pattern, path=path)
 
     @property
     @abstractmethod
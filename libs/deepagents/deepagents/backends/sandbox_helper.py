@@ -0,0 +1,401 @@
+"""Long-lived helper process serving `BaseSandbox` file operations.
+
+Each `BaseSandbox` file operation normally runs a `python3 -c` program through
+`execute()`, paying interpreter startup inside the sandbox on every call. With
+`use_helper` enabled, the helper script below is installed once and keeps
+running in the background, so a file operation only runs a few shell builtins
+plus `cat`.
+
+The helper lives in a directory of the sandbox (`HELPER_DIR` by default):
+
+- `in` is a FIFO the helper reads request ids from, one per line.
+- For a request, the client writes `<id>.req` (its working directory, then
+  the base64-encoded JSON request), creates the FIFO `<id>.out`, sends the id
+  and reads the JSON response (`{"output": ..., "exit_code": ...}`) from
+  `<id>.out`.
+- `pid` holds the helper's process id and `lock` is held while it runs, so
+  only one helper serves a directory.
+
+Each operation prints the same output and exits with the same code as the
+command template `BaseSandbox` would otherwise run, so responses are parsed
+the same way. Requests are served one at a time. The helper exits after
+`IDLE_TIMEOUT` seconds without requests. Commands exit with
+`HELPER_UNAVAILABLE` when the helper is not running or cannot be started;
+`BaseSandbox` then restarts it once or falls back to the templates. Requests
+longer than `MAX_REQUEST_CHARS` once encoded also use the templates.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import shlex
+import uuid
+from typing import Any
+
+from deepagents.backends.protocol import ExecuteResponse
+
+HELPER_UNAVAILABLE = 97
+IDLE_TIMEOUT = 900
+_REPLY_WAIT = 300
+# Base64 characters of the largest request sent through the helper. The
+# request is one argument of the command, which `sh -c` caps at 128 KiB
+# (MAX_ARG_STRLEN); larger requests run as a command template instead.
+MAX_REQUEST_CHARS = 96 * 1024
+
+READ_PAGE_FUNCTION = r"""
+def read_page(file_path, offset, limit, index_dir, max_line, out):
+    import hashlib
+    import json
+    import os
+
+    if not os.path.isfile(file_path):
+        out.append('Error: File not found\n')
+        return 1
+    st = os.stat(file_path)
+    if st.st_size == 0:
+        out.append('System reminder: File exists but has empty contents\n')
+        return 0
+
+    # offsets[k] is the byte offset of line k * every, for the lines scanned so far
+    every = 1000
+    key = [os.path.abspath(file_path), st.st_mtime_ns, st.st_size]
+    offsets = [0]
+    index_path = None
+    if index_dir:
+        index_path = os.path.join(index_dir, hashlib.sha1(key[0].encode('utf-8')).hexdigest() + '.json')
+        try:
+            with open(index_path) as f:
+                cached = json.load(f)
+            if cached['key'] == key:
+                offsets = cached['offsets']
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+    known = len(offsets)
+
+    checkpoint = min(offset // every, len(offsets) - 1)
+    line_no = checkpoint * every
+    pos = offsets[checkpoint]
+    with open(file_path, 'rb') as f:
+        f.seek(pos)
+        while line_no < offset + limit:
+            # Bounded reads, so an over-long line is never held in memory whole
+            raw = f.readline(max_line * 4)
+            if not raw:
+                break
+            size = len(raw)
+            while not raw.endswith(b'\n'):
+                rest = f.readline(1 << 20)
+                if not rest:
+                    break
+                size += len(rest)
+                if rest.endswith(b'\n'):
+                    break
+            if line_no >= offset:
+                text = raw[:-1] if raw.endswith(b'\n') else raw
+                if text.endswith(b'\r'):
+                    text = text[:-1]
+                line = text.decode('utf-8', 'replace')
+                if size > len(raw) or len(line) > max_line:
+                    line = line[:max_line] + ' ... [line truncated]'
+                out.append('%6d\t%s\n' % (line_no + 1, line))
+            pos += size
+            line_no += 1
+            if line_no == len(offsets) * every:
+                offsets.append(pos)
+
+    if index_path and len(offsets) > known:
+        try:
+            os.makedirs(index_dir, exist_ok=True)
+            tmp_path = index_path + '.' + str(os.getpid())
+            with open(tmp_path, 'w') as f:
+                json.dump({'key': key, 'offsets': offsets}, f)
+            os.replace(tmp_path, index_path)
+        except OSError:
+            pass
+    return 0
+"""
+"""Source of `read_page`, which prints a page of a file with line numbers.
+
+Lines are read one at a time and split on newlines only, with a trailing
+carriage return stripped; lines over `max_line` characters are truncated. If
+`index_dir` is set, the byte offset of every 1000th line is cached there per
+file, so later pages of the same file seek close to their first line. Only
+single quotes and no dollar signs are used, so it can be embedded in a
+double-quoted `python3 -c` command.
+"""
+
+HELPER_SCRIPT = (
+    READ_PAGE_FUNCTION
+    + r"""
+import base64
+import errno
+import fcntl
+import glob
+import json
+import os
+import re
+import select
+import signal
+import sys
+import time
+import traceback
+
+HOME = os.path.abspath(sys.argv[1])
+IDLE_TIMEOUT = float(sys.argv[2])
+REPLY_TIMEOUT = 30.0
+REQUEST_ID = re.compile('^[0-9a-f]{32}$')
+
+
+def op_ls(args, out):
+    try:
+        with os.scandir(args['path']) as it:
+            for entry in it:
+                out.append(json.dumps({'path': entry.name, 'is_dir': entry.is_dir(follow_symlinks=False)}) + '\n')
+    except (FileNotFoundError, PermissionError):
+        pass
+    return 0
+
+
+def op_read(args, out):
+    return read_page(args['file_path'], args['offset'], args['limit'], args['index_dir'], args['max_line'], out)
+
+
+def op_write(args, out):
+    file_path = args['file_path']
+    if os.path.exists(file_path):
+        out.append("Error: File '{}' already exists\n".format(file_path))
+        return 1
+    os.makedirs(os.path.dirname(file_path) or '.', exist_ok=True)
+    with open(file_path, 'w') as f:
+        f.write(args['content'])
+    return 0
+
+
+def op_edit(args, out):
+    with open(args['file_path'], 'r') as f:
+        text = f.read()
+    old, new, replace_all = args['old'], args['new'], args['replace_all']
+    count = text.count(old)
+    if count == 0:
+        return 1
+    if count > 1 and not replace_all:
+        return 2
+    result = text.replace(old, new) if replace_all else text.replace(old, new, 1)
+    with open(args['file_path'], 'w') as f:
+        f.write(result)
+    out.append('{}\n'.format(count))
+    return 0
+
+
+def op_glob(args, out):
+    os.chdir(args['path'])
+    for m in sorted(glob.glob(args['pattern'], recursive=True)):
+        stat = os.stat(m)
+        out.append(json.dumps({'path': m, 'size': stat.st_size, 'mtime': stat.st_mtime, 'is_dir': os.path.isdir(m)}) + '\n')
+    return 0
+
+
+# Operation -> (function, whether its template reports errors in its output)
+OPS = {
+    'ls': (op_ls, False),
+    'read': (op_read, True),
+    'write': (op_write, True),
+    'edit': (op_edit, True),
+    'glob': (op_glob, False),
+}
+
+
+def reply(path, text):
+    deadline = time.time() + REPLY_TIMEOUT
+    while True:
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_NONBLOCK)
+            break
+        except OSError as e:
+            if e.errno != errno.ENXIO or time.time() > deadline:
+                return
+            time.sleep(0.001)
+    os.set_blocking(fd, True)
+    data = text.encode('utf-8')
+    try:
+        while data:
+            data = data[os.write(fd, data):]
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def handle(request_id):
+    if not REQUEST_ID.match(request_id):
+        return
+    request_path = os.path.join(HOME, request_id + '.req')
+    try:
+        with open(request_path) as f:
+            cwd = f.readline().rstrip('\n')
+            request = json.loads(base64.b64decode(f.readline()).decode('utf-8'))
+        os.unlink(request_path)
+        func, reports_errors = OPS[request['op']]
+        out = []
+        try:
+            os.chdir(cwd or '/')
+            code = func(request['args'], out)
+        except Exception:
+            code = 1
+            if reports_errors:
+                out.append(traceback.format_exc())
+        response = json.dumps({'output': ''.join(out), 'exit_code': code})
+    except Exception:
+        response = ''
+    reply(os.path.join(HOME, request_id + '.out'), response)
+
+
+def handle_lines(data):
+    for line in data.split(b'\n'):
+        if line:
+            handle(line.decode('ascii', 'replace'))
+
+
+def cleanup():
+    for name in ('in', 'pid'):
+        try:
+            os.unlink(os.path.join(HOME, name))
+        except OSError:
+            pass
+
+
+def serve(fd):
+    buf = b''
+    while True:
+        ready, _, _ = select.select([fd], [], [], IDLE_TIMEOUT)
+        if not ready:
+            # Stop accepting requests, then answer those already sent
+            cleanup()
+            os.set_blocking(fd, False)
+            try:
+                buf += os.read(fd, 65536)
+            except BlockingIOError:
+                pass
+            handle_lines(buf)
+            return
+        buf += os.read(fd, 65536)
+        lines, _, buf = buf.rpartition(b'\n')
+        handle_lines(lines)
+
+
+def main():
+    os.makedirs(HOME, exist_ok=True)
+    lock = os.open(os.path.join(HOME, 'lock'), os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return 0  # Another helper serves this directory
+    fifo = os.path.join(HOME, 'in')
+    if os.path.lexists(fifo):
+        os.unlink(fifo)
+    os.mkfifo(fifo, 0o600)
+    fd = os.open(fifo, os.O_RDWR)
+    ready_r, ready_w = os.pipe()
+    child = os.fork()
+    if child:
+        os.close(ready_w)
+        started = os.read(ready_r, 1)
+        os.waitpid(child, 0)
+        return 0 if started else 97
+    os.close(ready_r)
+    os.setsid()
+    if os.fork():
+        os._exit(0)
+    with open(os.path.join(HOME, 'pid'), 'w') as f:
+        f.write(str(os.getpid()))
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for std in (0, 1, 2):
+        os.dup2(devnull, std)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    os.write(ready_w, b'1')
+    os.close(ready_w)
+    try:
+        serve(fd)
+    finally:
+        cleanup()
+        os._exit(0)
+
+
+sys.exit(main())
+"""
+)
+
+HELPER_DIR = f"/tmp/deepagents-helper-{hashlib.sha256(HELPER_SCRIPT.encode()).hexdigest()[:12]}"  # noqa: S108
+
+_RUNNING = '[ -p "$d/in" ] && kill -0 "$(cat "$d/pid" 2>/dev/null)" 2>/dev/null'
+
+_START_COMMAND = """d={helper_dir}
+command -v python3 >/dev/null 2>&1 && command -v mkfifo >/dev/null 2>&1 || exit {unavailable}
+mkdir -p "$d" && chmod 700 "$d" || exit {unavailable}
+{running} && exit 0
+printf '%s' '{script_b64}' | python3 -c "import base64, sys; open(sys.argv[1], 'wb').write(base64.b64decode(sys.stdin.read()))" "$d/helper.py" \\
+    || exit {unavailable}
+python3 "$d/helper.py" "$d" {idle_timeout} </dev/null >/dev/null 2>&1 || exit {unavailable}"""
+
+_REQUEST_COMMAND = """d={helper_dir}; i={request_id}
+{running} || exit {unavailable}
+mkfifo "$d/$i.out" || exit {unavailable}
+printf '%s\\n%s\\n' "$PWD" '{request_b64}' > "$d/$i.req" && printf '%s\\n' "$i" > "$d/in" || exit {unavailable}
+if command -v timeout >/dev/null 2>&1; then timeout {wait} cat "$d/$i.out"; else cat "$d/$i.out"; fi
+rm -f "$d/$i.out" "$d/$i.req\""""
+
+_STOP_COMMAND = """d={helper_dir}
+kill "$(cat "$d/pid" 2>/dev/null)" 2>/dev/null || true"""
+
+
+def helper_start_command(helper_dir: str = HELPER_DIR, idle_timeout: float = IDLE_TIMEOUT) -> str:
+    """Return the command installing and starting the helper, unless it is running.
+
+    The command exits with 0 once the helper accepts requests, or with
+    `HELPER_UNAVAILABLE` if it cannot be started (e.g. no `python3` or
+    `mkfifo`, or the directory is not writable).
+    """
+    script_b64 = base64.b64encode(HELPER_SCRIPT.encode("utf-8")).decode("ascii")
+    return _START_COMMAND.format(
+        helper_dir=shlex.quote(helper_dir), unavailable=HELPER_UNAVAILABLE, running=_RUNNING, script_b64=script_b64, idle_timeout=idle_timeout
+    )
+
+
+def helper_request_command(op: str, args: dict[str, Any], helper_dir: str = HELPER_DIR) -> str | None:
+    """Return the command sending one file operation to the helper and printing its response.
+
+    Returns None if the encoded request is longer than `MAX_REQUEST_CHARS`.
+    """
+    request = json.dumps({"op": op, "args": args}, ensure_ascii=False).encode("utf-8")
+    # Base64 grows the request by 4/3; check before encoding it
+    if -(-len(request) // 3) * 4 > MAX_REQUEST_CHARS:
+        return None
+    request_b64 = base64.b64encode(request).decode("ascii")
+    return _REQUEST_COMMAND.format(
+        helper_dir=shlex.quote(helper_dir),
+        request_id=uuid.uuid4().hex,
+        running=_RUNNING,
+        unavailable=HELPER_UNAVAILABLE,
+        request_b64=request_b64,
+        wait=_REPLY_WAIT,
+    )
+
+
+def helper_stop_command(helper_dir: str = HELPER_DIR) -> str:
+    """Return the command stopping the helper, if it is running."""
+    return _STOP_COMMAND.format(helper_dir=shlex.quote(helper_dir))
+
+
+def parse_helper_response(result: ExecuteResponse) -> ExecuteResponse | None:
+    """Return the result of the operation a request command ran, or None if the helper did not answer."""
+    if result.exit_code != 0 or result.truncated:
+        return None
+    try:
+        data = json.loads(result.output)
+    except ValueError:
+        return None
+    if not isinstance(data, dict) or not isinstance(data.get("output"), str) or not isinstance(data.get("exit_code"), int):
+        return None
+    return ExecuteResponse(output=data["output"], exit_code=data["exit_code"])
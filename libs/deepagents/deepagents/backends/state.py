@@ -1,15 +1,23 @@
 """StateBackend: Store files in LangGraph agent state (ephemeral)."""
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
+from deepagents.backends.blobs import BlobStore, is_blob_ref, resolve_blob_refs, to_blob_ref
+from deepagents.backends.path_index import get_path_index
 from deepagents.backends.protocol import BackendProtocol, EditResult, FileInfo, GrepMatch, WriteResult
 from deepagents.backends.utils import (
+    FileDataCompression,
+    FileDataFormat,
+    _check_file_format,
     _glob_search_files,
+    _validate_path,
     create_file_data,
+    file_data_size,
     file_data_to_string,
     format_read_response,
     grep_matches_from_files,
     perform_string_replacement,
+    timestamp_to_iso,
     update_file_data,
 )
 
@@ -27,11 +35,68 @@ class StateBackend(BackendProtocol):
     Special handling: Since LangGraph state must be updated via Command objects
     (not direct mutation), operations return Command objects instead of None.
     This is indicated by the uses_state=True flag.
+
+    Files are written in the legacy FileData encoding (a list of lines) unless
+    `file_format="v2"` is passed. The compact v2 encoding keeps the content as
+    one string, optionally zstd-compressed, which makes checkpoints of large
+    files several times smaller. Both encodings are always readable, so
+    existing state keeps working and edited files are migrated as they are
+    rewritten.
+
+    With a `blob_store`, file contents are kept out of state altogether: state
+    holds each file's content digest and metadata, and the content lives in
+    the blob store. A file that is not rewritten then costs a few dozen bytes
+    per checkpoint, and subagents share it by reference.
     """
 
-    def __init__(self, runtime: "ToolRuntime"):
-        """Initialize StateBackend with runtime."""
+    def __init__(
+        self,
+        runtime: "ToolRuntime",
+        *,
+        file_format: FileDataFormat = "v1",
+        compression: FileDataCompression | None = None,
+        blob_store: BlobStore | None = None,
+    ):
+        """Initialize StateBackend with runtime.
+
+        Args:
+            runtime: The ToolRuntime instance providing access to agent state.
+            file_format: FileData encoding of written files, "v1" (list of
+                lines) or "v2" (compact).
+            compression: Compress v2 content with "zstd" (requires the
+                `zstandard` package).
+            blob_store: Store file contents here and keep only references in
+                state. Implies the v2 encoding; cannot be combined with
+                `compression`.
+        """
+        if blob_store is not None:
+            if compression is not None:
+                msg = "compression cannot be combined with blob_store"
+                raise ValueError(msg)
+            file_format = "v2"
+        _check_file_format(file_format, compression)
         self.runtime = runtime
+        self.file_format = file_format
+        self.compression = compression
+        self.blob_store = blob_store
+
+    def _create_file_data(self, content: str) -> dict[str, Any]:
+        file_data = create_file_data(content, file_format=self.file_format, compression=self.compression)
+        return file_data if self.blob_store is None else to_blob_ref(file_data, self.blob_store)
+
+    def _update_file_data(self, file_data: dict[str, Any], content: str) -> dict[str, Any]:
+        new_file_data = update_file_data(file_data, content, file_format=self.file_format, compression=self.compression)
+        return new_file_data if self.blob_store is None else to_blob_ref(new_file_data, self.blob_store)
+
+    def _load(self, file_path: str, file_data: dict[str, Any]) -> dict[str, Any] | str:
+        """Return file_data with its content inline, or an error message."""
+        if not is_blob_ref(file_data):
+            return file_data
+        if self.blob_store is not None:
+            resolved = resolve_blob_refs({file_path: file_data}, self.blob_store)[file_path]
+            if resolved is not None:
+                return resolved
+        return f"Error: Content of file '{file_path}' is not available in the blob store"
 
     def ls_info(self, path: str) -> list[FileInfo]:
         """List files and directories in the specified directory (non-recursive).
@@ -44,40 +109,26 @@ class StateBackend(BackendProtocol):
             Directories have a trailing / in their path and is_dir=True.
         """
         files = self.runtime.state.get("files", {})
-        infos: list[FileInfo] = []
-        subdirs: set[str] = set()
+        index = get_path_index(files)
 
         # Normalize path to have trailing slash for proper prefix matching
         normalized_path = path if path.endswith("/") else path + "/"
+        file_keys, subdirs = index.list_dir(normalized_path)
 
-        for k, fd in files.items():
-            # Check if file is in the specified directory or a subdirectory
-            if not k.startswith(normalized_path):
-                continue
-
-            # Get the relative path after the directory
-            relative = k[len(normalized_path) :]
-
-            # If relative path contains '/', it's in a subdirectory
-            if "/" in relative:
-                # Extract the immediate subdirectory name
-                subdir_name = relative.split("/")[0]
-                subdirs.add(normalized_path + subdir_name + "/")
-                continue
-
-            # This is a file directly in the current directory
-            size = len("\n".join(fd.get("content", [])))
+        infos: list[FileInfo] = []
+        for k in file_keys:
+            fd = files[k]
             infos.append(
                 {
                     "path": k,
                     "is_dir": False,
-                    "size": int(size),
-                    "modified_at": fd.get("modified_at", ""),
+                    "size": file_data_size(fd),
+                    "modified_at": timestamp_to_iso(fd.get("modified_at", "")),
                 }
             )
 
         # Add directories to the results
-        for subdir in sorted(subdirs):
+        for subdir in subdirs:
             infos.append(
                 {
                     "path": subdir,
@@ -112,6 +163,9 @@ class StateBackend(BackendProtocol):
         if file_data is None:
             return f"Error: File '{file_path}' not found"
 
+        file_data = self._load(file_path, file_data)
+        if isinstance(file_data, str):
+            return file_data
         return format_read_response(file_data, offset, limit)
 
     def write(
@@ -127,7 +181,7 @@ class StateBackend(BackendProtocol):
         if file_path in files:
             return WriteResult(error=f"Cannot write to {file_path} because it already exists. Read and then make an edit, or write to a new path.")
 
-        new_file_data = create_file_data(content)
+        new_file_data = self._create_file_data(content)
         return WriteResult(path=file_path, files_update={file_path: new_file_data})
 
     def edit(
@@ -146,6 +200,9 @@ class StateBackend(BackendProtocol):
         if file_data is None:
             return EditResult(error=f"Error: File '{file_path}' not found")
 
+        file_data = self._load(file_path, file_data)
+        if isinstance(file_data, str):
+            return EditResult(error=file_data)
         content = file_data_to_string(file_data)
         result = perform_string_replacement(content, old_string, new_string, replace_all)
 
@@ -153,7 +210,7 @@ class StateBackend(BackendProtocol):
             return EditResult(error=result)
 
         new_content, occurrences = result
-        new_file_data = update_file_data(file_data, new_content)
+        new_file_data = self._update_file_data(file_data, new_content)
         return EditResult(path=file_path, files_update={file_path: new_file_data}, occurrences=int(occurrences))
 
     def grep_raw(
@@ -163,25 +220,36 @@ class StateBackend(BackendProtocol):
         glob: str | None = None,
     ) -> list[GrepMatch] | str:
         files = self.runtime.state.get("files", {})
+        try:
+            prefix = _validate_path(path)
+        except ValueError:
+            prefix = "/"
+        # Only files under path are loaded and searched
+        files = {fp: files[fp] for fp in get_path_index(files).with_prefix(prefix)}
+        if self.blob_store is not None:
+            files = {fp: fd for fp, fd in resolve_blob_refs(files, self.blob_store).items() if fd is not None}
+        elif any(is_blob_ref(fd) for fd in files.values()):
+            # Contents we cannot load are not searched
+            files = {fp: fd for fp, fd in files.items() if not is_blob_ref(fd)}
         return grep_matches_from_files(files, pattern, path, glob)
 
     def glob_info(self, pattern: str, path: str = "/") -> list[FileInfo]:
         """Get FileInfo for files matching glob pattern."""
         files = self.runtime.state.get("files", {})
-        result = _glob_search_files(files, pattern, path)
+        index = get_path_index(files)
+        result = _glob_search_files(files, pattern, path, index=index)
         if result == "No files found":
             return []
         paths = result.split("\n")
         infos: list[FileInfo] = []
         for p in paths:
             fd = files.get(p)
-            size = len("\n".join(fd.get("content", []))) if fd else 0
             infos.append(
                 {
                     "path": p,
                     "is_dir": False,
-                    "size": int(size),
-                    "modified_at": fd.get("modified_at", "") if fd else "",
+                    "size": file_data_size(fd) if fd else 0,
+                    "modified_at": timestamp_to_iso(fd.get("modified_at", "")) if fd else "",
                 }
             )
         return infos
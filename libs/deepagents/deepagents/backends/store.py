@@ -1,10 +1,22 @@
 """StoreBackend: Adapter for LangGraph's BaseStore (persistent, cross-thread)."""
 
+import asyncio
+import base64
+import re
+import threading
+import weakref
+from collections import OrderedDict
+from collections.abc import Iterable, Sequence
+from datetime import datetime
+from pathlib import Path
 from typing import Any
 
+import wcmatch.glob as wcglob
 from langgraph.config import get_config
-from langgraph.store.base import BaseStore, Item
+from langgraph.store.base import BaseStore, GetOp, Item, PutOp
 
+from deepagents.backends.grep_index import index_ops, manifest_get_ops, posting_namespaces, rebuild_store_grep_index, required_trigrams
+from deepagents.backends.patterns import compile_glob, compile_regex
 from deepagents.backends.protocol import (
     BackendProtocol,
     EditResult,
@@ -15,15 +27,107 @@ from deepagents.backends.protocol import (
     WriteResult,
 )
 from deepagents.backends.utils import (
+    FileDataCompression,
+    FileDataFormat,
+    _check_file_format,
+    _glob_literal_dir,
     _glob_search_files,
+    _validate_path,
     create_file_data,
+    file_data_size,
     file_data_to_string,
     format_read_response,
     grep_matches_from_files,
+    is_compact_file_data,
     perform_string_replacement,
+    timestamp_to_iso,
     update_file_data,
 )
 
+_META_SUFFIX = "_meta"
+_MAX_PAGE_SIZE = 2000
+_PREFETCH_PAGES = 4
+
+
+def _encode_label(segment: str) -> str:
+    """Make a path segment a valid namespace label (labels cannot contain periods)."""
+    return segment.replace("%", "%25").replace(".", "%2E")
+
+
+def _decode_label(label: str) -> str:
+    return label.replace("%2E", ".").replace("%25", "%")
+
+
+def _parent_dir(path: str) -> str:
+    return path.rsplit("/", 1)[0] + "/"
+
+
+def _subdir_paths(meta_ns: tuple[str, ...], dir_path: str, namespaces: Iterable[tuple[str, ...]]) -> list[str]:
+    """Return the directories of the child namespaces of meta_ns, sorted."""
+    return sorted({dir_path + _decode_label(ns[-1]) + "/" for ns in namespaces if len(ns) > len(meta_ns)})
+
+
+def _filter_paths(paths: Iterable[str], glob: str | None) -> list[str]:
+    """Return the paths whose file name matches glob, sorted."""
+    paths = sorted(paths)
+    if glob:
+        matcher = compile_glob(glob, wcglob.BRACE)
+        paths = [p for p in paths if matcher.match(Path(p).name)]
+    return paths
+
+
+_CacheKey = tuple[tuple[str, ...], str]
+_CacheEntry = tuple[datetime | None, dict[str, Any]]
+
+
+class _FileCache:
+    """LRU cache of FileData by namespace and path, with the `updated_at` it was read at."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._entries: OrderedDict[_CacheKey, _CacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: _CacheKey) -> _CacheEntry | None:
+        """Return the entry of key and mark it as recently used."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def peek(self, key: _CacheKey) -> _CacheEntry | None:
+        """Return the entry of key without changing its recency."""
+        return self._entries.get(key)
+
+    def put(self, key: _CacheKey, entry: _CacheEntry) -> None:
+        """Store the entry of key, evicting the least recently used entries."""
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+# Backends are usually created per tool call, so caches are kept per store and
+# shared by every backend on it; this also keeps them coherent with each other.
+_file_caches: "weakref.WeakKeyDictionary[BaseStore, _FileCache]" = weakref.WeakKeyDictionary()
+_file_caches_lock = threading.Lock()
+
+
+def _get_file_cache(store: BaseStore, maxsize: int) -> _FileCache:
+    """Return the file cache of store, holding at least maxsize entries."""
+    with _file_caches_lock:
+        try:
+            cache = _file_caches.get(store)
+            if cache is None:
+                cache = _file_caches[store] = _FileCache(maxsize)
+        except TypeError:
+            # Stores that cannot be weakly referenced get a cache per backend
+            return _FileCache(maxsize)
+        cache.maxsize = max(cache.maxsize, maxsize)
+        return cache
+
 
 class StoreBackend(BackendProtocol):
     """Backend that stores files in LangGraph's BaseStore (persistent).
@@ -32,15 +136,200 @@ class StoreBackend(BackendProtocol):
     Files are organized via namespaces and persist across all threads.
 
     The namespace can include an optional assistant_id for multi-agent isolation.
+
+    Files are stored in the legacy FileData encoding unless `file_format="v2"`
+    is passed; items in either encoding are always readable. zstd-compressed
+    v2 content is stored base64-encoded so store values stay JSON-serializable.
+
+    With `metadata_index=True`, every write also records the file's size and
+    timestamps, without content, in a sibling namespace
+    (`<namespace>_meta`, followed by one label per directory). `ls_info` and
+    `glob_info` then read only that metadata, and only under the requested
+    directory, since namespace prefixes are filtered by the store itself.
+    `grep_raw` fetches content only for files under the searched path. Files
+    written before the index was enabled are added by `build_metadata_index()`.
+
+    With `grep_index=True`, writes also maintain a trigram index of file
+    contents (see `deepagents.backends.grep_index`), and `grep_raw` fetches
+    only the files containing the literal parts of the pattern. Existing
+    files are indexed by `build_grep_index()` or `rebuild_store_grep_index()`.
+
+    With `cache_size` > 0, recently read and written files are kept in a
+    bounded LRU cache of that many entries, so repeated reads and edits of the
+    same file do not go back to the store. The cache is shared by all
+    StoreBackends on the same store object and updated by their writes.
+    Writes that bypass these backends, e.g. by another process, are only
+    noticed when a listing, glob or grep returns the item with a different
+    `updated_at`; until then a cached file may be stale. The cache is
+    therefore off by default and should only be enabled when this process is
+    the store's only writer. `cache_hits` and `cache_misses` count this
+    backend's lookups of the cache.
     """
 
-    def __init__(self, runtime: "ToolRuntime"):
+    def __init__(
+        self,
+        runtime: "ToolRuntime",
+        *,
+        file_format: FileDataFormat = "v1",
+        compression: FileDataCompression | None = None,
+        metadata_index: bool = False,
+        grep_index: bool = False,
+        cache_size: int = 0,
+    ):
         """Initialize StoreBackend with runtime.
 
         Args:
             runtime: The ToolRuntime instance providing store access and configuration.
+            file_format: FileData encoding of written files, "v1" (list of
+                lines) or "v2" (compact).
+            compression: Compress v2 content with "zstd" (requires the
+                `zstandard` package).
+            metadata_index: Maintain a directory-structured metadata namespace
+                and answer listings, globs and grep path filters from it.
+            grep_index: Maintain a trigram index of file contents and use it to
+                select the files grep has to search.
+            cache_size: Maximum number of files kept in the read-through
+                cache. Defaults to 0, which disables the cache.
         """
+        _check_file_format(file_format, compression)
         self.runtime = runtime
+        self.file_format = file_format
+        self.compression = compression
+        self.metadata_index = metadata_index
+        self.grep_index = grep_index
+        self.cache_size = cache_size
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._cache: _FileCache | None = None
+
+    def _create_file_data(self, content: str) -> dict[str, Any]:
+        return create_file_data(content, file_format=self.file_format, compression=self.compression)
+
+    def _file_cache(self) -> "_FileCache | None":
+        """Return the file cache shared with other backends on the same store."""
+        if not self.cache_size:
+            return None
+        if self._cache is None:
+            self._cache = _get_file_cache(self._get_store(), self.cache_size)
+        return self._cache
+
+    def _cache_get(self, namespace: tuple[str, ...], file_path: str) -> dict[str, Any] | None:
+        """Return the cached FileData of file_path, counting the hit or miss."""
+        cache = self._file_cache()
+        if cache is None:
+            return None
+        entry = cache.get((namespace, file_path))
+        if entry is None:
+            self.cache_misses += 1
+            return None
+        self.cache_hits += 1
+        return entry[1]
+
+    def _cache_put(self, namespace: tuple[str, ...], file_path: str, file_data: dict[str, Any], updated_at: datetime | None = None) -> None:
+        """Cache file_data as the current content of file_path.
+
+        `updated_at` is None for the backend's own writes, whose store timestamp is not known.
+        """
+        cache = self._file_cache()
+        if cache is not None:
+            cache.put((namespace, file_path), (updated_at, file_data))
+
+    def _item_file_data(self, namespace: tuple[str, ...], item: Item, *, admit: bool = False) -> dict[str, Any]:
+        """Convert item to FileData, reusing and refreshing the cached copy.
+
+        A cached file whose `updated_at` differs from the item's is replaced. Items
+        that are not cached yet are only added if admit is set, so full scans do
+        not evict the files actually being read.
+
+        Raises:
+            ValueError: If the item is not valid file data.
+        """
+        cache = self._file_cache()
+        entry = cache.peek((namespace, item.key)) if cache is not None else None
+        if entry is not None and entry[0] is not None and entry[0] == item.updated_at:
+            return entry[1]
+        file_data = self._convert_store_item_to_file_data(item)
+        if admit or entry is not None:
+            self._cache_put(namespace, item.key, file_data, item.updated_at)
+        return file_data
+
+    def _items_file_data(self, namespace: tuple[str, ...], items: Iterable[Item]) -> dict[str, Any]:
+        """Convert scanned items to FileData by key, skipping invalid items."""
+        files: dict[str, Any] = {}
+        for item in items:
+            try:
+                files[item.key] = self._item_file_data(namespace, item)
+            except ValueError:
+                continue
+        return files
+
+    def _loaded_file_data(self, namespace: tuple[str, ...], file_path: str, item: Item | None) -> dict[str, Any] | str:
+        """Return the FileData of a fetched item, or an error message."""
+        if item is None:
+            return f"Error: File '{file_path}' not found"
+        try:
+            return self._item_file_data(namespace, item, admit=True)
+        except ValueError as e:
+            return f"Error: {e}"
+
+    def _load(self, store: BaseStore, namespace: tuple[str, ...], file_path: str) -> dict[str, Any] | str:
+        """Return the FileData of file_path from the cache or the store, or an error message."""
+        cached = self._cache_get(namespace, file_path)
+        if cached is not None:
+            return cached
+        return self._loaded_file_data(namespace, file_path, store.get(namespace, file_path))
+
+    async def _aload(self, store: BaseStore, namespace: tuple[str, ...], file_path: str) -> dict[str, Any] | str:
+        """Async version of _load."""
+        cached = self._cache_get(namespace, file_path)
+        if cached is not None:
+            return cached
+        return self._loaded_file_data(namespace, file_path, await store.aget(namespace, file_path))
+
+    def _put_file(self, store: BaseStore, namespace: tuple[str, ...], file_path: str, file_data: dict[str, Any]) -> None:
+        """Store file_data at file_path, update the grep index and cache it."""
+        ops = self._file_ops(namespace, file_path, file_data)
+        if self.grep_index:
+            ops.extend(self._grep_index_ops(namespace, {file_path: file_data}, self._fetch_manifests(store, namespace, [file_path])))
+        store.batch(ops)
+        self._cache_put(namespace, file_path, file_data)
+
+    async def _aput_file(self, store: BaseStore, namespace: tuple[str, ...], file_path: str, file_data: dict[str, Any]) -> None:
+        """Async version of _put_file."""
+        ops = self._file_ops(namespace, file_path, file_data)
+        if self.grep_index:
+            ops.extend(self._grep_index_ops(namespace, {file_path: file_data}, await self._afetch_manifests(store, namespace, [file_path])))
+        await store.abatch(ops)
+        self._cache_put(namespace, file_path, file_data)
+
+    def _fetch_manifests(self, store: BaseStore, namespace: tuple[str, ...], paths: list[str]) -> dict[str, object]:
+        """Return the grep index manifests of paths, if the grep index is enabled."""
+        if not self.grep_index or not paths:
+            return {}
+        return dict(zip(paths, store.batch(manifest_get_ops(namespace, paths)), strict=True))
+
+    async def _afetch_manifests(self, store: BaseStore, namespace: tuple[str, ...], paths: list[str]) -> dict[str, object]:
+        """Async version of _fetch_manifests."""
+        if not self.grep_index or not paths:
+            return {}
+        return dict(zip(paths, await store.abatch(manifest_get_ops(namespace, paths)), strict=True))
+
+    def _grep_index_ops(self, namespace: tuple[str, ...], files: dict[str, dict[str, Any]], manifests: dict[str, object]) -> list[PutOp]:
+        """Return the ops updating the grep index for newly stored files."""
+        ops: list[PutOp] = []
+        for path, file_data in files.items():
+            ops.extend(index_ops(namespace, path, file_data_to_string(file_data), manifests.get(path)))
+        return ops
+
+    def build_grep_index(self) -> int:
+        """Index every file in the namespace for `grep_index`.
+
+        See `deepagents.backends.grep_index.rebuild_store_grep_index`.
+
+        Returns:
+            Number of files indexed.
+        """
+        return rebuild_store_grep_index(self._get_store(), self._get_namespace())
 
     def _get_store(self) -> BaseStore:
         """Get the store instance.
@@ -101,25 +390,36 @@ class StoreBackend(BackendProtocol):
             store_item: The store Item containing file data.
 
         Returns:
-            FileData dict with content, created_at, and modified_at fields.
+            FileData dict with content, created_at, and modified_at fields,
+            plus version, encoding and size for compact (v2) items.
 
         Raises:
             ValueError: If required fields are missing or have incorrect types.
         """
-        if "content" not in store_item.value or not isinstance(store_item.value["content"], list):
-            msg = f"Store item does not contain valid content field. Got: {store_item.value.keys()}"
+        value = store_item.value
+        compact = is_compact_file_data(value)
+        content_type = str if compact else list
+        timestamp_type = int if compact else str
+        if "content" not in value or not isinstance(value["content"], content_type):
+            msg = f"Store item does not contain valid content field. Got: {value.keys()}"
             raise ValueError(msg)
-        if "created_at" not in store_item.value or not isinstance(store_item.value["created_at"], str):
-            msg = f"Store item does not contain valid created_at field. Got: {store_item.value.keys()}"
+        if "created_at" not in value or not isinstance(value["created_at"], timestamp_type):
+            msg = f"Store item does not contain valid created_at field. Got: {value.keys()}"
             raise ValueError(msg)
-        if "modified_at" not in store_item.value or not isinstance(store_item.value["modified_at"], str):
-            msg = f"Store item does not contain valid modified_at field. Got: {store_item.value.keys()}"
+        if "modified_at" not in value or not isinstance(value["modified_at"], timestamp_type):
+            msg = f"Store item does not contain valid modified_at field. Got: {value.keys()}"
             raise ValueError(msg)
-        return {
-            "content": store_item.value["content"],
-            "created_at": store_item.value["created_at"],
-            "modified_at": store_item.value["modified_at"],
+        file_data = {
+            "content": value["content"],
+            "created_at": value["created_at"],
+            "modified_at": value["modified_at"],
         }
+        if compact:
+            file_data["version"] = value["version"]
+            file_data["encoding"] = value.get("encoding", "utf-8")
+            if "size" in value:
+                file_data["size"] = value["size"]
+        return file_data
 
     def _convert_file_data_to_store_value(self, file_data: dict[str, Any]) -> dict[str, Any]:
         """Convert FileData to a dict suitable for store.put().
@@ -128,13 +428,111 @@ class StoreBackend(BackendProtocol):
             file_data: The FileData to convert.
 
         Returns:
-            Dictionary with content, created_at, and modified_at fields.
+            Dictionary with content, created_at, and modified_at fields,
+            plus version, encoding and size for compact (v2) data.
         """
-        return {
+        value = {
             "content": file_data["content"],
             "created_at": file_data["created_at"],
             "modified_at": file_data["modified_at"],
         }
+        if is_compact_file_data(file_data):
+            if isinstance(value["content"], bytes):
+                value["content"] = base64.b64encode(value["content"]).decode("ascii")
+            value["version"] = file_data["version"]
+            value["encoding"] = file_data["encoding"]
+            value["size"] = file_data["size"]
+        return value
+
+    def _meta_namespace(self, namespace: tuple[str, ...], dir_path: str = "/") -> tuple[str, ...]:
+        """Return the metadata namespace of directory dir_path."""
+        labels = tuple(_encode_label(segment) for segment in dir_path.split("/") if segment)
+        return (*namespace[:-1], namespace[-1] + _META_SUFFIX, *labels)
+
+    def _file_ops(self, namespace: tuple[str, ...], file_path: str, file_data: dict[str, Any]) -> list[PutOp]:
+        """Return the ops storing file_data at file_path, plus its metadata if indexed."""
+        ops = [PutOp(namespace, file_path, self._convert_file_data_to_store_value(file_data))]
+        if self.metadata_index:
+            dir_path = _parent_dir(file_path)
+            meta = {
+                "path": file_path,
+                "dir": dir_path,
+                "size": file_data_size(file_data),
+                "created_at": file_data["created_at"],
+                "modified_at": file_data["modified_at"],
+            }
+            ops.append(PutOp(self._meta_namespace(namespace, dir_path), file_path, meta, index=False))
+        return ops
+
+    def _meta_info(self, item: Item) -> FileInfo:
+        return {
+            "path": item.value["path"],
+            "is_dir": False,
+            "size": int(item.value.get("size", 0)),
+            "modified_at": timestamp_to_iso(item.value.get("modified_at", "")),
+        }
+
+    def _search_meta(self, store: BaseStore, namespace: tuple[str, ...], dir_path: str, *, recursive: bool) -> list[Item]:
+        """Return the metadata items in dir_path, or anywhere under it if recursive."""
+        filter_ = None if recursive else {"dir": dir_path}
+        return self._search_store_paginated(store, self._meta_namespace(namespace, dir_path), filter=filter_, page_size=500)
+
+    async def _asearch_meta(self, store: BaseStore, namespace: tuple[str, ...], dir_path: str, *, recursive: bool) -> list[Item]:
+        """Async version of _search_meta."""
+        filter_ = None if recursive else {"dir": dir_path}
+        return await self._asearch_store_paginated(store, self._meta_namespace(namespace, dir_path), filter=filter_, page_size=500)
+
+    def _list_subdirs(self, store: BaseStore, namespace: tuple[str, ...], dir_path: str) -> list[str]:
+        """Return the immediate subdirectories of dir_path that contain files."""
+        meta_ns = self._meta_namespace(namespace, dir_path)
+        namespaces: list[tuple[str, ...]] = []
+        offset = 0
+        page_size = 100
+        while True:
+            page = store.list_namespaces(prefix=meta_ns, max_depth=len(meta_ns) + 1, limit=page_size, offset=offset)
+            namespaces.extend(page)
+            if len(page) < page_size:
+                break
+            offset += len(page)
+            page_size = min(page_size * 2, _MAX_PAGE_SIZE)
+        return _subdir_paths(meta_ns, dir_path, namespaces)
+
+    async def _alist_subdirs(self, store: BaseStore, namespace: tuple[str, ...], dir_path: str) -> list[str]:
+        """Async version of _list_subdirs."""
+        meta_ns = self._meta_namespace(namespace, dir_path)
+        namespaces: list[tuple[str, ...]] = []
+        offset = 0
+        page_size = 100
+        while True:
+            page = await store.alist_namespaces(prefix=meta_ns, max_depth=len(meta_ns) + 1, limit=page_size, offset=offset)
+            namespaces.extend(page)
+            if len(page) < page_size:
+                break
+            offset += len(page)
+            page_size = min(page_size * 2, _MAX_PAGE_SIZE)
+        return _subdir_paths(meta_ns, dir_path, namespaces)
+
+    def build_metadata_index(self) -> int:
+        """Record metadata for every file in the namespace.
+
+        Needed once when `metadata_index` is enabled on a store that already
+        holds files. The content of every file is read once.
+
+        Returns:
+            Number of files indexed.
+        """
+        store = self._get_store()
+        namespace = self._get_namespace()
+        ops: list[PutOp] = []
+        for item in self._search_store_paginated(store, namespace):
+            try:
+                file_data = self._convert_store_item_to_file_data(item)
+            except ValueError:
+                continue
+            ops.extend(op for op in self._file_ops(namespace, item.key, file_data) if op.namespace != namespace)
+        if ops:
+            store.batch(ops)
+        return len(ops)
 
     def _search_store_paginated(
         self,
@@ -152,7 +550,9 @@ class StoreBackend(BackendProtocol):
             namespace: Hierarchical path prefix to search within.
             query: Optional query for natural language search.
             filter: Key-value pairs to filter results.
-            page_size: Number of items to fetch per page (default: 100).
+            page_size: Number of items in the first page (default: 100). Each
+                following page is twice as large, up to 2000 items, so large
+                namespaces take few round trips.
 
         Returns:
             List of all items matching the search criteria.
@@ -179,10 +579,48 @@ class StoreBackend(BackendProtocol):
             all_items.extend(page_items)
             if len(page_items) < page_size:
                 break
-            offset += page_size
+            offset += len(page_items)
+            page_size = min(page_size * 2, _MAX_PAGE_SIZE)
 
         return all_items
 
+    async def _asearch_store_paginated(
+        self,
+        store: BaseStore,
+        namespace: tuple[str, ...],
+        *,
+        query: str | None = None,
+        filter: dict[str, Any] | None = None,
+        page_size: int = 100,
+    ) -> list[Item]:
+        """Async version of _search_store_paginated that prefetches pages.
+
+        Page sizes grow as in the sync version. Once the first page comes back
+        full, the following pages are requested concurrently, four at a time;
+        pages past the end of the results are empty and ignored.
+        """
+        all_items: list[Item] = []
+        offset = 0
+        sizes = [page_size]
+        while True:
+            offsets = [offset + sum(sizes[:i]) for i in range(len(sizes))]
+            pages = await asyncio.gather(
+                *(
+                    store.asearch(namespace, query=query, filter=filter, limit=size, offset=page_offset)
+                    for size, page_offset in zip(sizes, offsets, strict=True)
+                )
+            )
+            for size, page_items in zip(sizes, pages, strict=True):
+                all_items.extend(page_items)
+                if len(page_items) < size:
+                    return all_items
+            offset += sum(sizes)
+            page_size = sizes[-1]
+            sizes = []
+            for _ in range(_PREFETCH_PAGES):
+                page_size = min(page_size * 2, _MAX_PAGE_SIZE)
+                sizes.append(page_size)
+
     def ls_info(self, path: str) -> list[FileInfo]:
         """List files and directories in the specified directory (non-recursive).
 
@@ -196,9 +634,23 @@ class StoreBackend(BackendProtocol):
         store = self._get_store()
         namespace = self._get_namespace()
 
+        if self.metadata_index:
+            return self._indexed_ls(store, namespace, path)
+
         # Retrieve all items and filter by path prefix locally to avoid
         # coupling to store-specific filter semantics
-        items = self._search_store_paginated(store, namespace)
+        return self._ls_from_items(namespace, self._search_store_paginated(store, namespace), path)
+
+    async def als_info(self, path: str) -> list[FileInfo]:
+        """Async version of ls_info using the store's native async API."""
+        store = self._get_store()
+        namespace = self._get_namespace()
+        if self.metadata_index:
+            return await self._aindexed_ls(store, namespace, path)
+        return self._ls_from_items(namespace, await self._asearch_store_paginated(store, namespace), path)
+
+    def _ls_from_items(self, namespace: tuple[str, ...], items: list[Item], path: str) -> list[FileInfo]:
+        """List the files and subdirectories directly in path among all items of the namespace."""
         infos: list[FileInfo] = []
         subdirs: set[str] = set()
 
@@ -222,16 +674,15 @@ class StoreBackend(BackendProtocol):
 
             # This is a file directly in the current directory
             try:
-                fd = self._convert_store_item_to_file_data(item)
+                fd = self._item_file_data(namespace, item)
             except ValueError:
                 continue
-            size = len("\n".join(fd.get("content", [])))
             infos.append(
                 {
                     "path": item.key,
                     "is_dir": False,
-                    "size": int(size),
-                    "modified_at": fd.get("modified_at", ""),
+                    "size": file_data_size(fd),
+                    "modified_at": timestamp_to_iso(fd.get("modified_at", "")),
                 }
             )
 
@@ -265,18 +716,21 @@ class StoreBackend(BackendProtocol):
         Returns:
             Formatted file content with line numbers, or error message.
         """
-        store = self._get_store()
-        namespace = self._get_namespace()
-        item: Item | None = store.get(namespace, file_path)
-
-        if item is None:
-            return f"Error: File '{file_path}' not found"
-
-        try:
-            file_data = self._convert_store_item_to_file_data(item)
-        except ValueError as e:
-            return f"Error: {e}"
+        file_data = self._load(self._get_store(), self._get_namespace(), file_path)
+        if isinstance(file_data, str):
+            return file_data
+        return format_read_response(file_data, offset, limit)
 
+    async def aread(
+        self,
+        file_path: str,
+        offset: int = 0,
+        limit: int = 2000,
+    ) -> str:
+        """Async version of read using the store's native async API."""
+        file_data = await self._aload(self._get_store(), self._get_namespace(), file_path)
+        if isinstance(file_data, str):
+            return file_data
         return format_read_response(file_data, offset, limit)
 
     def write(
@@ -291,14 +745,24 @@ class StoreBackend(BackendProtocol):
         namespace = self._get_namespace()
 
         # Check if file exists
-        existing = store.get(namespace, file_path)
-        if existing is not None:
+        if self._cache_get(namespace, file_path) is not None or store.get(namespace, file_path) is not None:
             return WriteResult(error=f"Cannot write to {file_path} because it already exists. Read and then make an edit, or write to a new path.")
 
         # Create new file
-        file_data = create_file_data(content)
-        store_value = self._convert_file_data_to_store_value(file_data)
-        store.put(namespace, file_path, store_value)
+        self._put_file(store, namespace, file_path, self._create_file_data(content))
+        return WriteResult(path=file_path, files_update=None)
+
+    async def awrite(
+        self,
+        file_path: str,
+        content: str,
+    ) -> WriteResult:
+        """Async version of write using the store's native async API."""
+        store = self._get_store()
+        namespace = self._get_namespace()
+        if self._cache_get(namespace, file_path) is not None or await store.aget(namespace, file_path) is not None:
+            return WriteResult(error=f"Cannot write to {file_path} because it already exists. Read and then make an edit, or write to a new path.")
+        await self._aput_file(store, namespace, file_path, self._create_file_data(content))
         return WriteResult(path=file_path, files_update=None)
 
     def edit(
@@ -315,28 +779,48 @@ class StoreBackend(BackendProtocol):
         namespace = self._get_namespace()
 
         # Get existing file
-        item = store.get(namespace, file_path)
-        if item is None:
-            return EditResult(error=f"Error: File '{file_path}' not found")
+        file_data = self._load(store, namespace, file_path)
+        if isinstance(file_data, str):
+            return EditResult(error=file_data)
 
-        try:
-            file_data = self._convert_store_item_to_file_data(item)
-        except ValueError as e:
-            return EditResult(error=f"Error: {e}")
+        result = self._replace_in_file_data(file_data, old_string, new_string, replace_all=replace_all)
+        if isinstance(result, str):
+            return EditResult(error=result)
 
-        content = file_data_to_string(file_data)
-        result = perform_string_replacement(content, old_string, new_string, replace_all)
+        # Update file in store
+        new_file_data, occurrences = result
+        self._put_file(store, namespace, file_path, new_file_data)
+        return EditResult(path=file_path, files_update=None, occurrences=occurrences)
 
+    async def aedit(
+        self,
+        file_path: str,
+        old_string: str,
+        new_string: str,
+        replace_all: bool = False,
+    ) -> EditResult:
+        """Async version of edit using the store's native async API."""
+        store = self._get_store()
+        namespace = self._get_namespace()
+        file_data = await self._aload(store, namespace, file_path)
+        if isinstance(file_data, str):
+            return EditResult(error=file_data)
+        result = self._replace_in_file_data(file_data, old_string, new_string, replace_all=replace_all)
         if isinstance(result, str):
             return EditResult(error=result)
-
+        new_file_data, occurrences = result
+        await self._aput_file(store, namespace, file_path, new_file_data)
+        return EditResult(path=file_path, files_update=None, occurrences=occurrences)
+
+    def _replace_in_file_data(
+        self, file_data: dict[str, Any], old_string: str, new_string: str, replace_all: bool
+    ) -> tuple[dict[str, Any], int] | str:
+        """Return file_data with old_string replaced and the number of replacements, or an error message."""
+        result = perform_string_replacement(file_data_to_string(file_data), old_string, new_string, replace_all)
+        if isinstance(result, str):
+            return result
         new_content, occurrences = result
-        new_file_data = update_file_data(file_data, new_content)
-
-        # Update file in store
-        store_value = self._convert_file_data_to_store_value(new_file_data)
-        store.put(namespace, file_path, store_value)
-        return EditResult(path=file_path, files_update=None, occurrences=int(occurrences))
+        return update_file_data(file_data, new_content, file_format=self.file_format, compression=self.compression), int(occurrences)
 
     # Removed legacy grep() convenience to keep lean surface
 
@@ -348,25 +832,134 @@ class StoreBackend(BackendProtocol):
     ) -> list[GrepMatch] | str:
         store = self._get_store()
         namespace = self._get_namespace()
-        items = self._search_store_paginated(store, namespace)
-        files: dict[str, Any] = {}
-        for item in items:
-            try:
-                files[item.key] = self._convert_store_item_to_file_data(item)
-            except ValueError:
-                continue
-        return grep_matches_from_files(files, pattern, path, glob)
+        items = self._trigram_items(store, namespace, pattern, path, glob) if self.grep_index else None
+        if items is None and self.metadata_index:
+            items = self._indexed_items(store, namespace, pattern, path, glob)
+        if items is None:
+            items = self._search_store_paginated(store, namespace)
+        if isinstance(items, str):
+            return items
+        return grep_matches_from_files(self._items_file_data(namespace, items), pattern, path, glob)
+
+    async def agrep_raw(
+        self,
+        pattern: str,
+        path: str | None = None,
+        glob: str | None = None,
+    ) -> list[GrepMatch] | str:
+        """Async version of grep_raw using the store's native async API."""
+        store = self._get_store()
+        namespace = self._get_namespace()
+        items = await self._atrigram_items(store, namespace, pattern, path, glob) if self.grep_index else None
+        if items is None and self.metadata_index:
+            items = await self._aindexed_items(store, namespace, pattern, path, glob)
+        if items is None:
+            items = await self._asearch_store_paginated(store, namespace)
+        if isinstance(items, str):
+            return items
+        return grep_matches_from_files(self._items_file_data(namespace, items), pattern, path, glob)
+
+    def _grep_dir(self, pattern: str, path: str | None) -> tuple[str | None, str | None]:
+        """Validate the arguments of an indexed grep.
+
+        Returns:
+            An error message for an invalid pattern, and the directory to
+            search, None if the path is invalid and nothing matches.
+        """
+        try:
+            compile_regex(pattern)
+        except re.error as e:
+            return f"Invalid regex pattern: {e}", None
+        try:
+            return None, _validate_path(path)
+        except ValueError:
+            return None, None
+
+    def _indexed_items(self, store: BaseStore, namespace: tuple[str, ...], pattern: str, path: str | None, glob: str | None) -> list[Item] | str:
+        """Fetch the files a grep has to search, using the metadata index to select them."""
+        error, dir_path = self._grep_dir(pattern, path)
+        if error is not None or dir_path is None:
+            return error or []
+        paths = _filter_paths((item.value["path"] for item in self._search_meta(store, namespace, dir_path, recursive=True)), glob)
+        if not paths:
+            return []
+        return [item for item in store.batch([GetOp(namespace, p) for p in paths]) if isinstance(item, Item)]
+
+    def _trigram_items(
+        self, store: BaseStore, namespace: tuple[str, ...], pattern: str, path: str | None, glob: str | None
+    ) -> list[Item] | str | None:
+        """Fetch the files containing every trigram the pattern requires.
+
+        Returns:
+            The candidate items, an error message, or None if the pattern
+            requires no trigram and the grep index cannot narrow the search.
+        """
+        error, dir_path = self._grep_dir(pattern, path)
+        if error is not None or dir_path is None:
+            return error or []
+        trigrams = required_trigrams(pattern)
+        if trigrams is None:
+            return None
+        candidates: set[str] | None = None
+        for posting_ns in posting_namespaces(namespace, trigrams):
+            paths = {item.key for item in self._search_store_paginated(store, posting_ns, page_size=500)}
+            candidates = paths if candidates is None else candidates & paths
+            if not candidates:
+                return []
+        selected = _filter_paths((p for p in candidates or () if p.startswith(dir_path)), glob)
+        if not selected:
+            return []
+        return [item for item in store.batch([GetOp(namespace, p) for p in selected]) if isinstance(item, Item)]
+
+    async def _atrigram_items(
+        self, store: BaseStore, namespace: tuple[str, ...], pattern: str, path: str | None, glob: str | None
+    ) -> list[Item] | str | None:
+        """Async version of _trigram_items; the posting lists are fetched concurrently."""
+        error, dir_path = self._grep_dir(pattern, path)
+        if error is not None or dir_path is None:
+            return error or []
+        trigrams = required_trigrams(pattern)
+        if trigrams is None:
+            return None
+        postings = await asyncio.gather(
+            *(self._asearch_store_paginated(store, posting_ns, page_size=500) for posting_ns in posting_namespaces(namespace, trigrams))
+        )
+        candidates = set.intersection(*({item.key for item in items} for items in postings))
+        paths = _filter_paths((p for p in candidates if p.startswith(dir_path)), glob)
+        if not paths:
+            return []
+        return [item for item in await store.abatch([GetOp(namespace, p) for p in paths]) if isinstance(item, Item)]
+
+    async def _aindexed_items(
+        self, store: BaseStore, namespace: tuple[str, ...], pattern: str, path: str | None, glob: str | None
+    ) -> list[Item] | str:
+        """Async version of _indexed_items."""
+        error, dir_path = self._grep_dir(pattern, path)
+        if error is not None or dir_path is None:
+            return error or []
+        paths = _filter_paths((item.value["path"] for item in await self._asearch_meta(store, namespace, dir_path, recursive=True)), glob)
+        if not paths:
+            return []
+        return [item for item in await store.abatch([GetOp(namespace, p) for p in paths]) if isinstance(item, Item)]
 
     def glob_info(self, pattern: str, path: str = "/") -> list[FileInfo]:
         store = self._get_store()
         namespace = self._get_namespace()
-        items = self._search_store_paginated(store, namespace)
-        files: dict[str, Any] = {}
-        for item in items:
-            try:
-                files[item.key] = self._convert_store_item_to_file_data(item)
-            except ValueError:
-                continue
+        if self.metadata_index:
+            return self._indexed_glob(store, namespace, pattern, path)
+        return self._glob_from_items(namespace, self._search_store_paginated(store, namespace), pattern, path)
+
+    async def aglob_info(self, pattern: str, path: str = "/") -> list[FileInfo]:
+        """Async version of glob_info using the store's native async API."""
+        store = self._get_store()
+        namespace = self._get_namespace()
+        if self.metadata_index:
+            return await self._aindexed_glob(store, namespace, pattern, path)
+        return self._glob_from_items(namespace, await self._asearch_store_paginated(store, namespace), pattern, path)
+
+    def _glob_from_items(self, namespace: tuple[str, ...], items: list[Item], pattern: str, path: str) -> list[FileInfo]:
+        """Match pattern against all items of the namespace."""
+        files = self._items_file_data(namespace, items)
         result = _glob_search_files(files, pattern, path)
         if result == "No files found":
             return []
@@ -374,20 +967,97 @@ class StoreBackend(BackendProtocol):
         infos: list[FileInfo] = []
         for p in paths:
             fd = files.get(p)
-            size = len("\n".join(fd.get("content", []))) if fd else 0
             infos.append(
                 {
                     "path": p,
                     "is_dir": False,
-                    "size": int(size),
-                    "modified_at": fd.get("modified_at", "") if fd else "",
+                    "size": file_data_size(fd) if fd else 0,
+                    "modified_at": timestamp_to_iso(fd.get("modified_at", "")) if fd else "",
                 }
             )
         return infos
 
+    def _indexed_ls(self, store: BaseStore, namespace: tuple[str, ...], path: str) -> list[FileInfo]:
+        """Answer ls_info from the metadata of one directory and its child namespaces."""
+        normalized_path = path if path.endswith("/") else path + "/"
+        meta_items = self._search_meta(store, namespace, normalized_path, recursive=False)
+        return self._ls_from_meta(meta_items, self._list_subdirs(store, namespace, normalized_path))
+
+    async def _aindexed_ls(self, store: BaseStore, namespace: tuple[str, ...], path: str) -> list[FileInfo]:
+        """Async version of _indexed_ls; files and subdirectories are listed concurrently."""
+        normalized_path = path if path.endswith("/") else path + "/"
+        meta_items, subdirs = await asyncio.gather(
+            self._asearch_meta(store, namespace, normalized_path, recursive=False),
+            self._alist_subdirs(store, namespace, normalized_path),
+        )
+        return self._ls_from_meta(meta_items, subdirs)
+
+    def _ls_from_meta(self, meta_items: list[Item], subdirs: list[str]) -> list[FileInfo]:
+        infos = [self._meta_info(item) for item in meta_items]
+        infos.extend({"path": subdir, "is_dir": True, "size": 0, "modified_at": ""} for subdir in subdirs)
+        infos.sort(key=lambda x: x.get("path", ""))
+        return infos
+
+    def _indexed_glob(self, store: BaseStore, namespace: tuple[str, ...], pattern: str, path: str) -> list[FileInfo]:
+        """Answer glob_info from metadata under the pattern's literal leading directories."""
+        try:
+            normalized_path = _validate_path(path)
+        except ValueError:
+            return []
+        meta_items = self._search_meta(store, namespace, normalized_path + _glob_literal_dir(pattern), recursive=True)
+        return self._glob_from_meta(meta_items, pattern, path)
+
+    async def _aindexed_glob(self, store: BaseStore, namespace: tuple[str, ...], pattern: str, path: str) -> list[FileInfo]:
+        """Async version of _indexed_glob."""
+        try:
+            normalized_path = _validate_path(path)
+        except ValueError:
+            return []
+        meta_items = await self._asearch_meta(store, namespace, normalized_path + _glob_literal_dir(pattern), recursive=True)
+        return self._glob_from_meta(meta_items, pattern, path)
+
+    def _glob_from_meta(self, meta_items: list[Item], pattern: str, path: str) -> list[FileInfo]:
+        metas = {item.value["path"]: item for item in meta_items}
+        result = _glob_search_files({p: {"modified_at": item.value.get("modified_at", "")} for p, item in metas.items()}, pattern, path)
+        if result == "No files found":
+            return []
+        return [self._meta_info(metas[p]) for p in result.split("\n")]
+
+    def _upload_ops(
+        self, namespace: tuple[str, ...], files: list[tuple[str, bytes]], manifests: dict[str, object]
+    ) -> tuple[list[PutOp], dict[str, dict[str, Any]]]:
+        """Build the PutOps for uploaded files, in input order, followed by grep index updates.
+
+        Returns the ops and the FileData of each uploaded path. The FileData is
+        only cached once the batch has been applied.
+        """
+        ops: list[PutOp] = []
+        uploaded: dict[str, dict[str, Any]] = {}
+        for path, content in files:
+            file_data = self._create_file_data(content.decode("utf-8"))
+            ops.extend(self._file_ops(namespace, path, file_data))
+            uploaded[path] = file_data
+        if self.grep_index:
+            ops.extend(self._grep_index_ops(namespace, uploaded, manifests))
+        return ops, uploaded
+
+    def _download_responses(self, namespace: tuple[str, ...], paths: list[str], items: Sequence[object]) -> list[FileDownloadResponse]:
+        """Turn the results of a batch of GetOps into download responses."""
+        responses: list[FileDownloadResponse] = []
+        for path, item in zip(paths, items, strict=True):
+            if not isinstance(item, Item):
+                responses.append(FileDownloadResponse(path=path, content=None, error="file_not_found"))
+                continue
+            file_data = self._item_file_data(namespace, item)
+            content_bytes = file_data_to_string(file_data).encode("utf-8")
+            responses.append(FileDownloadResponse(path=path, content=content_bytes, error=None))
+        return responses
+
     def upload_files(self, files: list[tuple[str, bytes]]) -> list[FileUploadResponse]:
         """Upload multiple files to the store.
 
+        All files are written with a single `store.batch()` call.
+
         Args:
             files: List of (path, content) tuples where content is bytes.
 
@@ -397,23 +1067,29 @@ class StoreBackend(BackendProtocol):
         """
         store = self._get_store()
         namespace = self._get_namespace()
-        responses: list[FileUploadResponse] = []
-
-        for path, content in files:
-            content_str = content.decode("utf-8")
-            # Create file data
-            file_data = create_file_data(content_str)
-            store_value = self._convert_file_data_to_store_value(file_data)
-
-            # Store the file
-            store.put(namespace, path, store_value)
-            responses.append(FileUploadResponse(path=path, error=None))
-
-        return responses
+        ops, uploaded = self._upload_ops(namespace, files, self._fetch_manifests(store, namespace, [path for path, _ in files]))
+        if ops:
+            store.batch(ops)
+        for path, file_data in uploaded.items():
+            self._cache_put(namespace, path, file_data)
+        return [FileUploadResponse(path=path, error=None) for path, _ in files]
+
+    async def aupload_files(self, files: list[tuple[str, bytes]]) -> list[FileUploadResponse]:
+        """Async version of upload_files using `store.abatch()`."""
+        store = self._get_store()
+        namespace = self._get_namespace()
+        ops, uploaded = self._upload_ops(namespace, files, await self._afetch_manifests(store, namespace, [path for path, _ in files]))
+        if ops:
+            await store.abatch(ops)
+        for path, file_data in uploaded.items():
+            self._cache_put(namespace, path, file_data)
+        return [FileUploadResponse(path=path, error=None) for path, _ in files]
 
     def download_files(self, paths: list[str]) -> list[FileDownloadResponse]:
         """Download multiple files from the store.
 
+        All files are fetched with a single `store.batch()` call.
+
         Args:
             paths: List of file paths to download.
 
@@ -423,20 +1099,12 @@ class StoreBackend(BackendProtocol):
         """
         store = self._get_store()
         namespace = self._get_namespace()
-        responses: list[FileDownloadResponse] = []
-
-        for path in paths:
-            item = store.get(namespace, path)
-
-            if item is None:
-                responses.append(FileDownloadResponse(path=path, content=None, error="file_not_found"))
-                continue
+        items = store.batch([GetOp(namespace, path) for path in paths]) if paths else []
+        return self._download_responses(namespace, paths, items)
 
-            file_data = self._convert_store_item_to_file_data(item)
-            # Convert file data to bytes
-            content_str = file_data_to_string(file_data)
-            content_bytes = content_str.encode("utf-8")
-
-            responses.append(FileDownloadResponse(path=path, content=content_bytes, error=None))
-
-        return responses
+    async def adownload_files(self, paths: list[str]) -> list[FileDownloadResponse]:
+        """Async version of download_files using `store.abatch()`."""
+        store = self._get_store()
+        namespace = self._get_namespace()
+        items = await store.abatch([GetOp(namespace, path) for path in paths]) if paths else []
+        return self._download_responses(namespace, paths, items)
@@ -0,0 +1,311 @@
+"""In-process cache of directory listings used by FilesystemBackend.
+
+`DirectoryCache.listdir()` returns the entries of a directory together with the
+stat data `ls_info` and `glob_info` need, built once with `os.scandir`. A repeated
+listing of an unchanged directory is a dictionary lookup.
+
+Cached listings are invalidated in one of two ways:
+
+- On Linux, every cached directory gets an inotify watch. Pending events are
+  drained (without blocking) before each lookup and drop the listings they
+  touch. A queue overflow drops everything.
+- Elsewhere, or when a watch cannot be added (e.g. the per-user watch limit is
+  reached), a listing is re-validated against the directory's mtime on every
+  lookup and expires after `poll_ttl` seconds. The TTL bounds how stale the size
+  and mtime of files that were modified in place can be, since that does not
+  change the directory's own mtime.
+
+The owning backend also calls `invalidate()` for every path it writes itself.
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import stat
+import struct
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ONLYDIR = 0x01000000
+_IN_NONBLOCK = os.O_NONBLOCK
+_IN_CLOEXEC = os.O_CLOEXEC
+
+_WATCH_MASK = (
+    _IN_MODIFY
+    | _IN_ATTRIB
+    | _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+    | _IN_DELETE_SELF
+    | _IN_MOVE_SELF
+    | _IN_ONLYDIR
+)
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+@dataclass(frozen=True)
+class CachedEntry:
+    """A directory entry with the stat data captured when it was listed.
+
+    `is_dir` and `is_file` follow symlinks, like `Path.is_dir()` and
+    `Path.is_file()`. `size`, `mtime` and `mtime_ns` are None if the entry
+    could not be stat'ed (e.g. a dangling symlink).
+    """
+
+    name: str
+    path: str
+    is_dir: bool
+    is_file: bool
+    is_symlink: bool
+    size: int | None
+    mtime: float | None
+    mtime_ns: int | None = None
+
+
+@dataclass
+class _Listing:
+    entries: list[CachedEntry]
+    dir_mtime_ns: int
+    cached_at: float
+    wd: int | None
+
+
+def scan_directory(path: str) -> list[CachedEntry]:
+    """List a directory with `os.scandir`, capturing each entry's stat data."""
+    entries: list[CachedEntry] = []
+    with os.scandir(path) as it:
+        for entry in it:
+            try:
+                is_symlink = entry.is_symlink()
+                st: os.stat_result | None = entry.stat()
+            except OSError:
+                st = None
+            if st is None:
+                entries.append(CachedEntry(entry.name, entry.path, is_dir=False, is_file=False, is_symlink=True, size=None, mtime=None))
+                continue
+            entries.append(
+                CachedEntry(
+                    entry.name,
+                    entry.path,
+                    is_dir=stat.S_ISDIR(st.st_mode),
+                    is_file=stat.S_ISREG(st.st_mode),
+                    is_symlink=is_symlink,
+                    size=st.st_size,
+                    mtime=st.st_mtime,
+                    mtime_ns=st.st_mtime_ns,
+                )
+            )
+    return entries
+
+
+class _Inotify:
+    """Minimal non-blocking inotify binding over libc via ctypes."""
+
+    def __init__(self) -> None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._rm_watch = libc.inotify_rm_watch
+        self._rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.fd = fd
+
+    def add_watch(self, path: str) -> int | None:
+        wd = self._add_watch(self.fd, os.fsencode(path), _WATCH_MASK)
+        return wd if wd >= 0 else None
+
+    def rm_watch(self, wd: int) -> None:
+        self._rm_watch(self.fd, wd)
+
+    def read_events(self) -> list[tuple[int, int]]:
+        """Return pending (wd, mask) pairs without blocking."""
+        events: list[tuple[int, int]] = []
+        while True:
+            try:
+                buf = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return events
+            except OSError as e:
+                if e.errno == errno.EINTR:
+                    continue
+                raise
+            offset = 0
+            while offset + _EVENT_HEADER.size <= len(buf):
+                wd, mask, _cookie, name_len = _EVENT_HEADER.unpack_from(buf, offset)
+                events.append((wd, mask))
+                offset += _EVENT_HEADER.size + name_len
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class DirectoryCache:
+    """Bounded, thread-safe cache of directory listings keyed by absolute path."""
+
+    def __init__(self, *, use_inotify: bool = True, poll_ttl: float = 2.0, max_dirs: int = 4096) -> None:
+        """Create an empty cache.
+
+        Args:
+            use_inotify: Use inotify for invalidation when available (Linux).
+            poll_ttl: Maximum age in seconds of a listing that is validated by
+                polling rather than by inotify.
+            max_dirs: Maximum number of directory listings kept in memory.
+        """
+        self.poll_ttl = poll_ttl
+        self.max_dirs = max_dirs
+        self._listings: OrderedDict[str, _Listing] = OrderedDict()
+        self._by_wd: dict[int, str] = {}
+        # Directories that changed while they were being scanned
+        self._changed: set[str] = set()
+        self._lock = threading.Lock()
+        self._inotify: _Inotify | None = None
+        if use_inotify and sys.platform.startswith("linux"):
+            try:
+                self._inotify = _Inotify()
+            except (OSError, AttributeError):
+                self._inotify = None
+
+    @property
+    def uses_inotify(self) -> bool:
+        """Whether listings are invalidated by inotify events."""
+        return self._inotify is not None
+
+    def close(self) -> None:
+        """Release the inotify descriptor and drop every listing."""
+        with self._lock:
+            self._listings.clear()
+            self._by_wd.clear()
+            if self._inotify is not None:
+                self._inotify.close()
+                self._inotify = None
+
+    def __del__(self) -> None:
+        """Release the inotify descriptor when the cache is collected."""
+        if getattr(self, "_inotify", None) is not None:
+            self.close()
+
+    def _drop(self, path: str) -> None:
+        listing = self._listings.pop(path, None)
+        if listing is not None and listing.wd is not None and self._by_wd.get(listing.wd) == path:
+            del self._by_wd[listing.wd]
+            if self._inotify is not None:
+                self._inotify.rm_watch(listing.wd)
+
+    def _drain(self) -> None:
+        if self._inotify is None:
+            return
+        for wd, mask in self._inotify.read_events():
+            if mask & _IN_Q_OVERFLOW:
+                self._changed.update(self._by_wd.values())
+                for listed in list(self._listings):
+                    self._drop(listed)
+                continue
+            path = self._by_wd.get(wd)
+            if path is None:
+                continue
+            if mask & _IN_IGNORED:
+                # The kernel already removed the watch
+                del self._by_wd[wd]
+                listing = self._listings.get(path)
+                if listing is not None:
+                    listing.wd = None
+            self._changed.add(path)
+            self._drop(path)
+            # The parent's listing carries this directory's mtime
+            self._drop(os.path.dirname(path))  # noqa: PTH120
+
+    def _is_fresh(self, path: str, listing: _Listing) -> bool:
+        if listing.wd is not None:
+            return True
+        if time.monotonic() - listing.cached_at > self.poll_ttl:
+            return False
+        try:
+            return os.stat(path).st_mtime_ns == listing.dir_mtime_ns  # noqa: PTH116
+        except OSError:
+            return False
+
+    def listdir(self, path: str) -> list[CachedEntry]:
+        """Return the entries of directory path, from cache when still valid.
+
+        Raises:
+            OSError: If the directory cannot be listed, as `os.scandir` would.
+        """
+        with self._lock:
+            self._drain()
+            listing = self._listings.get(path)
+            if listing is not None and self._is_fresh(path, listing):
+                self._listings.move_to_end(path)
+                return listing.entries
+            if listing is not None:
+                self._drop(path)
+
+        # Watch before scanning; an event that arrives while scanning means
+        # the listing may already be stale, so it is returned but not cached
+        with self._lock:
+            wd = self._inotify.add_watch(path) if self._inotify is not None else None
+            if wd is not None:
+                if wd in self._by_wd and self._by_wd[wd] != path:
+                    # Same directory already watched under another path; poll instead
+                    wd = None
+                else:
+                    self._by_wd[wd] = path
+            self._changed.discard(path)
+        try:
+            dir_mtime_ns = os.stat(path).st_mtime_ns  # noqa: PTH116
+            entries = scan_directory(path)
+        except OSError:
+            with self._lock:
+                if wd is not None and self._by_wd.get(wd) == path and path not in self._listings:
+                    del self._by_wd[wd]
+                    if self._inotify is not None:
+                        self._inotify.rm_watch(wd)
+            raise
+
+        with self._lock:
+            self._drain()
+            if path in self._changed:
+                self._changed.discard(path)
+                if wd is not None and self._by_wd.get(wd) == path and self._inotify is not None:
+                    del self._by_wd[wd]
+                    self._inotify.rm_watch(wd)
+                return entries
+            if wd is not None and self._by_wd.get(wd) != path:
+                wd = None
+            self._listings[path] = _Listing(entries, dir_mtime_ns, time.monotonic(), wd)
+            self._listings.move_to_end(path)
+            while len(self._listings) > self.max_dirs:
+                self._drop(next(iter(self._listings)))
+        return entries
+
+    def invalidate(self, path: str) -> None:
+        """Drop the listings affected by a change to path.
+
+        That is path itself (if it is a cached directory) and every cached
+        ancestor, since creating a file may also have created its parents.
+        """
+        with self._lock:
+            self._drop(path)
+            parent = os.path.dirname(path)  # noqa: PTH120
+            while parent and parent != path:
+                self._drop(parent)
+                path, parent = parent, os.path.dirname(parent)  # noqa: PTH120
@@ -5,21 +5,51 @@ helpers used by backends and the composite router. Structured helpers
 enable composition without fragile string parsing.
 """
 
+import base64
+import functools
 import re
-from datetime import UTC, datetime
+import time
+from array import array
+from collections.abc import Iterable
+from datetime import UTC, datetime, timedelta
 from pathlib import Path
-from typing import Any, Literal
+from re import _parser as sre_parse  # type: ignore[attr-defined]
+from typing import TYPE_CHECKING, Any, Literal
 
 import wcmatch.glob as wcglob
 
+try:
+    import zstandard
+except ImportError:
+    zstandard = None  # type: ignore[assignment]
+
+from deepagents.backends.blobs import BLOB_ENCODING
+from deepagents.backends.patterns import compile_glob, compile_regex
 from deepagents.backends.protocol import FileInfo as _FileInfo
 from deepagents.backends.protocol import GrepMatch as _GrepMatch
 
+if TYPE_CHECKING:
+    from deepagents.backends.path_index import PathIndex
+
 EMPTY_CONTENT_WARNING = "System reminder: File exists but has empty contents"
 MAX_LINE_LENGTH = 10000
 LINE_NUMBER_WIDTH = 6
 TOOL_RESULT_TOKEN_LIMIT = 20000  # Same threshold as eviction
 TRUNCATION_GUIDANCE = "... [results truncated, try being more specific with your parameters]"
+UNAVAILABLE_GUIDANCE = "... [results incomplete, these locations could not be searched: {locations}]"
+
+FILE_DATA_VERSION = 2
+"""Version of the compact FileData encoding written when `file_format="v2"`."""
+
+FileDataFormat = Literal["v1", "v2"]
+"""FileData encodings: "v1" is the legacy list of lines with ISO timestamps,
+"v2" a single content string with integer epoch-microsecond timestamps."""
+
+FileDataCompression = Literal["zstd"]
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+# The separators str.splitlines() splits on
+_LINE_BREAK = re.compile("\r\n|[\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]")
 
 # Re-export protocol types for backwards compatibility
 FileInfo = _FileInfo
@@ -90,61 +120,194 @@ def check_empty_content(content: str) -> str | None:
     Returns:
         Warning message if empty, None otherwise
     """
-    if not content or content.strip() == "":
+    if not content or content.isspace():
         return EMPTY_CONTENT_WARNING
     return None
 
 
+def timestamp_to_iso(value: str | int) -> str:
+    """Return a FileData timestamp as an ISO 8601 string.
+
+    Args:
+        value: ISO string (v1) or integer epoch microseconds (v2)
+
+    Returns:
+        ISO 8601 timestamp; strings are returned unchanged
+    """
+    if isinstance(value, str):
+        return value
+    return (_EPOCH + timedelta(microseconds=value)).isoformat()
+
+
+def _timestamp_to_epoch_us(value: str | int) -> int:
+    if isinstance(value, int):
+        return value
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=UTC)
+    return (parsed - _EPOCH) // timedelta(microseconds=1)
+
+
+def _check_file_format(file_format: FileDataFormat, compression: FileDataCompression | None) -> None:
+    if file_format not in ("v1", "v2"):
+        msg = f"Unknown FileData format: {file_format!r}"
+        raise ValueError(msg)
+    if compression is None:
+        return
+    if compression != "zstd":
+        msg = f"Unknown FileData compression: {compression!r}"
+        raise ValueError(msg)
+    if file_format != "v2":
+        msg = 'FileData compression requires file_format="v2"'
+        raise ValueError(msg)
+    if zstandard is None:
+        msg = "zstd compression requires the 'zstandard' package: pip install 'deepagents[zstd]'"
+        raise ImportError(msg)
+
+
+@functools.lru_cache(maxsize=32)
+def _zstd_decompress(data: bytes) -> str:
+    return zstandard.ZstdDecompressor().decompress(data).decode("utf-8")
+
+
+@functools.lru_cache(maxsize=32)
+def _line_spans(content: str) -> tuple[array, array]:
+    """Start and end offsets of the lines `content.splitlines()` would return."""
+    starts = array("q")
+    ends = array("q")
+    pos = 0
+    for m in _LINE_BREAK.finditer(content):
+        starts.append(pos)
+        ends.append(m.start())
+        pos = m.end()
+    if pos < len(content):
+        starts.append(pos)
+        ends.append(len(content))
+    return starts, ends
+
+
+def _encode_file_data(content: str, created_at: str | int, modified_at: int, compression: FileDataCompression | None) -> dict[str, Any]:
+    encoded: str | bytes = content
+    encoding = "utf-8"
+    if compression == "zstd":
+        compressed = zstandard.ZstdCompressor().compress(content.encode("utf-8"))
+        # Tiny files do not shrink; keep them readable without zstandard
+        if len(compressed) < len(content):
+            encoded, encoding = compressed, "zstd"
+    return {
+        "version": FILE_DATA_VERSION,
+        "encoding": encoding,
+        "content": encoded,
+        "size": len(content),
+        "created_at": _timestamp_to_epoch_us(created_at),
+        "modified_at": modified_at,
+    }
+
+
+def is_compact_file_data(file_data: dict[str, Any]) -> bool:
+    """Return whether file_data uses the compact (v2) encoding."""
+    return file_data.get("version", 1) >= FILE_DATA_VERSION
+
+
 def file_data_to_string(file_data: dict[str, Any]) -> str:
     """Convert FileData to plain string content.
 
+    Accepts both the legacy list-of-lines encoding and the compact encoding.
+
     Args:
         file_data: FileData dict with 'content' key
 
     Returns:
         Content as string with lines joined by newlines
     """
-    return "\n".join(file_data["content"])
-
-
-def create_file_data(content: str, created_at: str | None = None) -> dict[str, Any]:
+    content = file_data["content"]
+    if isinstance(content, list):
+        return "\n".join(content)
+    if file_data.get("encoding") == BLOB_ENCODING:
+        msg = "File content is stored in a blob store; resolve it through the backend that owns it"
+        raise ValueError(msg)
+    if file_data.get("encoding") == "zstd":
+        if zstandard is None:
+            msg = "Reading zstd-compressed file data requires the 'zstandard' package: pip install 'deepagents[zstd]'"
+            raise ImportError(msg)
+        return _zstd_decompress(base64.b64decode(content) if isinstance(content, str) else content)
+    return content
+
+
+def file_data_lines(file_data: dict[str, Any]) -> list[str]:
+    """Return the lines of FileData, split on newlines as the legacy encoding stores them."""
+    content = file_data["content"]
+    if isinstance(content, list):
+        return content
+    return file_data_to_string(file_data).split("\n")
+
+
+def file_data_size(file_data: dict[str, Any]) -> int:
+    """Return the length of FileData content in characters without joining lines."""
+    if "size" in file_data:
+        return int(file_data["size"])
+    content = file_data.get("content", [])
+    if isinstance(content, list):
+        return sum(len(line) for line in content) + max(len(content) - 1, 0)
+    return len(file_data_to_string(file_data))
+
+
+def create_file_data(
+    content: str,
+    created_at: str | int | None = None,
+    *,
+    file_format: FileDataFormat = "v1",
+    compression: FileDataCompression | None = None,
+) -> dict[str, Any]:
     """Create a FileData object with timestamps.
 
     Args:
         content: File content as string
-        created_at: Optional creation timestamp (ISO format)
+        created_at: Optional creation timestamp (ISO format or epoch microseconds)
+        file_format: "v1" for the legacy list of lines, "v2" for the compact
+            encoding (one content string, integer epoch-microsecond timestamps)
+        compression: Optional compression of v2 content ("zstd")
 
     Returns:
         FileData dict with content and timestamps
     """
+    _check_file_format(file_format, compression)
+    if file_format == "v2":
+        now_us = time.time_ns() // 1000
+        text = content if isinstance(content, str) else "\n".join(content)
+        return _encode_file_data(text, created_at or now_us, now_us, compression)
+
     lines = content.split("\n") if isinstance(content, str) else content
     now = datetime.now(UTC).isoformat()
 
     return {
         "content": lines,
-        "created_at": created_at or now,
+        "created_at": timestamp_to_iso(created_at) if created_at else now,
         "modified_at": now,
     }
 
 
-def update_file_data(file_data: dict[str, Any], content: str) -> dict[str, Any]:
+def update_file_data(
+    file_data: dict[str, Any],
+    content: str,
+    *,
+    file_format: FileDataFormat | None = None,
+    compression: FileDataCompression | None = None,
+) -> dict[str, Any]:
     """Update FileData with new content, preserving creation timestamp.
 
     Args:
         file_data: Existing FileData dict
         content: New content as string
+        file_format: Encoding of the result; defaults to that of file_data
+        compression: Optional compression of v2 content ("zstd")
 
     Returns:
         Updated FileData dict
     """
-    lines = content.split("\n") if isinstance(content, str) else content
-    now = datetime.now(UTC).isoformat()
-
-    return {
-        "content": lines,
-        "created_at": file_data["created_at"],
-        "modified_at": now,
-    }
+    if file_format is None:
+        file_format = "v2" if is_compact_file_data(file_data) else "v1"
+    return create_file_data(content, file_data["created_at"], file_format=file_format, compression=compression)
 
 
 def format_read_response(
@@ -167,15 +330,19 @@ def format_read_response(
     if empty_msg:
         return empty_msg
 
-    lines = content.splitlines()
-    start_idx = offset
-    end_idx = min(start_idx + limit, len(lines))
-
-    if start_idx >= len(lines):
-        return f"Error: Line offset {offset} exceeds file length ({len(lines)} lines)"
+    if isinstance(file_data["content"], list):
+        # Legacy content is re-joined on every call, so there is nothing to cache
+        lines = content.splitlines()
+        if offset >= len(lines):
+            return f"Error: Line offset {offset} exceeds file length ({len(lines)} lines)"
+        selected_lines = lines[offset : offset + limit]
+    else:
+        starts, ends = _line_spans(content)
+        if offset >= len(starts):
+            return f"Error: Line offset {offset} exceeds file length ({len(starts)} lines)"
+        selected_lines = [content[starts[i] : ends[i]] for i in range(offset, min(offset + limit, len(starts)))]
 
-    selected_lines = lines[start_idx:end_idx]
-    return format_content_with_line_numbers(selected_lines, start_line=start_idx + 1)
+    return format_content_with_line_numbers(selected_lines, start_line=offset + 1)
 
 
 def perform_string_replacement(
@@ -220,6 +387,202 @@ def truncate_if_too_long(result: list[str] | str) -> list[str] | str:
     return result
 
 
+def extract_required_literals(pattern: str) -> list[str]:
+    """Extract literal substrings that every match of a regex must contain.
+
+    Only runs of plain literal characters at the top level of the pattern are
+    considered; groups, repeats, classes and alternations end a run. The result
+    is therefore conservative: an empty list means nothing can be assumed about
+    the text of a match, not that the pattern cannot match.
+
+    Case-insensitive flags are not taken into account. Callers doing exact
+    substring checks must inspect the compiled pattern's flags themselves.
+
+    Args:
+        pattern: Regex pattern in Python `re` syntax.
+
+    Returns:
+        Required literals, longest first. Empty if the pattern is invalid or
+        has no top-level literal runs.
+    """
+    try:
+        parsed = sre_parse.parse(pattern)
+    except (re.error, RecursionError):
+        return []
+
+    literals: list[str] = []
+    run: list[str] = []
+    for op, av in parsed:
+        if op == sre_parse.LITERAL:
+            run.append(chr(av))
+            continue
+        if run:
+            literals.append("".join(run))
+            run = []
+    if run:
+        literals.append("".join(run))
+
+    literals.sort(key=len, reverse=True)
+    return literals
+
+
+_NEWLINE = ord("\n")
+_NEWLINE_CATEGORIES = frozenset(
+    {
+        sre_parse.CATEGORY_SPACE,
+        sre_parse.CATEGORY_NOT_DIGIT,
+        sre_parse.CATEGORY_NOT_WORD,
+        sre_parse.CATEGORY_LINEBREAK,
+        sre_parse.CATEGORY_UNI_SPACE,
+        sre_parse.CATEGORY_UNI_NOT_DIGIT,
+        sre_parse.CATEGORY_UNI_NOT_WORD,
+        sre_parse.CATEGORY_UNI_LINEBREAK,
+    }
+)
+_REPEATS = (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT, getattr(sre_parse, "POSSESSIVE_REPEAT", sre_parse.MAX_REPEAT))
+
+
+def _set_matches_newline(items: list[tuple[Any, Any]]) -> bool:
+    for op, av in items:
+        if op is sre_parse.NEGATE:
+            return True
+        if op is sre_parse.LITERAL and av == _NEWLINE:
+            return True
+        if op is sre_parse.RANGE and av[0] <= _NEWLINE <= av[1]:
+            return True
+        if op is sre_parse.CATEGORY and av in _NEWLINE_CATEGORIES:
+            return True
+    return False
+
+
+def _can_cross_lines(items: Iterable[tuple[Any, Any]], *, dotall: bool) -> bool:  # noqa: PLR0911, PLR0912
+    """Return whether a parsed pattern might match differently on a buffer than line by line.
+
+    That is the case if it can consume a newline, looks around its match,
+    anchors to the start or end of the whole string, or asserts a non-boundary.
+    Unknown constructs are treated as unsafe.
+    """
+    for op, av in items:
+        if op is sre_parse.LITERAL:
+            if av == _NEWLINE:
+                return True
+        elif op is sre_parse.NOT_LITERAL:
+            if av != _NEWLINE:
+                return True
+        elif op is sre_parse.ANY:
+            if dotall:
+                return True
+        elif op is sre_parse.IN:
+            if _set_matches_newline(av):
+                return True
+        elif op is sre_parse.AT:
+            # \B matches between the two newlines of a blank line, but never on an empty line alone
+            if av in (sre_parse.AT_BEGINNING_STRING, sre_parse.AT_END_STRING, sre_parse.AT_NON_BOUNDARY):
+                return True
+        elif op is sre_parse.SUBPATTERN:
+            _group, add_flags, del_flags, sub = av
+            inner_dotall = (dotall or bool(add_flags & re.DOTALL)) and not del_flags & re.DOTALL
+            if _can_cross_lines(sub, dotall=inner_dotall):
+                return True
+        elif op in _REPEATS:
+            if _can_cross_lines(av[2], dotall=dotall):
+                return True
+        elif op is sre_parse.BRANCH:
+            if any(_can_cross_lines(branch, dotall=dotall) for branch in av[1]):
+                return True
+        elif op is sre_parse.GROUPREF_EXISTS:
+            _group, yes, no = av
+            if _can_cross_lines(yes, dotall=dotall) or (no is not None and _can_cross_lines(no, dotall=dotall)):
+                return True
+        elif op is getattr(sre_parse, "ATOMIC_GROUP", None):
+            if _can_cross_lines(av, dotall=dotall):
+                return True
+        elif op is not sre_parse.GROUPREF:
+            return True
+    return False
+
+
+@functools.lru_cache(maxsize=64)
+def _compile_grep(pattern: str) -> tuple[re.Pattern[str], re.Pattern[str] | None, str | None]:
+    """Compile pattern for `grep_lines`.
+
+    Returns:
+        The pattern compiled as is; a MULTILINE variant that may be run over a
+        whole buffer, or None if the pattern must be applied line by line;
+        and a literal every match contains, or None.
+    """
+    regex = compile_regex(pattern)
+    parsed = sre_parse.parse(pattern)
+    # A multiline "^" is tried at every position of a buffer, which is slower
+    # than trying each line once, so anchored patterns stay line by line
+    anchored = len(parsed) > 0 and parsed[0] == (sre_parse.AT, sre_parse.AT_BEGINNING)
+    buffer_regex = None
+    if not anchored and not _can_cross_lines(parsed, dotall=bool(parsed.state.flags & re.DOTALL)):
+        buffer_regex = compile_regex(pattern, re.MULTILINE)
+    literal = None
+    if not regex.flags & re.IGNORECASE:
+        literals = extract_required_literals(pattern)
+        if literals:
+            literal = literals[0]
+    return regex, buffer_regex, literal
+
+
+def _grep_buffer(text: str, regex: re.Pattern[str]) -> list[tuple[int, str]]:
+    """Return the (line number, line) pairs of text containing a match of regex.
+
+    Line numbers are found by counting newlines since the previous match, and
+    the search resumes at the next line, so every line is reported at most once.
+    """
+    results: list[tuple[int, str]] = []
+    pos = 0
+    line_num = 1
+    end_of_text = len(text)
+    while pos <= end_of_text:
+        m = regex.search(text, pos)
+        if m is None:
+            break
+        match_start = m.start()
+        line_num += text.count("\n", pos, match_start)
+        start = text.rfind("\n", pos, match_start) + 1 or pos
+        end = text.find("\n", match_start)
+        if end == -1:
+            end = end_of_text
+        results.append((line_num, text[start:end]))
+        pos = end + 1
+        line_num += 1
+    return results
+
+
+def grep_file_data(file_data: dict[str, Any], pattern: str) -> list[tuple[int, str]]:
+    """Return the (line number, line) pairs of file_data whose line matches pattern.
+
+    Matches exactly what `re.search` on each of `file_data_lines(file_data)`
+    would, but runs the regex over the whole content at once when the pattern
+    cannot match across lines, and skips contents missing a literal that every
+    match must contain.
+
+    Raises:
+        re.error: If pattern is not a valid regex.
+    """
+    regex, buffer_regex, literal = _compile_grep(pattern)
+    content = file_data["content"]
+    if isinstance(content, list):
+        text = "\n".join(content)
+        if literal is not None and literal not in text:
+            return []
+        # Hand-built state may hold "lines" with embedded newlines
+        if buffer_regex is None or text.count("\n") != len(content) - 1:
+            return [(line_num, line) for line_num, line in enumerate(content, 1) if regex.search(line)]
+        return _grep_buffer(text, buffer_regex)
+
+    text = file_data_to_string(file_data)
+    if literal is not None and literal not in text:
+        return []
+    if buffer_regex is None:
+        return [(line_num, line) for line_num, line in enumerate(text.split("\n"), 1) if regex.search(line)]
+    return _grep_buffer(text, buffer_regex)
+
+
 def _validate_path(path: str | None) -> str:
     """Validate and normalize a path.
 
@@ -244,10 +607,32 @@ def _validate_path(path: str | None) -> str:
     return normalized
 
 
+_GLOB_MAGIC = re.compile(r"[*?\[\]{}!\\]")
+
+
+def _glob_literal_dir(pattern: str) -> str:
+    """Return the leading directories of pattern that contain no glob syntax."""
+    segments = pattern.split("/")[:-1]
+    literal: list[str] = []
+    for segment in segments:
+        if not segment or segment in (".", "..") or _GLOB_MAGIC.search(segment):
+            break
+        literal.append(segment + "/")
+    return "".join(literal)
+
+
+def _files_under(files: dict[str, Any], prefix: str, index: "PathIndex | None") -> dict[str, Any]:
+    """Return the entries of files whose path starts with prefix."""
+    if index is None:
+        return {fp: fd for fp, fd in files.items() if fp.startswith(prefix)}
+    return {fp: files[fp] for fp in index.with_prefix(prefix) if fp in files}
+
+
 def _glob_search_files(
     files: dict[str, Any],
     pattern: str,
     path: str = "/",
+    index: "PathIndex | None" = None,
 ) -> str:
     """Search files dict for paths matching glob pattern.
 
@@ -255,6 +640,8 @@ def _glob_search_files(
         files: Dictionary of file paths to FileData.
         pattern: Glob pattern (e.g., "*.py", "**/*.ts").
         path: Base path to search from.
+        index: Optional sorted index of the keys of files, used to visit only
+            the paths under the pattern's literal leading directories.
 
     Returns:
         Newline-separated file paths, sorted by modification time (most recent first).
@@ -272,7 +659,7 @@ def _glob_search_files(
     except ValueError:
         return "No files found"
 
-    filtered = {fp: fd for fp, fd in files.items() if fp.startswith(normalized_path)}
+    filtered = _files_under(files, normalized_path + _glob_literal_dir(pattern), index)
 
     # Respect standard glob semantics:
     # - Patterns without path separators (e.g., "*.py") match only in the current
@@ -280,14 +667,15 @@ def _glob_search_files(
     # - Use "**" explicitly for recursive matching.
     effective_pattern = pattern
 
+    matcher = compile_glob(effective_pattern, wcglob.BRACE | wcglob.GLOBSTAR)
     matches = []
     for file_path, file_data in filtered.items():
         relative = file_path[len(normalized_path) :].lstrip("/")
         if not relative:
             relative = file_path.split("/")[-1]
 
-        if wcglob.globmatch(relative, effective_pattern, flags=wcglob.BRACE | wcglob.GLOBSTAR):
-            matches.append((file_path, file_data["modified_at"]))
+        if matcher.match(relative):
+            matches.append((file_path, timestamp_to_iso(file_data["modified_at"])))
 
     matches.sort(key=lambda x: x[1], reverse=True)
 
@@ -353,7 +741,7 @@ def _grep_search_files(
         ```
     """
     try:
-        regex = re.compile(pattern)
+        _compile_grep(pattern)
     except re.error as e:
         return f"Invalid regex pattern: {e}"
 
@@ -365,15 +753,14 @@ def _grep_search_files(
     filtered = {fp: fd for fp, fd in files.items() if fp.startswith(normalized_path)}
 
     if glob:
-        filtered = {fp: fd for fp, fd in filtered.items() if wcglob.globmatch(Path(fp).name, glob, flags=wcglob.BRACE)}
+        glob_matcher = compile_glob(glob, wcglob.BRACE)
+        filtered = {fp: fd for fp, fd in filtered.items() if glob_matcher.match(Path(fp).name)}
 
     results: dict[str, list[tuple[int, str]]] = {}
     for file_path, file_data in filtered.items():
-        for line_num, line in enumerate(file_data["content"], 1):
-            if regex.search(line):
-                if file_path not in results:
-                    results[file_path] = []
-                results[file_path].append((line_num, line))
+        file_matches = grep_file_data(file_data, pattern)
+        if file_matches:
+            results[file_path] = file_matches
 
     if not results:
         return "No matches found"
@@ -388,15 +775,18 @@ def grep_matches_from_files(
     pattern: str,
     path: str | None = None,
     glob: str | None = None,
+    index: "PathIndex | None" = None,
 ) -> list[GrepMatch] | str:
     """Return structured grep matches from an in-memory files mapping.
 
     Returns a list of GrepMatch on success, or a string for invalid inputs
     (e.g., invalid regex). We deliberately do not raise here to keep backends
     non-throwing in tool contexts and preserve user-facing error messages.
+    An optional sorted `index` of the keys lets only the files under path be
+    visited; keys it lists that are missing from files are skipped.
     """
     try:
-        regex = re.compile(pattern)
+        _compile_grep(pattern)
     except re.error as e:
         return f"Invalid regex pattern: {e}"
 
@@ -405,16 +795,15 @@ def grep_matches_from_files(
     except ValueError:
         return []
 
-    filtered = {fp: fd for fp, fd in files.items() if fp.startswith(normalized_path)}
+    filtered = _files_under(files, normalized_path, index)
 
     if glob:
-        filtered = {fp: fd for fp, fd in filtered.items() if wcglob.globmatch(Path(fp).name, glob, flags=wcglob.BRACE)}
+        glob_matcher = compile_glob(glob, wcglob.BRACE)
+        filtered = {fp: fd for fp, fd in filtered.items() if glob_matcher.match(Path(fp).name)}
 
     matches: list[GrepMatch] = []
     for file_path, file_data in filtered.items():
-        for line_num, line in enumerate(file_data["content"], 1):
-            if regex.search(line):
-                matches.append({"path": file_path, "line": int(line_num), "text": line})
+        matches.extend({"path": file_path, "line": line_num, "text": line} for line_num, line in grep_file_data(file_data, pattern))
     return matches
 
 
@@ -430,7 +819,24 @@ def format_grep_matches(
     matches: list[GrepMatch],
     output_mode: Literal["files_with_matches", "content", "count"],
 ) -> str:
-    """Format structured grep matches using existing formatting logic."""
+    """Format structured grep matches using existing formatting logic.
+
+    If the backend reported that it stopped searching early (see
+    `GrepMatchList.truncated`), the truncation guidance is appended so the
+    caller knows the results are incomplete. Locations that could not be
+    searched (`GrepMatchList.unavailable`) are listed after the results.
+    """
+    unavailable = getattr(matches, "unavailable", None)
     if not matches:
-        return "No matches found"
-    return _format_grep_results(build_grep_results_dict(matches), output_mode)
+        return "No matches found" + (f"\n{unavailable_note(unavailable)}" if unavailable else "")
+    formatted = _format_grep_results(build_grep_results_dict(matches), output_mode)
+    if getattr(matches, "truncated", False):
+        formatted += "\n" + TRUNCATION_GUIDANCE
+    if unavailable:
+        formatted += "\n" + unavailable_note(unavailable)
+    return formatted
+
+
+def unavailable_note(locations: list[str]) -> str:
+    """Return the note telling the caller which locations could not be searched."""
+    return UNAVAILABLE_GUIDANCE.format(locations=", ".join(locations))
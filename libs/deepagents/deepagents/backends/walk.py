@@ -0,0 +1,265 @@
+"""Directory walker shared by FilesystemBackend glob, grep and indexing.
+
+`walk_files()` walks a tree with `os.scandir` (or any compatible `listdir`, such
+as a `DirectoryCache`) and returns its regular files. It can:
+
+- honour `.gitignore` and `.ignore` files the way ripgrep does,
+- prune directories by name pattern (VCS metadata by default),
+- skip hidden entries,
+- follow directory symlinks without looping,
+- walk subtrees on several threads.
+
+Results are sorted by path, so they do not depend on scheduling.
+
+Ignore-file semantics follow gitignore(5). Blank lines and `#` comments are
+skipped, and `!` re-includes. A trailing `/` restricts a rule to directories.
+A rule containing a `/` anywhere but at the end is anchored to the directory of
+the file that declares it; any other rule matches at any depth. When several
+rules match, the last one wins. Rules from deeper directories come after rules
+from their ancestors, and `.ignore` comes after `.gitignore`. As in ripgrep,
+`.gitignore` files (and `.git/info/exclude`) only apply inside a git
+repository, while `.ignore` files apply anywhere, including those in
+directories above the walk root.
+"""
+
+import fnmatch
+import os
+from collections.abc import Callable, Iterable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+
+import wcmatch.glob as wcglob
+
+from deepagents.backends.patterns import compile_glob
+from deepagents.backends.tree_cache import CachedEntry, scan_directory
+
+DEFAULT_PRUNE_DIRS: tuple[str, ...] = (".git", ".hg", ".svn")
+"""Directory names never descended into unless overridden."""
+
+_GLOB_FLAGS = wcglob.GLOBSTAR | wcglob.DOTGLOB
+
+
+@dataclass(frozen=True)
+class IgnoreRule:
+    """One compiled line of an ignore file."""
+
+    base: str
+    matcher: wcglob.WcMatcher[str]
+    negated: bool
+    dir_only: bool
+
+    def matches(self, path: str, *, is_dir: bool) -> bool:
+        """Return whether the rule applies to the absolute path."""
+        if self.dir_only and not is_dir:
+            return False
+        prefix = self.base.rstrip("/") + "/"
+        return path.startswith(prefix) and bool(self.matcher.match(path[len(prefix) :]))
+
+
+def parse_ignore_lines(lines: Iterable[str], base: str) -> list[IgnoreRule]:
+    """Compile gitignore-style lines declared in directory base."""
+    rules: list[IgnoreRule] = []
+    for raw in lines:
+        line = raw.rstrip("\n").rstrip("\r")
+        if not line.endswith("\\ "):
+            line = line.rstrip(" ")
+        if not line or line.startswith("#"):
+            continue
+        negated = line.startswith("!")
+        if negated or line.startswith(("\\#", "\\!")):
+            line = line[1:]
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            continue
+        pattern = line.lstrip("/") if "/" in line else "**/" + line
+        try:
+            matcher = compile_glob(pattern, _GLOB_FLAGS)
+        except Exception:  # noqa: BLE001, S112  # skip malformed rules like git does
+            continue
+        rules.append(IgnoreRule(base=base, matcher=matcher, negated=negated, dir_only=dir_only))
+    return rules
+
+
+def _read_rules(path: str, base: str) -> list[IgnoreRule]:
+    try:
+        with open(path, encoding="utf-8", errors="replace") as f:  # noqa: PTH123
+            return parse_ignore_lines(f, base)
+    except OSError:
+        return []
+
+
+def _is_ignored(rules: tuple[IgnoreRule, ...], path: str, *, is_dir: bool) -> bool:
+    for rule in reversed(rules):
+        if rule.matches(path, is_dir=is_dir):
+            return not rule.negated
+    return False
+
+
+def _find_repo_root(path: str) -> str | None:
+    current = os.path.abspath(path)  # noqa: PTH100
+    while True:
+        if os.path.exists(os.path.join(current, ".git")):  # noqa: PTH110, PTH118
+            return current
+        parent = os.path.dirname(current)  # noqa: PTH120
+        if parent == current:
+            return None
+        current = parent
+
+
+@dataclass(frozen=True)
+class _WalkOptions:
+    ignore_files: bool
+    use_gitignore: bool
+    hidden: bool
+    prune_dirs: tuple[str, ...]
+    follow_symlinks: bool
+    listdir: Callable[[str], list[CachedEntry]]
+
+
+def _dir_rules(directory: str, entries: list[CachedEntry], options: _WalkOptions) -> list[IgnoreRule]:
+    if not options.ignore_files:
+        return []
+    names = {entry.name for entry in entries if entry.is_file}
+    rules: list[IgnoreRule] = []
+    if options.use_gitignore and ".gitignore" in names:
+        rules.extend(_read_rules(os.path.join(directory, ".gitignore"), directory))  # noqa: PTH118
+    if ".ignore" in names:
+        rules.extend(_read_rules(os.path.join(directory, ".ignore"), directory))  # noqa: PTH118
+    return rules
+
+
+def _initial_rules(root: str, repo_root: str | None, options: _WalkOptions) -> tuple[IgnoreRule, ...]:
+    """Collect the rules declared above root that still apply inside it."""
+    if not options.ignore_files:
+        return ()
+    rules: list[IgnoreRule] = []
+    if repo_root is not None and options.use_gitignore:
+        rules.extend(_read_rules(os.path.join(repo_root, ".git", "info", "exclude"), repo_root))  # noqa: PTH118
+    # Directories from the filesystem root down to root's parent
+    ancestors: list[str] = []
+    current = root
+    while (parent := os.path.dirname(current)) != current:  # noqa: PTH120
+        ancestors.append(parent)
+        current = parent
+    for directory in reversed(ancestors):
+        # .gitignore files above the repository are not part of it
+        if options.use_gitignore and repo_root is not None and os.path.commonpath((directory, repo_root)) == repo_root:
+            rules.extend(_read_rules(os.path.join(directory, ".gitignore"), directory))  # noqa: PTH118
+        rules.extend(_read_rules(os.path.join(directory, ".ignore"), directory))  # noqa: PTH118
+    return tuple(rules)
+
+
+def _visit(
+    directory: str,
+    rules: tuple[IgnoreRule, ...],
+    options: _WalkOptions,
+) -> tuple[list[CachedEntry], list[tuple[str, tuple[IgnoreRule, ...]]]]:
+    """List one directory; return its files and the subdirectories to descend into."""
+    try:
+        entries = options.listdir(directory)
+    except OSError:
+        return [], []
+    local = _dir_rules(directory, entries, options)
+    if local:
+        rules = (*rules, *local)
+
+    files: list[CachedEntry] = []
+    subdirs: list[tuple[str, tuple[IgnoreRule, ...]]] = []
+    for entry in entries:
+        if not options.hidden and entry.name.startswith("."):
+            continue
+        if entry.is_dir:
+            if entry.is_symlink and not options.follow_symlinks:
+                continue
+            if any(fnmatch.fnmatchcase(entry.name, pattern) for pattern in options.prune_dirs):
+                continue
+            if rules and _is_ignored(rules, entry.path, is_dir=True):
+                continue
+            subdirs.append((entry.path, rules))
+        elif entry.is_file:
+            if rules and _is_ignored(rules, entry.path, is_dir=False):
+                continue
+            files.append(entry)
+    return files, subdirs
+
+
+def _dir_key(path: str) -> tuple[int, int] | None:
+    try:
+        st = os.stat(path)  # noqa: PTH116
+    except OSError:
+        return None
+    return st.st_dev, st.st_ino
+
+
+def walk_files(
+    root: str,
+    *,
+    ignore_files: bool = True,
+    hidden: bool = True,
+    prune_dirs: Iterable[str] = DEFAULT_PRUNE_DIRS,
+    follow_symlinks: bool = False,
+    workers: int = 1,
+    listdir: Callable[[str], list[CachedEntry]] = scan_directory,
+) -> list[CachedEntry]:
+    """Return the regular files under root, sorted by path.
+
+    Args:
+        root: Directory to walk.
+        ignore_files: Honour `.gitignore` / `.ignore` files.
+        hidden: Include entries whose name starts with a dot.
+        prune_dirs: fnmatch patterns of directory names not to descend into.
+        follow_symlinks: Descend into symlinked directories. Each directory is
+            visited at most once, so symlink loops terminate.
+        workers: Number of threads listing directories concurrently.
+        listdir: Function returning the entries of a directory, e.g. the
+            `listdir` method of a `DirectoryCache`.
+
+    Returns:
+        File entries, sorted by path.
+    """
+    root = os.path.abspath(root)  # noqa: PTH100
+    repo_root = _find_repo_root(root) if ignore_files else None
+    options = _WalkOptions(
+        ignore_files=ignore_files,
+        use_gitignore=repo_root is not None,
+        hidden=hidden,
+        prune_dirs=tuple(prune_dirs),
+        follow_symlinks=follow_symlinks,
+        listdir=listdir,
+    )
+    seen: set[tuple[int, int]] = set()
+
+    def _admit(path: str) -> bool:
+        # Only needed when symlinks can lead back into the tree
+        if not follow_symlinks:
+            return True
+        key = _dir_key(path)
+        if key is None or key in seen:
+            return False
+        seen.add(key)
+        return True
+
+    files: list[CachedEntry] = []
+    pending = [(root, _initial_rules(root, repo_root, options))] if _admit(root) else []
+
+    if workers <= 1:
+        while pending:
+            directory, rules = pending.pop()
+            found, subdirs = _visit(directory, rules, options)
+            files.extend(found)
+            pending.extend(item for item in subdirs if _admit(item[0]))
+    else:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="deepagents-walk") as pool:
+            running: set[Future[tuple[list[CachedEntry], list[tuple[str, tuple[IgnoreRule, ...]]]]]] = {
+                pool.submit(_visit, directory, rules, options) for directory, rules in pending
+            }
+            while running:
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    found, subdirs = future.result()
+                    files.extend(found)
+                    running.update(pool.submit(_visit, path, rules, options) for path, rules in subdirs if _admit(path))
+
+    files.sort(key=lambda entry: entry.path)
+    return files
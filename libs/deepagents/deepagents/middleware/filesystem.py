@@ -34,6 +34,7 @@ from deepagents.backends.utils import (
     format_grep_matches,
     sanitize_tool_call_id,
     truncate_if_too_long,
+    unavailable_note,
 )
 
 EMPTY_CONTENT_WARNING = "System reminder: File exists but has empty contents"
@@ -44,16 +45,32 @@ DEFAULT_READ_LIMIT = 500
 
 
 class FileData(TypedDict):
-    """Data structure for storing file contents with metadata."""
+    """Data structure for storing file contents with metadata.
 
-    content: list[str]
-    """Lines of the file."""
+    Two encodings exist. The legacy one (no `version` key) stores the lines of
+    the file and ISO 8601 timestamps. The compact one (`version` 2) stores the
+    whole content as one string, or as zstd-compressed bytes, with integer
+    epoch-microsecond timestamps. Backends read both; see
+    `deepagents.backends.utils.file_data_to_string`.
+    """
+
+    content: list[str] | str | bytes
+    """Lines of the file (legacy), or the whole content (compact)."""
+
+    created_at: str | int
+    """ISO 8601 timestamp (legacy) or epoch microseconds (compact) of file creation."""
+
+    modified_at: str | int
+    """ISO 8601 timestamp (legacy) or epoch microseconds (compact) of last modification."""
+
+    version: NotRequired[int]
+    """Encoding version; 2 for the compact encoding, absent for the legacy one."""
 
-    created_at: str
-    """ISO 8601 timestamp of file creation."""
+    encoding: NotRequired[Literal["utf-8", "zstd"]]
+    """How compact content is stored."""
 
-    modified_at: str
-    """ISO 8601 timestamp of last modification."""
+    size: NotRequired[int]
+    """Length of the content in characters (compact encoding only)."""
 
 
 def _file_data_reducer(left: dict[str, FileData] | None, right: dict[str, FileData | None]) -> dict[str, FileData]:
@@ -62,6 +79,8 @@ def _file_data_reducer(left: dict[str, FileData] | None, right: dict[str, FileDa
     This reducer enables file deletion by treating `None` values in the right
     dictionary as deletion markers. It's designed to work with LangGraph's
     state management where annotated reducers control how state updates merge.
+    File values are merged as-is, so legacy and compact `FileData` entries can
+    coexist in the same state.
 
     Args:
         left: Existing files dictionary. May be `None` during initialization.
@@ -571,6 +590,9 @@ def _glob_tool_generator(
         infos = resolved_backend.glob_info(pattern, path=path)
         paths = [fi.get("path", "") for fi in infos]
         result = truncate_if_too_long(paths)
+        unavailable = getattr(infos, "unavailable", None)
+        if unavailable:
+            result = [*result, unavailable_note(unavailable)]
         return str(result)
 
     async def async_glob(pattern: str, runtime: ToolRuntime[None, FilesystemState], path: str = "/") -> str:
@@ -579,6 +601,9 @@ def _glob_tool_generator(
         infos = await resolved_backend.aglob_info(pattern, path=path)
         paths = [fi.get("path", "") for fi in infos]
         result = truncate_if_too_long(paths)
+        unavailable = getattr(infos, "unavailable", None)
+        if unavailable:
+            result = [*result, unavailable_note(unavailable)]
         return str(result)
 
     return StructuredTool.from_function(
@@ -0,0 +1,70 @@
+"""Benchmark batched upload/download throughput for FilesystemBackend and StoreBackend.
+
+Skipped unless RUN_BENCHMARKS is set. Run with `make benchmark`. Batch sizes can
+be tuned with BENCH_IO_SMALL_FILES, BENCH_IO_LARGE_FILES and BENCH_IO_LARGE_MB.
+"""
+
+import os
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+from langchain.tools import ToolRuntime
+from langgraph.store.memory import InMemoryStore
+
+from deepagents.backends.filesystem import FilesystemBackend
+from deepagents.backends.store import StoreBackend
+
+pytestmark = pytest.mark.skipif(not os.environ.get("RUN_BENCHMARKS"), reason="set RUN_BENCHMARKS=1 to run benchmarks")
+
+N_SMALL = int(os.environ.get("BENCH_IO_SMALL_FILES", "1000"))
+N_LARGE = int(os.environ.get("BENCH_IO_LARGE_FILES", "10"))
+LARGE_MB = int(os.environ.get("BENCH_IO_LARGE_MB", "8"))
+
+
+def _batches() -> dict[str, list[tuple[str, bytes]]]:
+    small = [(f"/small/d{i % 20}/f{i}.txt", f"small file {i}\n".encode() * 8) for i in range(N_SMALL)]
+    line = b"0123456789abcdef" * 4 + b"\n"
+    large = [(f"/large/f{i}.txt", line * (LARGE_MB * 1024 * 1024 // len(line))) for i in range(N_LARGE)]
+    return {f"{N_SMALL} small": small, f"{N_LARGE} x {LARGE_MB} MiB": large}
+
+
+def _timed(fn: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def _report(title: str, rows: list[tuple[str, float, int]]) -> None:
+    print(f"\n{title}")  # noqa: T201
+    for name, seconds, n_bytes in rows:
+        print(f"  {name:<36} {seconds * 1000:9.1f} ms  {n_bytes / seconds / 1e6:9.1f} MB/s")  # noqa: T201
+
+
+def test_filesystem_batch_io(tmp_path: Path) -> None:
+    rows = []
+    for label, files in _batches().items():
+        n_bytes = sum(len(c) for _, c in files)
+        paths = [p for p, _ in files]
+        for workers in (1, 8):
+            be = FilesystemBackend(root_dir=tmp_path / f"w{workers}", virtual_mode=True, max_io_workers=workers)
+            rows.append((f"upload {label} (workers={workers})", _timed(lambda be=be, files=files: be.upload_files(files)), n_bytes))
+            rows.append((f"download {label} (workers={workers})", _timed(lambda be=be, paths=paths: be.download_files(paths)), n_bytes))
+            assert all(r.error is None for r in be.download_files(paths))
+    _report("FilesystemBackend batch I/O", rows)
+
+
+def test_store_batch_io() -> None:
+    rows = []
+    for label, files in _batches().items():
+        n_bytes = sum(len(c) for _, c in files)
+        paths = [p for p, _ in files]
+        rt = ToolRuntime(state={}, context=None, tool_call_id="bench", store=InMemoryStore(), stream_writer=lambda _: None, config={})
+        be = StoreBackend(rt)
+        rows.append((f"upload {label} (batched)", _timed(lambda be=be, files=files: be.upload_files(files)), n_bytes))
+        rows.append((f"download {label} (batched)", _timed(lambda be=be, paths=paths: be.download_files(paths)), n_bytes))
+        # Per-file baseline: one round trip per file, as before batching
+        rows.append((f"upload {label} (per file)", _timed(lambda be=be, files=files: [be.upload_files([f]) for f in files]), n_bytes))
+        rows.append((f"download {label} (per file)", _timed(lambda be=be, paths=paths: [be.download_files([p]) for p in paths]), n_bytes))
+    _report("StoreBackend batch I/O", rows)
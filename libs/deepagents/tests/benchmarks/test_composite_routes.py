@@ -0,0 +1,50 @@
+"""Benchmark CompositeBackend route dispatch and result prefixing with many routes.
+
+Skipped unless RUN_BENCHMARKS is set. Run with `make benchmark`. The number of
+routes can be tuned with BENCH_COMPOSITE_ROUTES.
+"""
+
+import os
+import time
+from collections.abc import Callable
+
+import pytest
+
+from deepagents.backends.composite import _prefix_matches, _RouteTable
+
+pytestmark = pytest.mark.skipif(not os.environ.get("RUN_BENCHMARKS"), reason="set RUN_BENCHMARKS=1 to run benchmarks")
+
+N_ROUTES = int(os.environ.get("BENCH_COMPOSITE_ROUTES", "500"))
+N_LOOKUPS = 100_000
+N_MATCHES = 100_000
+
+
+def _timed(func: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def test_composite_routes() -> None:
+    prefixes = [f"/memories/user{i}/" for i in range(N_ROUTES // 2)] + [f"/scratch/tool{i}/" for i in range(N_ROUTES - N_ROUTES // 2)]
+    sorted_routes = sorted(((p, (p, None)) for p in prefixes), key=lambda x: len(x[0]), reverse=True)
+    table = _RouteTable(sorted_routes)
+    paths = [f"/memories/user{i % (N_ROUTES // 2 + 10)}/notes/file{i}.md" for i in range(N_LOOKUPS)]
+
+    def linear() -> list[object]:
+        return [next((route for p, route in sorted_routes if path.startswith(p)), None) for path in paths]
+
+    def trie() -> list[object]:
+        return [table.longest(path) for path in paths]
+
+    assert linear() == trie()
+    print(f"\n{N_LOOKUPS} lookups over {N_ROUTES} routes")  # noqa: T201
+    print(f"  linear startswith {_timed(linear) * 1000:8.1f} ms   trie {_timed(trie) * 1000:8.1f} ms")  # noqa: T201
+
+    def fresh() -> list[dict]:
+        return [{"path": f"/f{i}.txt", "line": i, "text": "x"} for i in range(N_MATCHES)]
+
+    copied, in_place = fresh(), fresh()
+    copy_time = _timed(lambda: [{**m, "path": f"/memories/{m['path']}"} for m in copied])
+    prefix_time = _timed(lambda: _prefix_matches(in_place, "/memories/"))
+    print(f"  prefixing {N_MATCHES} matches: dict copy {copy_time * 1000:.1f} ms   in place {prefix_time * 1000:.1f} ms")  # noqa: T201
@@ -0,0 +1,74 @@
+"""Benchmark FilesystemBackend grep: ripgrep vs. pure Python vs. trigram index.
+
+Skipped unless RUN_BENCHMARKS is set. Run with `make benchmark`. The tree size
+can be tuned with BENCH_GREP_FILES.
+"""
+
+import os
+import random
+import shutil
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from deepagents.backends.filesystem import FilesystemBackend
+
+pytestmark = pytest.mark.skipif(not os.environ.get("RUN_BENCHMARKS"), reason="set RUN_BENCHMARKS=1 to run benchmarks")
+
+N_FILES = int(os.environ.get("BENCH_GREP_FILES", "5000"))
+WORDS = ["alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel", "india", "juliet"]
+
+
+def _build_tree(root: Path) -> None:
+    rng = random.Random(0)
+    for i in range(N_FILES):
+        d = root / f"pkg{i % 50}" / f"mod{i % 7}"
+        d.mkdir(parents=True, exist_ok=True)
+        lines = [" ".join(rng.choice(WORDS) for _ in range(8)) for _ in range(40)]
+        if i % 500 == 0:
+            lines[rng.randrange(len(lines))] = "def needle_function(x):"
+        (d / f"file{i}.py").write_text("\n".join(lines) + "\n")
+
+
+def _timed(fn: Callable[[], object], repeat: int = 3) -> tuple[float, object]:
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def test_grep_backends(tmp_path: Path) -> None:
+    root = tmp_path / "tree"
+    _build_tree(root)
+    pattern = r"def needle_\w+"
+
+    plain = FilesystemBackend(root_dir=root, virtual_mode=True)
+    indexed = FilesystemBackend(root_dir=root, virtual_mode=True, content_index=True, content_index_path=tmp_path / "index.sqlite3")
+
+    python_time, python_results = _timed(lambda: plain._python_search(pattern, root, None))
+    build_start = time.perf_counter()
+    assert indexed.content_index is not None
+    indexed.content_index.refresh(root)
+    build_time = time.perf_counter() - build_start
+    index_time, index_results = _timed(lambda: indexed._indexed_search(pattern, root, None))
+
+    rows = [
+        ("python fallback", python_time),
+        ("trigram index (build)", build_time),
+        ("trigram index (warm)", index_time),
+    ]
+    if shutil.which("rg"):
+        rg_time, rg_results = _timed(lambda: plain._ripgrep_search(pattern, root, None))
+        rows.insert(0, ("ripgrep", rg_time))
+        assert rg_results == python_results
+
+    print(f"\ngrep over {N_FILES} files")  # noqa: T201
+    for name, seconds in rows:
+        print(f"  {name:<24} {seconds * 1000:9.1f} ms")  # noqa: T201
+
+    assert index_results == python_results
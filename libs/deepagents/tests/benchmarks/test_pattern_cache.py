@@ -0,0 +1,59 @@
+"""Micro-benchmark the compiled glob/regex caches over many virtual paths.
+
+Skipped unless RUN_BENCHMARKS is set. Run with `make benchmark`. The number of
+paths can be tuned with BENCH_GLOB_PATHS.
+"""
+
+import os
+import re
+import time
+from collections.abc import Callable
+
+import pytest
+import wcmatch.glob as wcglob
+from langchain.tools import ToolRuntime
+
+from deepagents.backends.patterns import compile_glob, compile_regex
+from deepagents.backends.state import StateBackend
+from deepagents.backends.utils import create_file_data
+
+pytestmark = pytest.mark.skipif(not os.environ.get("RUN_BENCHMARKS"), reason="set RUN_BENCHMARKS=1 to run benchmarks")
+
+N_PATHS = int(os.environ.get("BENCH_GLOB_PATHS", "100000"))
+FLAGS = wcglob.BRACE | wcglob.GLOBSTAR
+
+
+def _timed(func: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def test_glob_cache() -> None:
+    paths = [f"pkg{i % 100}/sub{i % 7}/module_{i}.{'py' if i % 3 else 'md'}" for i in range(N_PATHS)]
+    patterns = ["**/*.py", "pkg1*/**/module_1*.{py,md}", "*/sub3/*.md"]
+
+    print(f"\nGlob over {N_PATHS} virtual paths")  # noqa: T201
+    for pattern in patterns:
+        expected = [p for p in paths if wcglob.globmatch(p, pattern, flags=FLAGS)]
+        uncached = _timed(lambda pattern=pattern: [p for p in paths if wcglob.globmatch(p, pattern, flags=FLAGS)])
+
+        def cached(pattern: str = pattern) -> list[str]:
+            matcher = compile_glob(pattern, FLAGS)
+            return [p for p in paths if matcher.match(p)]
+
+        assert cached() == expected
+        print(f"  {pattern:<28} globmatch {uncached * 1000:8.1f} ms   compiled {_timed(cached) * 1000:8.1f} ms")  # noqa: T201
+
+    files = {"/" + p: create_file_data("x") for p in paths}
+    be = StateBackend(
+        ToolRuntime(state={"messages": [], "files": files}, context=None, tool_call_id="t", store=None, stream_writer=lambda _: None, config={})
+    )
+    be.glob_info("**/*.md")
+    print(f"  StateBackend.glob_info('**/*.md')  {_timed(lambda: be.glob_info('**/*.md')) * 1000:8.1f} ms")  # noqa: T201
+
+    pattern = r"def \w+\(self"
+    calls = 100_000
+    re_time = _timed(lambda: [re.compile(pattern) for _ in range(calls)])
+    cached_time = _timed(lambda: [compile_regex(pattern) for _ in range(calls)])
+    print(f"  {calls} regex compiles: re.compile {re_time * 1000:.1f} ms   compile_regex {cached_time * 1000:.1f} ms")  # noqa: T201
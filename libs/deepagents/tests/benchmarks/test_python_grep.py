@@ -0,0 +1,63 @@
+"""Benchmark the Python grep fallback: serial vs. process pool, with ripgrep as reference.
+
+Skipped unless RUN_BENCHMARKS is set. Run with `make benchmark`. The tree size
+can be tuned with BENCH_PYGREP_FILES.
+"""
+
+import os
+import random
+import shutil
+import time
+from pathlib import Path
+
+import pytest
+
+from deepagents.backends.filesystem import FilesystemBackend
+
+pytestmark = pytest.mark.skipif(not os.environ.get("RUN_BENCHMARKS"), reason="set RUN_BENCHMARKS=1 to run benchmarks")
+
+N_FILES = int(os.environ.get("BENCH_PYGREP_FILES", "50000"))
+WORDS = ["alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel", "india", "juliet"]
+
+
+def _build_tree(root: Path) -> None:
+    rng = random.Random(0)
+    for i in range(N_FILES):
+        d = root / f"pkg{i % 100}" / f"mod{i % 13}"
+        d.mkdir(parents=True, exist_ok=True)
+        lines = [" ".join(rng.choice(WORDS) for _ in range(8)) for _ in range(30)]
+        if i % 1000 == 0:
+            lines[rng.randrange(len(lines))] = "def needle_function(x):"
+        (d / f"file{i}.py").write_text("\n".join(lines) + "\n")
+
+
+def test_python_grep_fallback(tmp_path: Path) -> None:
+    root = tmp_path / "tree"
+    _build_tree(root)
+    # Literal prefilter applies to the first pattern; the second has no literal
+    patterns = [r"def needle_\w+", r"\bd\w+_f\w+\("]
+
+    serial = FilesystemBackend(root_dir=root, virtual_mode=True, grep_processes=1)
+    parallel = FilesystemBackend(root_dir=root, virtual_mode=True, grep_processes=os.cpu_count())
+    # Start the pool outside the timed region
+    parallel._search_paths(patterns[0], [str(p) for p in list(root.rglob("*.py"))[:2000]])
+
+    print(f"\nPython grep fallback over {N_FILES} files ({parallel.grep_processes} processes)")  # noqa: T201
+    for pattern in patterns:
+        rows = []
+        start = time.perf_counter()
+        expected = serial._python_search(pattern, root, None)
+        rows.append(("serial", time.perf_counter() - start))
+        start = time.perf_counter()
+        assert parallel._python_search(pattern, root, None) == expected
+        rows.append(("process pool", time.perf_counter() - start))
+        if shutil.which("rg"):
+            start = time.perf_counter()
+            rg_results = serial._ripgrep_search(pattern, root, None)
+            rows.append(("ripgrep", time.perf_counter() - start))
+            assert rg_results is not None
+            assert rg_results[0] == expected
+
+        print(f"  {pattern}")  # noqa: T201
+        for name, seconds in rows:
+            print(f"    {name:<14} {seconds * 1000:9.1f} ms")  # noqa: T201
@@ -0,0 +1,66 @@
+"""Benchmark BaseSandbox round trips: one execute() per operation vs. batches.
+
+Uses a local /bin/sh stand-in sandbox that adds a fixed latency to every
+execute() call, like the round trip to a remote sandbox. Skipped unless
+RUN_BENCHMARKS is set. Run with `make benchmark`. The latency and number of
+operations can be tuned with BENCH_SANDBOX_LATENCY_MS and BENCH_SANDBOX_OPS.
+"""
+
+import asyncio
+import os
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from deepagents.backends.protocol import ExecuteResponse
+from tests.unit_tests.backends.test_sandbox_backend import LocalSandbox
+
+pytestmark = pytest.mark.skipif(not os.environ.get("RUN_BENCHMARKS"), reason="set RUN_BENCHMARKS=1 to run benchmarks")
+
+LATENCY = float(os.environ.get("BENCH_SANDBOX_LATENCY_MS", "30")) / 1000
+N_OPS = int(os.environ.get("BENCH_SANDBOX_OPS", "8"))
+
+
+class RemoteSandbox(LocalSandbox):
+    """LocalSandbox paying a network round trip per execute() call."""
+
+    def execute(self, command: str) -> ExecuteResponse:
+        time.sleep(LATENCY)
+        return super().execute(command)
+
+
+def _timed(fn: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def test_sandbox_batch(tmp_path: Path) -> None:
+    for i in range(N_OPS):
+        (tmp_path / f"f{i}.py").write_text("\n".join(f"line {j} of file {i}" for j in range(200)))
+    ops = [("read", {"file_path": f"f{i}.py"}) if i % 2 else ("grep_raw", {"pattern": f"of file {i}", "path": "."}) for i in range(N_OPS)]
+
+    print(f"\n{N_OPS} file operations, {LATENCY * 1000:.0f} ms per execute()")  # noqa: T201
+    for use_helper in (False, True):
+        sandbox = RemoteSandbox(tmp_path, use_helper=use_helper, helper_dir=tmp_path / ".helper")
+        sandbox.batch(ops)  # Starts the helper
+        expected = [getattr(sandbox, name)(**kwargs) for name, kwargs in ops]
+        assert sandbox.batch(ops) == expected
+
+        async def gather(sandbox: RemoteSandbox = sandbox) -> list[object]:
+            calls = {"read": sandbox.aread, "grep_raw": sandbox.agrep_raw}
+            return await asyncio.gather(*(calls[name](**kwargs) for name, kwargs in ops))
+
+        rows = {
+            "sequential calls": lambda sandbox=sandbox: [getattr(sandbox, name)(**kwargs) for name, kwargs in ops],
+            "batch()": lambda sandbox=sandbox: sandbox.batch(ops),
+            "gathered async calls": lambda gather=gather: asyncio.run(gather()),
+        }
+        label = "helper" if use_helper else "templates"
+        for name, call in rows.items():
+            sandbox.commands.clear()
+            elapsed = _timed(call)
+            print(f"  {label:<9} {name:<22} {elapsed * 1000:8.1f} ms  {len(sandbox.commands):3d} execute() calls")  # noqa: T201
+        sandbox.stop_helper()
@@ -0,0 +1,60 @@
+"""Benchmark in-memory grep: buffer engine vs. the former per-line loop.
+
+Skipped unless RUN_BENCHMARKS is set. Run with `make benchmark`. The number of
+files can be tuned with BENCH_STATE_GREP_FILES.
+"""
+
+import os
+import random
+import re
+import time
+from pathlib import Path
+from typing import Any
+
+import pytest
+import wcmatch.glob as wcglob
+
+from deepagents.backends.utils import _validate_path, create_file_data, file_data_lines, grep_matches_from_files
+
+pytestmark = pytest.mark.skipif(not os.environ.get("RUN_BENCHMARKS"), reason="set RUN_BENCHMARKS=1 to run benchmarks")
+
+N_FILES = int(os.environ.get("BENCH_STATE_GREP_FILES", "2000"))
+WORDS = ["alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel", "india", "juliet"]
+
+
+def _per_line_grep(files: dict[str, Any], pattern: str, path: str = "/", glob: str | None = None) -> list[dict[str, Any]]:
+    """The per-line implementation grep_matches_from_files replaced."""
+    regex = re.compile(pattern)
+    normalized_path = _validate_path(path)
+    filtered = {fp: fd for fp, fd in files.items() if fp.startswith(normalized_path)}
+    if glob:
+        filtered = {fp: fd for fp, fd in filtered.items() if wcglob.globmatch(Path(fp).name, glob, flags=wcglob.BRACE)}
+    matches = []
+    for file_path, file_data in filtered.items():
+        for line_num, line in enumerate(file_data_lines(file_data), 1):
+            if regex.search(line):
+                matches.append({"path": file_path, "line": int(line_num), "text": line})
+    return matches
+
+
+def test_state_grep() -> None:
+    rng = random.Random(0)
+    contents = []
+    for i in range(N_FILES):
+        lines = [" ".join(rng.choice(WORDS) for _ in range(8)) for _ in range(200)]
+        if i % 50 == 0:
+            lines[rng.randrange(len(lines))] = "def needle_function(x):"
+        contents.append("\n".join(lines))
+    patterns = [r"needle_\w+", r"^golf \w+ hotel", r"alpha bravo", r"\bx\)"]
+
+    print(f"\nIn-memory grep over {N_FILES} files x 200 lines")  # noqa: T201
+    for file_format in ("v1", "v2"):
+        files = {f"/src/f{i}.py": create_file_data(text, file_format=file_format) for i, text in enumerate(contents)}
+        for pattern in patterns:
+            start = time.perf_counter()
+            expected = _per_line_grep(files, pattern)
+            per_line = time.perf_counter() - start
+            start = time.perf_counter()
+            assert grep_matches_from_files(files, pattern) == expected
+            buffered = time.perf_counter() - start
+            print(f"  {file_format} {pattern:<18} per-line {per_line * 1000:8.1f} ms   buffer {buffered * 1000:8.1f} ms")  # noqa: T201
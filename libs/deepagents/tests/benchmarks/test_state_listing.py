@@ -0,0 +1,45 @@
+"""Benchmark StateBackend ls/glob/grep over many virtual files.
+
+Skipped unless RUN_BENCHMARKS is set. Run with `make benchmark`. The number of
+files can be tuned with BENCH_STATE_FILES.
+"""
+
+import os
+import time
+
+import pytest
+from langchain.tools import ToolRuntime
+
+from deepagents.backends.state import StateBackend
+from deepagents.backends.utils import create_file_data
+
+pytestmark = pytest.mark.skipif(not os.environ.get("RUN_BENCHMARKS"), reason="set RUN_BENCHMARKS=1 to run benchmarks")
+
+N_FILES = int(os.environ.get("BENCH_STATE_FILES", "20000"))
+REPEAT = 20
+
+
+def test_state_listing() -> None:
+    content = "\n".join(f"result line {i}" for i in range(200))
+    files = {f"/large_tool_results/call_{i}": create_file_data(content) for i in range(N_FILES)}
+    files.update({f"/src/pkg{i}/mod.py": create_file_data(f"x = {i}") for i in range(50)})
+    be = StateBackend(
+        ToolRuntime(state={"messages": [], "files": files}, context=None, tool_call_id="t", store=None, stream_writer=lambda _: None, config={})
+    )
+
+    cases = {
+        "ls /": lambda: be.ls_info("/"),
+        "ls /src/pkg7": lambda: be.ls_info("/src/pkg7"),
+        "glob src/**/*.py": lambda: be.glob_info("src/**/*.py"),
+        "grep /src": lambda: be.grep_raw("x = 4", "/src"),
+    }
+    print(f"\nStateBackend over {N_FILES} files (mean of {REPEAT} calls, first call builds the index)")  # noqa: T201
+    for name, call in cases.items():
+        start = time.perf_counter()
+        call()
+        first = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(REPEAT):
+            call()
+        mean = (time.perf_counter() - start) / REPEAT
+        print(f"  {name:<18} first {first * 1000:8.2f} ms   mean {mean * 1000:8.3f} ms")  # noqa: T201
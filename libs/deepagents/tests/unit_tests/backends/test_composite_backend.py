@@ -1,18 +1,25 @@
+import logging
+import time
 from pathlib import Path
 
 import pytest
 from langchain.tools import ToolRuntime
 from langgraph.store.memory import InMemoryStore
 
-from deepagents.backends.composite import CompositeBackend
+from deepagents.backends.composite import CompositeBackend, _RouteTable
 from deepagents.backends.filesystem import FilesystemBackend
 from deepagents.backends.protocol import (
+    BackendProtocol,
     ExecuteResponse,
+    FileDownloadResponse,
+    FileUploadResponse,
+    GrepMatchList,
     SandboxBackendProtocol,
     WriteResult,
 )
 from deepagents.backends.state import StateBackend
 from deepagents.backends.store import StoreBackend
+from deepagents.backends.utils import TRUNCATION_GUIDANCE, format_grep_matches
 
 
 def make_runtime(tid: str = "tc"):
@@ -669,3 +676,179 @@ def test_composite_download_preserves_original_paths(tmp_path: Path):
     # Response should have the original composite path, not stripped
     assert responses[0].path == "/subdir/file.bin"
     assert responses[0].content == b"Nested file"
+
+
+class SlowBackend(BackendProtocol):
+    """Backend whose grep and glob wait before answering with one match, or raise."""
+
+    def __init__(self, name, delay=0.0, error=None):
+        self.name = name
+        self.delay = delay
+        self.error = error
+
+    def _answer(self):
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+
+    def grep_raw(self, pattern, path=None, glob=None):
+        self._answer()
+        return [{"path": f"/{self.name}.txt", "line": 1, "text": pattern}]
+
+    def glob_info(self, pattern, path="/"):
+        self._answer()
+        return [{"path": f"/{self.name}.txt", "is_dir": False, "size": 1, "modified_at": ""}]
+
+    def upload_files(self, files):
+        self._answer()
+        return [FileUploadResponse(path=path, error=None) for path, _ in files]
+
+    def download_files(self, paths):
+        self._answer()
+        return [FileDownloadResponse(path=path, content=self.name.encode(), error=None) for path in paths]
+
+
+def test_composite_grep_and_glob_fan_out_concurrently():
+    comp = CompositeBackend(default=SlowBackend("default", 0.2), routes={"/a/": SlowBackend("a", 0.2), "/b/": SlowBackend("b", 0.2)})
+    start = time.monotonic()
+    matches = comp.grep_raw("x", path="/")
+    assert time.monotonic() - start < 0.5
+    assert [m["path"] for m in matches] == ["/default.txt", "/a/a.txt", "/b/b.txt"]
+    assert not matches.truncated
+    assert [i["path"] for i in comp.glob_info("*")] == ["/a/a.txt", "/b/b.txt", "/default.txt"]
+
+
+def test_composite_fan_out_returns_partial_results(caplog: pytest.LogCaptureFixture):
+    comp = CompositeBackend(
+        default=SlowBackend("default"),
+        routes={"/slow/": SlowBackend("slow", 2.0), "/broken/": SlowBackend("broken", error=RuntimeError("down")), "/ok/": SlowBackend("ok")},
+        timeouts={"/slow/": 0.1},
+    )
+    start = time.monotonic()
+    matches = comp.grep_raw("x", path="/")
+    assert time.monotonic() - start < 1.0
+    assert [m["path"] for m in matches] == ["/default.txt", "/ok/ok.txt"]
+    # Failed backends are reported as unavailable, not as a capped search
+    assert not matches.truncated
+    assert matches.unavailable == ["/slow/", "/broken/"]
+    assert "could not be searched: /slow/, /broken/" in format_grep_matches(matches, "files_with_matches")
+    assert TRUNCATION_GUIDANCE not in format_grep_matches(matches, "files_with_matches")
+    with caplog.at_level(logging.WARNING, logger="deepagents.backends.composite"):
+        infos = comp.glob_info("*")
+    assert [i["path"] for i in infos] == ["/default.txt", "/ok/ok.txt"]
+    assert infos.unavailable == ["/slow/", "/broken/"]
+    assert "Searching /slow/ timed out" in caplog.text
+    assert "Searching /broken/ failed" in caplog.text
+    assert "RuntimeError: down" in caplog.text
+
+    # Only when every backend fails is the error raised
+    all_broken = CompositeBackend(default=SlowBackend("default", error=RuntimeError("down")), routes={"/b/": SlowBackend("b", error=OSError("gone"))})
+    with pytest.raises(RuntimeError, match="down"):
+        all_broken.grep_raw("x", path="/")
+
+
+def test_composite_timed_out_calls_do_not_hold_up_later_fan_outs():
+    comp = CompositeBackend(default=SlowBackend("default"), routes={"/slow/": SlowBackend("slow", 2.0)}, timeouts={"/slow/": 0.1})
+    for _ in range(8):
+        start = time.monotonic()
+        assert [m["path"] for m in comp.grep_raw("x", path="/")] == ["/default.txt"]
+        assert time.monotonic() - start < 0.5
+
+    # A single target is held to its timeout too
+    single = CompositeBackend(default=SlowBackend("default", 2.0), routes={}, timeouts={"default": 0.1})
+    start = time.monotonic()
+    assert single.glob_info("*") == []
+    assert time.monotonic() - start < 0.5
+
+
+def test_route_table_matches_longest_startswith():
+    prefixes = ["/", "/memories/", "/memories/user1/", "/mem", "/scratch/tool_a/", "/scratch/tool_ab/", "/a/b/c/", "/a/b", "/x.y/"]
+    routes = [(p, (p, object())) for p in sorted(prefixes, key=len, reverse=True)]
+    file_table = _RouteTable(routes)
+    dir_table = _RouteTable((p.rstrip("/"), route) for p, route in routes)
+    paths = [
+        "/",
+        "",
+        "/memories",
+        "/memories/",
+        "/memories/notes.md",
+        "/memories/user1",
+        "/memories/user1/a.md",
+        "/memoriesX/a",
+        "/mem",
+        "/me",
+        "/scratch/tool_a/out.txt",
+        "/scratch/tool_ab/out.txt",
+        "/scratch/tool_abc/out.txt",
+        "/a/b/c/d",
+        "/a/bc/d",
+        "/a/b",
+        "/x.y/z",
+        "relative/path",
+    ]
+    for path in paths:
+        expected_file = next((route for p, route in routes if path.startswith(p)), None)
+        expected_dir = next((route for p, route in routes if path.startswith(p.rstrip("/"))), None)
+        assert file_table.longest(path) == expected_file, path
+        assert dir_table.longest(path) == expected_dir, path
+
+
+def test_composite_prefixes_routed_results():
+    rt = make_runtime("t_prefix")
+    store_backend = StoreBackend(rt)
+    comp = CompositeBackend(default=StateBackend(rt), routes={"/memories/": store_backend})
+    comp.write("/memories/a.md", "hello")
+    matches = comp.grep_raw("hello", path="/memories/")
+    assert isinstance(matches, GrepMatchList)
+    assert [m["path"] for m in matches] == ["/memories/a.md"]
+    assert [i["path"] for i in comp.glob_info("*.md", path="/memories/")] == ["/memories/a.md"]
+    assert [i["path"] for i in comp.ls_info("/memories")] == ["/memories/a.md"]
+
+
+def test_composite_upload_download_batches_run_concurrently():
+    routes = {"/a/": SlowBackend("a", 0.2), "/b/": SlowBackend("b", 0.2), "/broken/": SlowBackend("broken", error=RuntimeError("down"))}
+    comp = CompositeBackend(default=SlowBackend("default", 0.2), routes=routes)
+    paths = ["/b/1", "/x", "/broken/1", "/a/1", "/b/2"]
+    start = time.monotonic()
+    uploads = comp.upload_files([(p, b"data") for p in paths])
+    assert time.monotonic() - start < 0.5
+    assert [(r.path, r.error) for r in uploads] == [
+        ("/b/1", None),
+        ("/x", None),
+        ("/broken/1", "backend_unavailable"),
+        ("/a/1", None),
+        ("/b/2", None),
+    ]
+
+    downloads = comp.download_files(paths)
+    assert [(r.path, r.content, r.error) for r in downloads] == [
+        ("/b/1", b"b", None),
+        ("/x", b"default", None),
+        ("/broken/1", None, "backend_unavailable"),
+        ("/a/1", b"a", None),
+        ("/b/2", b"b", None),
+    ]
+
+    # One batch at a time
+    sequential = CompositeBackend(default=SlowBackend("default", 0.1), routes={"/a/": SlowBackend("a", 0.1)}, max_concurrent_batches=1)
+    start = time.monotonic()
+    assert [r.error for r in sequential.upload_files([("/a/1", b""), ("/x", b"")])] == [None, None]
+    assert time.monotonic() - start >= 0.2
+
+
+def test_composite_batch_errors_are_logged_and_raised_when_all_fail(caplog: pytest.LogCaptureFixture):
+    comp = CompositeBackend(default=SlowBackend("default"), routes={"/broken/": SlowBackend("broken", error=RuntimeError("down"))})
+    with caplog.at_level(logging.ERROR, logger="deepagents.backends.composite"):
+        assert [r.error for r in comp.upload_files([("/x", b""), ("/broken/1", b"")])] == [None, "backend_unavailable"]
+    assert "down" in caplog.text
+
+    all_broken = CompositeBackend(
+        default=SlowBackend("default", error=OSError("gone")), routes={"/broken/": SlowBackend("broken", error=RuntimeError("down"))}
+    )
+    with pytest.raises(OSError, match="gone"):
+        all_broken.download_files(["/x", "/broken/1"])
+
+    # A backend without the operation is not reported as unavailable
+    unsupported = CompositeBackend(default=SlowBackend("default"), routes={"/u/": SlowBackend("u", error=NotImplementedError())})
+    with pytest.raises(NotImplementedError):
+        unsupported.upload_files([("/x", b""), ("/u/1", b"")])
@@ -1,5 +1,8 @@
 """Async tests for CompositeBackend."""
 
+import asyncio
+import logging
+import time
 from pathlib import Path
 
 import pytest
@@ -9,7 +12,11 @@ from langgraph.store.memory import InMemoryStore
 from deepagents.backends.composite import CompositeBackend
 from deepagents.backends.filesystem import FilesystemBackend
 from deepagents.backends.protocol import (
+    BackendProtocol,
     ExecuteResponse,
+    FileDownloadResponse,
+    FileUploadResponse,
+    GrepMatchList,
     SandboxBackendProtocol,
     WriteResult,
 )
@@ -580,3 +587,113 @@ async def test_composite_adownload_preserves_original_paths_async(tmp_path: Path
     # Response should have the original composite path, not stripped
     assert responses[0].path == "/subdir/file.bin"
     assert responses[0].content == b"Nested file"
+
+
+class SlowAsyncBackend(BackendProtocol):
+    """Backend whose async grep and glob wait before answering with one match, or raise."""
+
+    def __init__(self, name, delay=0.0, error=None):
+        self.name = name
+        self.delay = delay
+        self.error = error
+
+    async def _answer(self):
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+
+    async def agrep_raw(self, pattern, path=None, glob=None):
+        await self._answer()
+        return GrepMatchList([{"path": f"/{self.name}.txt", "line": 1, "text": pattern}], truncated=self.name == "capped")
+
+    async def aglob_info(self, pattern, path="/"):
+        await self._answer()
+        return [{"path": f"/{self.name}.txt", "is_dir": False, "size": 1, "modified_at": ""}]
+
+    async def aupload_files(self, files):
+        await self._answer()
+        return [FileUploadResponse(path=path, error=None) for path, _ in files]
+
+    async def adownload_files(self, paths):
+        await self._answer()
+        return [FileDownloadResponse(path=path, content=self.name.encode(), error=None) for path in paths]
+
+
+async def test_composite_async_fan_out_is_concurrent_and_partial(caplog: pytest.LogCaptureFixture):
+    comp = CompositeBackend(
+        default=SlowAsyncBackend("default", 0.2),
+        routes={
+            "/a/": SlowAsyncBackend("a", 0.2),
+            "/slow/": SlowAsyncBackend("slow", 5.0),
+            "/broken/": SlowAsyncBackend("broken", error=RuntimeError()),
+        },
+        timeouts={"/slow/": 0.3},
+    )
+    start = time.monotonic()
+    matches = await comp.agrep_raw("x", path="/")
+    assert time.monotonic() - start < 1.0
+    assert [m["path"] for m in matches] == ["/default.txt", "/a/a.txt"]
+    assert not matches.truncated
+    assert matches.unavailable == ["/slow/", "/broken/"]
+    with caplog.at_level(logging.WARNING, logger="deepagents.backends.composite"):
+        infos = await comp.aglob_info("*")
+    assert [i["path"] for i in infos] == ["/a/a.txt", "/default.txt"]
+    assert infos.unavailable == ["/slow/", "/broken/"]
+    assert "Searching /slow/ timed out" in caplog.text
+    assert "Searching /broken/ failed" in caplog.text
+
+    capped = CompositeBackend(default=SlowAsyncBackend("default"), routes={"/c/": SlowAsyncBackend("capped")})
+    assert (await capped.agrep_raw("x")).truncated
+    assert not (await CompositeBackend(default=SlowAsyncBackend("default"), routes={"/a/": SlowAsyncBackend("a")}).agrep_raw("x")).truncated
+
+
+async def test_composite_aupload_adownload_batches_run_concurrently_async():
+    routes = {"/a/": SlowAsyncBackend("a", 0.2), "/b/": SlowAsyncBackend("b", 0.2), "/broken/": SlowAsyncBackend("broken", error=RuntimeError())}
+    comp = CompositeBackend(default=SlowAsyncBackend("default", 0.2), routes=routes)
+    paths = ["/b/1", "/x", "/broken/1", "/a/1", "/b/2"]
+    start = time.monotonic()
+    uploads = await comp.aupload_files([(p, b"data") for p in paths])
+    assert time.monotonic() - start < 0.5
+    assert [(r.path, r.error) for r in uploads] == [
+        ("/b/1", None),
+        ("/x", None),
+        ("/broken/1", "backend_unavailable"),
+        ("/a/1", None),
+        ("/b/2", None),
+    ]
+
+    downloads = await comp.adownload_files(paths)
+    assert [(r.path, r.content, r.error) for r in downloads] == [
+        ("/b/1", b"b", None),
+        ("/x", b"default", None),
+        ("/broken/1", None, "backend_unavailable"),
+        ("/a/1", b"a", None),
+        ("/b/2", b"b", None),
+    ]
+
+    # At most two batches in flight: three backends take two rounds
+    limited = CompositeBackend(
+        default=SlowAsyncBackend("default", 0.1),
+        routes={"/a/": SlowAsyncBackend("a", 0.1), "/b/": SlowAsyncBackend("b", 0.1)},
+        max_concurrent_batches=2,
+    )
+    start = time.monotonic()
+    await limited.adownload_files(["/a/1", "/b/1", "/x"])
+    assert 0.2 <= time.monotonic() - start < 0.3
+
+
+async def test_composite_async_batch_errors_are_logged_and_raised_when_all_fail(caplog: pytest.LogCaptureFixture):
+    comp = CompositeBackend(default=SlowAsyncBackend("default"), routes={"/broken/": SlowAsyncBackend("broken", error=RuntimeError("down"))})
+    with caplog.at_level(logging.ERROR, logger="deepagents.backends.composite"):
+        assert [r.error for r in await comp.aupload_files([("/x", b""), ("/broken/1", b"")])] == [None, "backend_unavailable"]
+    assert "down" in caplog.text
+
+    all_broken = CompositeBackend(
+        default=SlowAsyncBackend("default", error=OSError("gone")), routes={"/b/": SlowAsyncBackend("b", error=RuntimeError())}
+    )
+    with pytest.raises(OSError, match="gone"):
+        await all_broken.adownload_files(["/x", "/b/1"])
+
+    unsupported = CompositeBackend(default=SlowAsyncBackend("default"), routes={"/u/": SlowAsyncBackend("u", error=NotImplementedError())})
+    with pytest.raises(NotImplementedError):
+        await unsupported.aupload_files([("/x", b""), ("/u/1", b"")])
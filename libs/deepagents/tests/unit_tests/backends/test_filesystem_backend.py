@@ -1,7 +1,16 @@
+import os
+import shutil
+import sqlite3
 from pathlib import Path
 
+import pytest
+
+from deepagents.backends import line_index
 from deepagents.backends.filesystem import FilesystemBackend
-from deepagents.backends.protocol import EditResult, WriteResult
+from deepagents.backends.protocol import EditResult, GrepMatchList, WriteResult
+from deepagents.backends.tree_cache import DirectoryCache
+from deepagents.backends.utils import TRUNCATION_GUIDANCE, format_grep_matches
+from deepagents.backends.walk import walk_files
 
 
 def write_file(p: Path, content: str):
@@ -489,3 +498,467 @@ def test_filesystem_download_directory_as_file(tmp_path: Path):
     assert responses[0].path == "/mydir"
     assert responses[0].content is None
     assert responses[0].error == "is_directory"
+
+
+def test_filesystem_grep_with_content_index(tmp_path: Path):
+    root = tmp_path / "root"
+    write_file(root / "a.py", "import os\nvalue = 1\n")
+    write_file(root / "pkg" / "b.py", "import sys\nVALUE = 2\n")
+    write_file(root / "pkg" / "c.txt", "nothing to see\n")
+
+    be = FilesystemBackend(root_dir=str(root), virtual_mode=True, content_index=True, content_index_path=tmp_path / "index.sqlite3")
+
+    matches = be.grep_raw("import", path="/")
+    assert isinstance(matches, list)
+    assert [(m["path"], m["line"]) for m in matches] == [("/a.py", 1), ("/pkg/b.py", 1)]
+
+    # Case-sensitive regex still decides the final match set
+    matches = be.grep_raw("VALUE", path="/")
+    assert [m["path"] for m in matches] == ["/pkg/b.py"]
+
+    # Patterns without required literals fall back to all indexed files
+    matches = be.grep_raw(r"\d", path="/pkg")
+    assert [m["path"] for m in matches] == ["/pkg/b.py"]
+
+    matches = be.grep_raw("import", path="/", glob="a.*")
+    assert [m["path"] for m in matches] == ["/a.py"]
+
+
+def test_filesystem_content_index_tracks_changes(tmp_path: Path):
+    root = tmp_path / "root"
+    write_file(root / "a.txt", "alpha\n")
+
+    be = FilesystemBackend(root_dir=str(root), virtual_mode=True, content_index=True, content_index_path=tmp_path / "index.sqlite3")
+    assert be.grep_raw("needle", path="/") == []
+
+    # Changes made through the backend update the index eagerly
+    be.write("/b.txt", "needle one\n")
+    be.edit("/a.txt", "alpha", "needle two")
+    be.upload_files([("/c.txt", b"needle three\n")])
+    assert sorted(m["path"] for m in be.grep_raw("needle", path="/")) == ["/a.txt", "/b.txt", "/c.txt"]
+
+    # Changes made behind the backend's back are picked up by mtime/size
+    write_file(root / "d.txt", "another needle\n")
+    (root / "b.txt").unlink()
+    assert sorted(m["path"] for m in be.grep_raw("needle", path="/")) == ["/a.txt", "/c.txt", "/d.txt"]
+
+    # The index persists across backend instances
+    be2 = FilesystemBackend(root_dir=str(root), virtual_mode=True, content_index=True, content_index_path=tmp_path / "index.sqlite3")
+    assert be2.content_index is not None
+    assert be2.content_index.candidates("another needle", root) == [str(root / "d.txt")]
+
+
+def test_filesystem_close_releases_content_index(tmp_path: Path):
+    root = tmp_path / "root"
+    write_file(root / "a.txt", "needle\n")
+    index_path = tmp_path / "index.sqlite3"
+
+    be = FilesystemBackend(root_dir=str(root), virtual_mode=True, content_index=True, content_index_path=index_path)
+    assert [m["path"] for m in be.grep_raw("needle", path="/")] == ["/a.txt"]
+    index = be.content_index
+    assert index is not None
+
+    be.close()
+    assert be.content_index is None
+    with pytest.raises(sqlite3.ProgrammingError):
+        index.candidates("needle", root)
+    # Closing the last connection checkpoints and removes the WAL file
+    assert not index_path.with_name(index_path.name + "-wal").exists()
+
+    # Grep keeps working without the index
+    assert [m["path"] for m in be.grep_raw("needle", path="/")] == ["/a.txt"]
+
+
+def test_filesystem_grep_max_matches_python_fallback(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    root = tmp_path
+    write_file(root / "a.txt", "\n".join(f"hit {i}" for i in range(10)))
+    be = FilesystemBackend(root_dir=str(root), virtual_mode=True, grep_max_matches=3)
+    monkeypatch.setattr(be, "_ripgrep_search", lambda *_args: None)
+
+    matches = be.grep_raw("hit", path="/")
+    assert isinstance(matches, GrepMatchList)
+    assert matches.truncated
+    assert [m["line"] for m in matches] == [1, 2, 3]
+    assert format_grep_matches(matches, "content").endswith(TRUNCATION_GUIDANCE)
+
+    unlimited = FilesystemBackend(root_dir=str(root), virtual_mode=True)
+    monkeypatch.setattr(unlimited, "_ripgrep_search", lambda *_args: None)
+    matches = unlimited.grep_raw("hit", path="/")
+    assert len(matches) == 10
+    assert not matches.truncated
+    assert TRUNCATION_GUIDANCE not in format_grep_matches(matches, "content")
+
+
+@pytest.mark.skipif(shutil.which("rg") is None, reason="ripgrep not installed")
+def test_filesystem_ripgrep_streaming_budgets(tmp_path: Path):
+    root = tmp_path
+    write_file(root / "a.txt", "\n".join(f"hit {i}" for i in range(1000)))
+
+    be = FilesystemBackend(root_dir=str(root), virtual_mode=True, grep_max_matches=5)
+    results = be._ripgrep_search("hit", root, None)
+    assert results is not None
+    by_file, truncated = results
+    assert truncated
+    assert [ln for ln, _ in by_file["/a.txt"]] == [1, 2, 3, 4, 5]
+
+    be = FilesystemBackend(root_dir=str(root), virtual_mode=True, grep_max_output_bytes=2048)
+    results = be._ripgrep_search("hit", root, None)
+    assert results is not None
+    by_file, truncated = results
+    assert truncated
+    assert 0 < len(by_file["/a.txt"]) < 1000
+
+    be = FilesystemBackend(root_dir=str(root), virtual_mode=True, grep_max_matches=1000)
+    results = be._ripgrep_search("hit", root, None)
+    assert results is not None
+    by_file, truncated = results
+    assert not truncated
+    assert len(by_file["/a.txt"]) == 1000
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "a\nbb\n\nccc\r\nd",
+        "line\n" * 50,
+        "x" * 300 + "\n" + "y\n" * 40,
+        "a\x0cb\nc\rd\ne\n",
+        "x\u2028y\n\x85z\x1dw\n" * 5,
+        # A lone \r and a CRLF straddling the 16-byte chunk boundary
+        "a" * 15 + "\rb\nc\n",
+        "a" * 15 + "\r\nb\nc\n",
+    ],
+)
+def test_filesystem_mmap_read_matches_regular_read(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, content: str):
+    monkeypatch.setattr(line_index, "CHUNK_BYTES", 16)
+    write_file(tmp_path / "f.txt", content)
+
+    regular = FilesystemBackend(root_dir=str(tmp_path), virtual_mode=True)
+    paged = FilesystemBackend(root_dir=str(tmp_path), virtual_mode=True)
+    paged.mmap_threshold_bytes = 0
+
+    n_lines = len(content.splitlines())
+    for offset in range(n_lines + 2):
+        for limit in (1, 3, 2000):
+            assert paged.read("/f.txt", offset=offset, limit=limit) == regular.read("/f.txt", offset=offset, limit=limit)
+
+
+def test_filesystem_mmap_read_only_indexes_newline_files(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(line_index, "CHUNK_BYTES", 16)
+    be = FilesystemBackend(root_dir=str(tmp_path), virtual_mode=True)
+    be.mmap_threshold_bytes = 0
+    write_file(tmp_path / "crlf.txt", "a" * 15 + "\r\nb\r\n")
+    write_file(tmp_path / "feed.txt", "a\x0cb\nc\n")
+
+    assert be.read("/crlf.txt") == "     1\t" + "a" * 15 + "\n     2\tb"
+    assert be.read("/feed.txt") == "     1\ta\n     2\tb\n     3\tc"
+    indexes = be._line_indexes._entries
+    assert indexes[str(tmp_path / "crlf.txt")].newline_only
+    assert not indexes[str(tmp_path / "feed.txt")].newline_only
+
+
+def test_filesystem_mmap_read_invalidates_on_change(tmp_path: Path):
+    write_file(tmp_path / "f.txt", "one\ntwo\n")
+    be = FilesystemBackend(root_dir=str(tmp_path), virtual_mode=True)
+    be.mmap_threshold_bytes = 0
+
+    assert "two" in be.read("/f.txt")
+    assert "exceeds file length (2 lines)" in be.read("/f.txt", offset=2)
+
+    res = be.edit("/f.txt", "two", "two\nthree")
+    assert res.error is None
+    assert "three" in be.read("/f.txt", offset=2)
+
+    write_file(tmp_path / "blank.txt", "  \n\n")
+    assert "empty contents" in be.read("/blank.txt")
+
+    responses = be.download_files(["/f.txt"])
+    assert responses[0].content == b"one\ntwo\nthree\n"
+
+
+def test_filesystem_parallel_upload_download_preserves_order(tmp_path: Path):
+    be = FilesystemBackend(root_dir=str(tmp_path), virtual_mode=True, max_io_workers=4)
+    files = [(f"/d{i % 3}/f{i}.txt", f"content {i}".encode()) for i in range(50)]
+    files.append(("/../escape.txt", b"nope"))
+
+    responses = be.upload_files(files)
+    assert [r.path for r in responses] == [p for p, _ in files]
+    assert all(r.error is None for r in responses[:-1])
+    assert responses[-1].error == "invalid_path"
+
+    paths = [p for p, _ in files[:-1]] + ["/missing.txt", "/d0"]
+    downloads = be.download_files(paths)
+    assert [r.path for r in downloads] == paths
+    assert [r.content for r in downloads[:-2]] == [c for _, c in files[:-1]]
+    assert downloads[-2].error == "file_not_found"
+    assert downloads[-1].error == "is_directory"
+
+
+def test_filesystem_upload_duplicate_paths_last_wins(tmp_path: Path):
+    be = FilesystemBackend(root_dir=str(tmp_path), virtual_mode=True, max_io_workers=4)
+    responses = be.upload_files([("/same.txt", str(i).encode()) for i in range(20)])
+    assert all(r.error is None for r in responses)
+    assert (tmp_path / "same.txt").read_bytes() == b"19"
+
+    # Paths spelled differently but resolving to the same file are aliases too
+    (tmp_path / "dir").mkdir()
+    (tmp_path / "link").symlink_to(tmp_path / "dir", target_is_directory=True)
+    aliases = ["/dir/a.txt", "dir/a.txt", "/link/a.txt", "/dir/./a.txt"]
+    responses = be.upload_files([(aliases[i % 4], str(i).encode()) for i in range(20)])
+    assert all(r.error is None for r in responses)
+    assert (tmp_path / "dir" / "a.txt").read_bytes() == b"19"
+
+
+def test_filesystem_io_pool_is_opt_in_and_closable(tmp_path: Path):
+    files = [(f"/f{i}.txt", b"x") for i in range(10)]
+    serial = FilesystemBackend(root_dir=str(tmp_path), virtual_mode=True)
+    assert all(r.error is None for r in serial.upload_files(files))
+    assert [r.content for r in serial.download_files([p for p, _ in files])] == [b"x"] * 10
+    assert serial._io_executor is None
+
+    pooled = FilesystemBackend(root_dir=str(tmp_path), virtual_mode=True, max_io_workers=4)
+    pooled.download_files([p for p, _ in files])
+    executor = pooled._io_executor
+    assert executor is not None
+    pooled.close()
+    assert pooled._io_executor is None
+    assert executor._shutdown
+    # Still usable after close()
+    assert [r.content for r in pooled.download_files(["/f0.txt", "/f1.txt"])] == [b"x", b"x"]
+    pooled.close()
+
+
+def _tree(root: Path) -> None:
+    write_file(root / "a.txt", "a")
+    write_file(root / ".hidden.txt", "h")
+    write_file(root / "src" / "m.py", "m")
+    write_file(root / "src" / "pkg" / "n.py", "n")
+    write_file(root / "src" / "pkg" / "notes.txt", "t")
+    (root / "src" / "pkg" / "dir.py").mkdir()
+    (root / "link").symlink_to(root / "src", target_is_directory=True)
+    (root / "dangling").symlink_to(root / "missing")
+
+
+@pytest.mark.parametrize("virtual_mode", [True, False])
+def test_filesystem_tree_cache_matches_uncached(tmp_path: Path, virtual_mode: bool):
+    _tree(tmp_path)
+    plain = FilesystemBackend(root_dir=str(tmp_path), virtual_mode=virtual_mode)
+    cached = FilesystemBackend(root_dir=str(tmp_path), virtual_mode=virtual_mode, tree_cache=True)
+    base = "/" if virtual_mode else str(tmp_path)
+
+    for path in (base, f"{base.rstrip('/')}/src", f"{base.rstrip('/')}/src/pkg/"):
+        assert cached.ls_info(path) == plain.ls_info(path)
+        assert cached.ls_info(path) == plain.ls_info(path)
+    for pattern in ("*.py", "*.txt", "**/*.py", "pkg/*", "src/**/*.txt", "n.py"):
+        assert cached.glob_info(pattern, "/") == plain.glob_info(pattern, "/"), pattern
+
+
+@pytest.mark.parametrize("use_inotify", [True, False])
+def test_directory_cache_sees_external_changes(tmp_path: Path, use_inotify: bool):
+    cache = DirectoryCache(use_inotify=use_inotify, poll_ttl=60)
+    write_file(tmp_path / "a.txt", "a")
+    first = cache.listdir(str(tmp_path))
+    assert [e.name for e in first] == ["a.txt"]
+    assert cache.listdir(str(tmp_path)) is first
+
+    write_file(tmp_path / "b.txt", "b")
+    if not cache.uses_inotify:
+        # Polling compares the directory mtime; make sure it visibly moved
+        st = (tmp_path).stat()
+        os.utime(tmp_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert sorted(e.name for e in cache.listdir(str(tmp_path))) == ["a.txt", "b.txt"]
+    cache.close()
+
+
+def test_filesystem_close_releases_tree_cache(tmp_path: Path):
+    write_file(tmp_path / "a.txt", "a")
+    be = FilesystemBackend(root_dir=str(tmp_path), virtual_mode=True, tree_cache=True)
+    cache = be.tree_cache
+    assert cache is not None
+    assert [i["path"] for i in be.ls_info("/")] == ["/a.txt"]
+    be.close()
+    assert be.tree_cache is None
+    assert not cache.uses_inotify
+    write_file(tmp_path / "b.txt", "b")
+    assert [i["path"] for i in be.ls_info("/")] == ["/a.txt", "/b.txt"]
+
+
+def test_filesystem_tree_cache_invalidates_own_writes(tmp_path: Path):
+    be = FilesystemBackend(root_dir=str(tmp_path), virtual_mode=True, tree_cache=True)
+    assert be.tree_cache is not None
+    be.tree_cache.close()
+    be.tree_cache = DirectoryCache(use_inotify=False, poll_ttl=60)
+
+    assert be.glob_info("*.txt") == []
+    assert be.write("/new/dir/x.txt", "x").error is None
+    assert [i["path"] for i in be.glob_info("*.txt")] == ["/new/dir/x.txt"]
+    assert [i["path"] for i in be.ls_info("/")] == ["/new/"]
+
+    be.upload_files([("/new/dir/x.txt", b"longer content")])
+    assert be.ls_info("/new/dir")[0]["size"] == len(b"longer content")
+
+
+def _repo(root: Path) -> None:
+    (root / ".git").mkdir()
+    write_file(root / ".git" / "HEAD", "ref: refs/heads/main")
+    write_file(root / ".gitignore", "node_modules/\n*.log\n/build\n!keep.log\n")
+    write_file(root / "src" / "app.py", "needle = 1")
+    write_file(root / "src" / ".ignore", "generated_*.py\n")
+    write_file(root / "src" / "generated_x.py", "needle = 2")
+    write_file(root / "src" / "debug.log", "needle log")
+    write_file(root / "src" / "keep.log", "needle kept")
+    write_file(root / "src" / "build" / "out.py", "needle not anchored")
+    write_file(root / "build" / "out.py", "needle anchored")
+    write_file(root / "node_modules" / "dep" / "index.py", "needle dep")
+    write_file(root / ".hidden" / "h.py", "needle hidden")
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_walk_files_honours_ignore_files(tmp_path: Path, workers: int):
+    _repo(tmp_path)
+    (tmp_path / "src" / "loop").symlink_to(tmp_path / "src", target_is_directory=True)
+
+    rel = lambda entries: [os.path.relpath(e.path, tmp_path) for e in entries]  # noqa: E731
+    assert rel(walk_files(str(tmp_path), hidden=False, workers=workers)) == [
+        "src/app.py",
+        "src/build/out.py",
+        "src/keep.log",
+    ]
+    everything = rel(walk_files(str(tmp_path), ignore_files=False, prune_dirs=(), workers=workers))
+    assert ".git/HEAD" in everything
+    assert "node_modules/dep/index.py" in everything
+    assert "src/loop/app.py" not in everything
+
+    followed = rel(walk_files(str(tmp_path), hidden=False, follow_symlinks=True, workers=workers))
+    assert sum(p.endswith("app.py") for p in followed) == 1
+
+    # Rules declared above the walk root still apply below it
+    assert rel(walk_files(str(tmp_path / "src"), hidden=False)) == ["src/app.py", "src/build/out.py", "src/keep.log"]
+
+
+def test_walk_files_reads_ancestor_ignore_files_outside_git(tmp_path: Path):
+    # No repository: .gitignore is not used, .ignore files apply from every ancestor
+    write_file(tmp_path / ".ignore", "*.tmp\n")
+    write_file(tmp_path / ".gitignore", "*.py\n")
+    write_file(tmp_path / "sub" / "a.py", "")
+    write_file(tmp_path / "sub" / "b.tmp", "")
+
+    rel = lambda entries: [os.path.relpath(e.path, tmp_path) for e in entries]  # noqa: E731
+    assert rel(walk_files(str(tmp_path / "sub"), hidden=False)) == ["sub/a.py"]
+    assert rel(walk_files(str(tmp_path / "sub"), hidden=False, ignore_files=False)) == ["sub/a.py", "sub/b.tmp"]
+
+
+def test_filesystem_glob_and_python_grep_use_walker(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    _repo(tmp_path)
+    be = FilesystemBackend(root_dir=str(tmp_path), virtual_mode=True)
+    monkeypatch.setattr(be, "_ripgrep_search", lambda *_args: None)
+
+    matches = be.grep_raw("needle", path="/")
+    assert sorted(m["path"] for m in matches) == ["/src/app.py", "/src/build/out.py", "/src/keep.log"]
+    # An explicitly named file is searched even if it is ignored
+    assert [m["path"] for m in be.grep_raw("needle", path="/src/debug.log")] == ["/src/debug.log"]
+
+    # By default glob matches every file, ignored files and .git included
+    assert [i["path"] for i in be.glob_info("*.py")] == [
+        "/.hidden/h.py",
+        "/build/out.py",
+        "/node_modules/dep/index.py",
+        "/src/app.py",
+        "/src/build/out.py",
+        "/src/generated_x.py",
+    ]
+    assert "/.git/HEAD" in [i["path"] for i in be.glob_info("*")]
+
+    filtered = FilesystemBackend(root_dir=str(tmp_path), virtual_mode=True, glob_respect_ignore_files=True)
+    assert [i["path"] for i in filtered.glob_info("*.py")] == ["/.hidden/h.py", "/src/app.py", "/src/build/out.py"]
+    assert "/.git/HEAD" not in [i["path"] for i in filtered.glob_info("*")]
+
+    unfiltered = FilesystemBackend(root_dir=str(tmp_path), virtual_mode=True, respect_ignore_files=False)
+    monkeypatch.setattr(unfiltered, "_ripgrep_search", lambda *_args: None)
+    assert "/node_modules/dep/index.py" in [m["path"] for m in unfiltered.grep_raw("needle", path="/")]
+
+
+@pytest.mark.skipif(shutil.which("rg") is None, reason="ripgrep not installed")
+def test_filesystem_python_grep_file_selection_matches_ripgrep(tmp_path: Path):
+    _repo(tmp_path)
+    be = FilesystemBackend(root_dir=str(tmp_path), virtual_mode=True)
+    rg = be._ripgrep_search("needle", tmp_path, None)
+    assert rg is not None
+    assert be._python_search("needle", tmp_path, None) == rg[0]
+
+
+def _grep_corpus(root: Path) -> None:
+    for i in range(12):
+        write_file(root / f"d{i % 3}" / f"f{i}.txt", "\n".join(f"line {j} needle{i}" if j % 4 == 0 else f"line {j}" for j in range(20)))
+    (root / "crlf.txt").write_bytes(b"needle one\r\nother\r\nneedle two\r\n")
+    (root / "feed.txt").write_bytes(b"a\x0cneedle\nneedle\x1dz\n")
+    (root / "latin1.txt").write_bytes(b"caf\xe9 needle\n")
+    (root / "binary.bin").write_bytes(b"needle\x00\x01\x02")
+
+
+def test_filesystem_python_grep_parallel_matches_serial(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    from deepagents.backends import filesystem
+
+    _grep_corpus(tmp_path)
+    serial = FilesystemBackend(root_dir=str(tmp_path), virtual_mode=True, grep_processes=1)
+    parallel = FilesystemBackend(root_dir=str(tmp_path), virtual_mode=True, grep_processes=2)
+    monkeypatch.setattr(filesystem, "_PARALLEL_GREP_MIN_FILES", 1)
+
+    expected = serial._python_search(r"needle\d*", tmp_path, None)
+    assert parallel._python_search(r"needle\d*", tmp_path, None) == expected
+    assert parallel._grep_pool is not None
+    assert expected["/crlf.txt"] == [(1, "needle one\r"), (3, "needle two\r")]
+    assert expected["/feed.txt"] == [(1, "a\x0cneedle"), (2, "needle\x1dz")]
+    assert expected["/latin1.txt"] == [(1, "caf� needle")]
+    assert "/binary.bin" not in expected
+    assert parallel._python_search("(?i)NEEDLE1", tmp_path, "f1*.txt") == serial._python_search("(?i)NEEDLE1", tmp_path, "f1*.txt")
+    parallel.close()
+    assert parallel._grep_pool is None
+
+
+def test_filesystem_python_grep_in_process_by_default(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    from deepagents.backends import filesystem
+
+    _grep_corpus(tmp_path)
+    be = FilesystemBackend(root_dir=str(tmp_path), virtual_mode=True)
+    monkeypatch.setattr(filesystem, "_PARALLEL_GREP_MIN_FILES", 1)
+
+    assert be.grep_processes == 1
+    assert "/crlf.txt" in be._python_search("needle", tmp_path, None)
+    assert be._grep_pool is None
+
+
+def test_filesystem_python_grep_broken_pool_falls_back_to_serial(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    from concurrent.futures.process import BrokenProcessPool
+
+    from deepagents.backends import filesystem
+
+    class _BrokenPool:
+        shut_down = False
+
+        def map(self, *_args: object) -> list[object]:
+            raise BrokenProcessPool
+
+        def shutdown(self, **_kwargs: object) -> None:
+            self.shut_down = True
+
+    _grep_corpus(tmp_path)
+    be = FilesystemBackend(root_dir=str(tmp_path), virtual_mode=True, grep_processes=2)
+    monkeypatch.setattr(filesystem, "_PARALLEL_GREP_MIN_FILES", 1)
+    pool = _BrokenPool()
+    be._grep_pool = pool  # type: ignore[assignment]
+
+    expected = FilesystemBackend(root_dir=str(tmp_path), virtual_mode=True)._python_search(r"needle\d*", tmp_path, None)
+    assert be._python_search(r"needle\d*", tmp_path, None) == expected
+    assert pool.shut_down
+    assert be._grep_pool is None
+
+
+@pytest.mark.skipif(shutil.which("rg") is None, reason="ripgrep not installed")
+def test_filesystem_python_grep_lines_match_ripgrep(tmp_path: Path):
+    _grep_corpus(tmp_path)
+    be = FilesystemBackend(root_dir=str(tmp_path), virtual_mode=True, grep_processes=1)
+    for pattern in (r"needle\d*", "needle$", "^line 4"):
+        rg = be._ripgrep_search(pattern, tmp_path, None)
+        assert rg is not None
+        assert be._python_search(pattern, tmp_path, None) == rg[0], pattern
@@ -1,11 +1,13 @@
 """Async tests for FilesystemBackend."""
 
+import shutil
+import threading
 from pathlib import Path
 
 import pytest
 
 from deepagents.backends.filesystem import FilesystemBackend
-from deepagents.backends.protocol import EditResult, WriteResult
+from deepagents.backends.protocol import EditResult, GrepMatchList, WriteResult
 
 
 def write_file(p: Path, content: str):
@@ -518,3 +520,74 @@ async def test_filesystem_aglob_recursive(tmp_path: Path):
     assert any("helper.py" in p for p in py_files)
     assert any("test_main.py" in p for p in py_files)
     assert not any("readme.txt" in p for p in py_files)
+
+
+async def test_filesystem_async_runs_on_dedicated_executor(tmp_path: Path):
+    write_file(tmp_path / "a.txt", "hello")
+    be = FilesystemBackend(root_dir=str(tmp_path), virtual_mode=True, max_io_workers=2)
+
+    assert "hello" in await be.aread("/a.txt")
+    executor = be._io_executor
+    assert executor is not None
+
+    files = [(f"/d/f{i}.txt", str(i).encode()) for i in range(20)]
+    responses = await be.aupload_files(files)
+    assert [r.path for r in responses] == [p for p, _ in files]
+    downloads = await be.adownload_files([p for p, _ in files])
+    assert [r.content for r in downloads] == [c for _, c in files]
+    assert be._io_executor is executor
+    be.close()
+
+    # Without a dedicated pool, async calls use the loop's default executor
+    default = FilesystemBackend(root_dir=str(tmp_path), virtual_mode=True)
+    assert "hello" in await default.aread("/a.txt")
+    assert [r.error for r in await default.aupload_files(files[:2])] == [None, None]
+    assert default._io_executor is None
+
+
+async def test_filesystem_agrep_python_fallback_respects_budget(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    write_file(tmp_path / "a.txt", "\n".join(f"hit {i}" for i in range(20)))
+    be = FilesystemBackend(root_dir=str(tmp_path), virtual_mode=True, grep_max_matches=5)
+
+    async def no_ripgrep(*_args):
+        return None
+
+    monkeypatch.setattr(be, "_aripgrep_search", no_ripgrep)
+    matches = await be.agrep_raw("hit", path="/")
+    assert isinstance(matches, GrepMatchList)
+    assert [m["line"] for m in matches] == [1, 2, 3, 4, 5]
+    assert matches.truncated
+    assert await be.agrep_raw("(", path="/") == be.grep_raw("(", path="/")
+
+
+@pytest.mark.skipif(shutil.which("rg") is None, reason="ripgrep not installed")
+async def test_filesystem_aripgrep_matches_sync(tmp_path: Path):
+    write_file(tmp_path / "a.txt", "\n".join(f"hit {i}" for i in range(100)))
+    write_file(tmp_path / "sub" / "b.py", "hit\nmiss\n")
+
+    be = FilesystemBackend(root_dir=str(tmp_path), virtual_mode=True)
+    assert await be._aripgrep_search("hit", tmp_path, None) == be._ripgrep_search("hit", tmp_path, None)
+
+    be = FilesystemBackend(root_dir=str(tmp_path), virtual_mode=True, grep_max_matches=3)
+    results = await be._aripgrep_search("hit", tmp_path / "a.txt", None)
+    assert results is not None
+    by_file, truncated = results
+    assert truncated
+    assert [ln for ln, _ in by_file["/a.txt"]] == [1, 2, 3]
+
+
+async def test_filesystem_agrep_validates_off_the_event_loop(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    write_file(tmp_path / "a.txt", "needle")
+    be = FilesystemBackend(root_dir=str(tmp_path), virtual_mode=True)
+    grep_base = be._grep_base
+    threads = []
+
+    def recording_grep_base(pattern: str, path: str | None):
+        threads.append(threading.current_thread())
+        return grep_base(pattern, path)
+
+    monkeypatch.setattr(be, "_grep_base", recording_grep_base)
+    assert [m["path"] for m in await be.agrep_raw("needle")] == ["/a.txt"]
+    assert (await be.agrep_raw("[")).startswith("Invalid regex pattern")
+    assert len(threads) == 2
+    assert threading.main_thread() not in threads
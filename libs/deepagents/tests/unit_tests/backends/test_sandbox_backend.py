@@ -0,0 +1,338 @@
+import base64
+import json
+import subprocess
+import time
+from pathlib import Path
+
+import pytest
+
+from deepagents.backends.protocol import ExecuteResponse, FileDownloadResponse, FileUploadResponse, GrepMatchList
+from deepagents.backends.sandbox import BaseSandbox, _parse_grep
+from deepagents.backends.sandbox_helper import MAX_REQUEST_CHARS, helper_request_command
+from deepagents.backends.utils import MAX_LINE_LENGTH
+
+
+class LocalSandbox(BaseSandbox):
+    """BaseSandbox running its commands with /bin/sh on this machine, recording them."""
+
+    def __init__(self, root: Path, *, use_helper: bool = False, helper_dir: Path | None = None):
+        self.root = root
+        self.use_helper = use_helper
+        if helper_dir is not None:
+            self.helper_dir = str(helper_dir)
+        self.commands: list[str] = []
+        self.uploads: list[str] = []
+
+    @property
+    def id(self) -> str:
+        return "local"
+
+    def execute(self, command: str) -> ExecuteResponse:
+        self.commands.append(command)
+        proc = subprocess.run(["/bin/sh", "-c", command], check=False, cwd=self.root, capture_output=True, text=True, timeout=60)
+        return ExecuteResponse(output=proc.stdout + proc.stderr, exit_code=proc.returncode)
+
+    def upload_files(self, files: list[tuple[str, bytes]]) -> list[FileUploadResponse]:
+        self.uploads.extend(path for path, _ in files)
+        for path, content in files:
+            (self.root / path).write_bytes(content)
+        return [FileUploadResponse(path=path, error=None) for path, _ in files]
+
+    def download_files(self, paths: list[str]) -> list[FileDownloadResponse]:
+        return [FileDownloadResponse(path=path, content=(self.root / path).read_bytes(), error=None) for path in paths]
+
+
+@pytest.fixture
+def helper_sandbox(tmp_path: Path):
+    (tmp_path / "work").mkdir()
+    sandbox = LocalSandbox(tmp_path / "work", use_helper=True, helper_dir=tmp_path / "helper")
+    yield sandbox
+    sandbox.stop_helper()
+
+
+def _exercise(sandbox: LocalSandbox, root: Path) -> list[object]:
+    abs_path = str(root / "dir" / "a.txt")
+    return [
+        sandbox.write(abs_path, "alpha\nbeta\nalpha\n").error,
+        sandbox.write(abs_path, "again").error,
+        sandbox.write("rel.txt", "relative").error,
+        sandbox.read(abs_path),
+        sandbox.read(abs_path, offset=1, limit=1),
+        sandbox.read(str(root / "missing.txt")),
+        sandbox.read("rel.txt"),
+        sandbox.edit(abs_path, "alpha", "gamma").error,
+        sandbox.edit(abs_path, "alpha", "gamma", replace_all=True).occurrences,
+        sandbox.edit(abs_path, "nope", "x").error,
+        sandbox.edit(str(root / "missing.txt"), "a", "b").error,
+        sandbox.read(abs_path),
+        sorted(i["path"] for i in sandbox.ls_info(str(root))),
+        sandbox.ls_info(str(root / "missing")),
+        [i["path"] for i in sandbox.glob_info("**/*.txt", path=str(root))],
+        sandbox.glob_info("*", path=str(root / "missing")),
+    ]
+
+
+def test_helper_matches_command_templates(tmp_path: Path, helper_sandbox: LocalSandbox):
+    (tmp_path / "plain").mkdir()
+    expected = _exercise(LocalSandbox(tmp_path / "plain"), tmp_path / "plain")
+    results = _exercise(helper_sandbox, helper_sandbox.root)
+    assert results == [str(e).replace(str(tmp_path / "plain"), str(helper_sandbox.root)) if isinstance(e, str) else e for e in expected]
+
+    # The helper was started once; every file operation after that runs no python3
+    starts = [c for c in helper_sandbox.commands if "helper.py" in c]
+    assert len(starts) == 1
+    assert not any("python3" in c for c in helper_sandbox.commands if c not in starts)
+    assert helper_sandbox._helper_ready is True
+
+
+def test_helper_sends_non_ascii_requests_unescaped(helper_sandbox: LocalSandbox):
+    # 63 KB of UTF-8, below the staging threshold; \u escapes would triple it
+    content = "漢字かな" * 5300
+    assert helper_sandbox.write("cjk.txt", content).error is None
+    assert (helper_sandbox.root / "cjk.txt").read_text(encoding="utf-8") == content
+    assert not any("python3" in c for c in helper_sandbox.commands if "helper.py" not in c)
+
+
+def test_helper_skips_requests_over_the_size_limit(helper_sandbox: LocalSandbox):
+    # Every newline and quote doubles in JSON, so this request is too large for the helper
+    content = '"\n' * 30000
+    assert helper_request_command("write", {"file_path": "big.txt", "content": content}) is None
+    assert helper_sandbox.write("big.txt", content).error is None
+    assert (helper_sandbox.root / "big.txt").read_text() == content
+    assert all(len(c) < MAX_REQUEST_CHARS + 1024 for c in helper_sandbox.commands)
+    assert (
+        helper_sandbox.batch([("write", {"file_path": "big2.txt", "content": content}), ("read", {"file_path": "big.txt", "limit": 1})])[0].error
+        is None
+    )
+    assert (helper_sandbox.root / "big2.txt").read_text() == content
+
+
+def test_helper_restarts_after_exit(helper_sandbox: LocalSandbox):
+    assert helper_sandbox.write("a.txt", "one").error is None
+    helper_sandbox.execute(f"kill $(cat {helper_sandbox.helper_dir}/pid)")
+    for _ in range(100):
+        if not Path(helper_sandbox.helper_dir, "pid").exists():
+            break
+        time.sleep(0.01)
+    helper_sandbox.commands.clear()
+    assert helper_sandbox.read("a.txt") == "     1\tone"
+    assert sum("helper.py" in c for c in helper_sandbox.commands) == 1
+    assert helper_sandbox._helper_ready is True
+
+
+def test_helper_falls_back_when_it_cannot_start(tmp_path: Path):
+    blocker = tmp_path / "not_a_dir"
+    blocker.write_text("")
+    sandbox = LocalSandbox(tmp_path, use_helper=True, helper_dir=blocker / "helper")
+    assert sandbox.write(str(tmp_path / "a.txt"), "hello").error is None
+    assert sandbox.read(str(tmp_path / "a.txt")) == "     1\thello"
+    assert sandbox._helper_ready is False
+    # Starting is attempted once, then the command templates are used directly
+    assert sum("helper.py" in c for c in sandbox.commands) == 1
+
+
+class TruncatingSandbox(LocalSandbox):
+    """LocalSandbox keeping only the first max_output characters of each output."""
+
+    max_output = 200
+
+    def execute(self, command: str) -> ExecuteResponse:
+        result = super().execute(command)
+        if len(result.output) <= self.max_output:
+            return result
+        return ExecuteResponse(output=result.output[: self.max_output], exit_code=result.exit_code, truncated=True)
+
+
+def _batch_operations() -> list[tuple[str, dict]]:
+    # Relative paths, so the results do not depend on the sandbox's directory
+    return [
+        ("write", {"file_path": "a.txt", "content": "alpha\nbeta\n"}),
+        ("write", {"file_path": "sub/b.py", "content": "x = 'alpha'\n"}),
+        ("edit", {"file_path": "a.txt", "old_string": "beta", "new_string": "gamma"}),
+        ("read", {"file_path": "a.txt"}),
+        ("read", {"file_path": "missing.txt"}),
+        ("ls_info", {"path": "sub"}),
+        ("glob_info", {"pattern": "**/*.py", "path": "."}),
+        ("grep_raw", {"pattern": "alpha"}),
+    ]
+
+
+@pytest.mark.parametrize("use_helper", [False, True])
+def test_batch_runs_operations_in_one_execute(tmp_path: Path, use_helper: bool):
+    (tmp_path / "one").mkdir()
+    (tmp_path / "batch").mkdir()
+    one = LocalSandbox(tmp_path / "one")
+    expected = [getattr(one, name)(**kwargs) for name, kwargs in _batch_operations()]
+
+    sandbox = LocalSandbox(tmp_path / "batch", use_helper=use_helper, helper_dir=tmp_path / "helper")
+    try:
+        results = sandbox.batch(_batch_operations())
+    finally:
+        sandbox.stop_helper()
+    assert len(sandbox.commands) == (3 if use_helper else 1)  # helper: start, batch, stop
+    assert results == expected
+    assert results[3] == "     1\talpha\n     2\tgamma"
+    assert results[4] == "Error: File 'missing.txt' not found"
+    assert [i["path"] for i in results[6]] == ["sub/b.py"]
+    assert sorted(m["path"] for m in results[7]) == ["./a.txt", "./sub/b.py"]
+
+
+def test_batch_reruns_operations_with_truncated_output(tmp_path: Path):
+    sandbox = TruncatingSandbox(tmp_path)
+    content = "\n".join(f"line {i}" for i in range(40))
+    results = sandbox.batch(
+        [("write", {"file_path": str(tmp_path / "a.txt"), "content": content}), ("read", {"file_path": str(tmp_path / "a.txt"), "limit": 2})]
+    )
+    assert results[0].error is None
+    assert results[1] == "     1\tline 0\n     2\tline 1"
+    assert len(sandbox.commands) == 1
+
+    # The second read's output does not fit, so it is run again on its own (and truncated there too)
+    results = sandbox.batch([("read", {"file_path": str(tmp_path / "a.txt"), "limit": 1}), ("read", {"file_path": str(tmp_path / "a.txt")})])
+    assert results[0] == "     1\tline 0"
+    assert results[1].startswith("     1\tline 0\n")
+    assert len(sandbox.commands) == 3
+
+    with pytest.raises(ValueError, match="execute"):
+        sandbox.batch([("execute", {"command": "true"})])
+
+
+class NoUploadSandbox(LocalSandbox):
+    def upload_files(self, files: list[tuple[str, bytes]]) -> list[FileUploadResponse]:
+        raise NotImplementedError
+
+
+def test_large_write_and_edit_are_staged_through_upload(tmp_path: Path):
+    sandbox = LocalSandbox(tmp_path)
+    content = "".join(f"line {i}\n" for i in range(30000))
+    assert len(content) > sandbox.large_write_threshold
+    assert sandbox.write(str(tmp_path / "big" / "a.txt"), content).error is None
+    assert (tmp_path / "big" / "a.txt").read_text() == content
+    assert sandbox.write(str(tmp_path / "big" / "a.txt"), content).error == f"Error: File '{tmp_path / 'big' / 'a.txt'}' already exists"
+    assert len(sandbox.uploads) == 2
+    assert max(len(c) for c in sandbox.commands) < 4096
+
+    old = content[: len(content) // 2]
+    result = sandbox.edit(str(tmp_path / "big" / "a.txt"), old, old.upper())
+    assert result.error is None
+    assert result.occurrences == 1
+    assert (tmp_path / "big" / "a.txt").read_text() == old.upper() + content[len(old) :]
+    assert sandbox.edit(str(tmp_path / "big" / "a.txt"), old, "x").error == f"Error: String not found in file: '{old}'"
+    assert len(sandbox.uploads) == 6
+    assert max(len(c) for c in sandbox.commands) < 4096
+    assert not list(Path("/tmp").glob(".deepagents-staged-*"))
+
+
+@pytest.mark.parametrize("compress", [True, False])
+def test_large_write_falls_back_to_chunked_commands(tmp_path: Path, compress: bool):
+    sandbox = NoUploadSandbox(tmp_path)
+    sandbox.compress_transfers = compress
+    content = "".join(f"{i * 7919 % 100003:x}\n" for i in range(60000))
+    assert sandbox.write(str(tmp_path / "a.txt"), content).error is None
+    assert (tmp_path / "a.txt").read_text() == content
+    chunks = [c for c in sandbox.commands if c.startswith("printf")]
+    assert len(chunks) > 1
+    assert max(len(c) for c in sandbox.commands) < 128 * 1024
+    # The decode command decompresses only if the content was compressed
+    assert ("if True:" in sandbox.commands[-2]) is compress
+
+
+def test_write_and_edit_size_limit(tmp_path: Path):
+    sandbox = LocalSandbox(tmp_path)
+    sandbox.max_write_size = 1000
+    assert (
+        sandbox.write(str(tmp_path / "a.txt"), "x" * 1001).error
+        == f"Error: Content of 1001 bytes exceeds the 1000 byte limit for writing '{tmp_path / 'a.txt'}'"
+    )
+    assert sandbox.write(str(tmp_path / "a.txt"), "x" * 1000).error is None
+    assert sandbox.edit(str(tmp_path / "a.txt"), "x" * 1000, "y").error.startswith("Error: Edit strings of 1001 bytes exceed")
+    assert (tmp_path / "a.txt").read_text() == "x" * 1000
+
+
+@pytest.mark.parametrize("use_helper", [False, True])
+def test_read_pages_through_cached_line_offsets(tmp_path: Path, use_helper: bool):
+    (tmp_path / "work").mkdir()
+    sandbox = LocalSandbox(tmp_path / "work", use_helper=use_helper, helper_dir=tmp_path / "helper")
+    sandbox.read_index_dir = str(tmp_path / "index")
+    lines = [f"line {i}" for i in range(4500)]
+    path = tmp_path / "work" / "log.txt"
+    path.write_text("\n".join(lines) + "\n")
+    try:
+        assert sandbox.read("log.txt", offset=3500, limit=2) == "  3501\tline 3500\n  3502\tline 3501"
+        (index_file,) = (tmp_path / "index").iterdir()
+        offsets = json.loads(index_file.read_text())["offsets"]
+        assert offsets == [len("\n".join(lines[: k * 1000])) + (1 if k else 0) for k in range(4)]
+        assert sandbox.read("log.txt", offset=4498, limit=10) == "  4499\tline 4498\n  4500\tline 4499"
+        assert len(json.loads(index_file.read_text())["offsets"]) == 5
+
+        # A changed file is not read through its stale offsets
+        path.write_text("short\n" * 3000)
+        assert sandbox.read("log.txt", offset=2999) == "  3000\tshort"
+    finally:
+        sandbox.stop_helper()
+
+
+@pytest.mark.parametrize("use_helper", [False, True])
+def test_read_truncates_long_lines(tmp_path: Path, use_helper: bool):
+    (tmp_path / "work").mkdir()
+    sandbox = LocalSandbox(tmp_path / "work", use_helper=use_helper, helper_dir=tmp_path / "helper")
+    (tmp_path / "work" / "a.txt").write_bytes(b"first\r\n" + b"x" * (MAX_LINE_LENGTH * 5) + b"\nlast")
+    try:
+        result = sandbox.read("a.txt")
+    finally:
+        sandbox.stop_helper()
+    assert result == f"     1\tfirst\n     2\t{'x' * MAX_LINE_LENGTH} ... [line truncated]\n     3\tlast"
+
+
+def test_grep_handles_colons_and_reports_caps(tmp_path: Path):
+    sandbox = LocalSandbox(tmp_path)
+    (tmp_path / "a:b.txt").write_text("x\nneedle: here\n")
+    (tmp_path / "many.log").write_text("".join(f"needle {i}\n" for i in range(50)))
+
+    matches = sandbox.grep_raw("needle:", glob="*.txt")
+    assert isinstance(matches, GrepMatchList)
+    assert list(matches) == [{"path": "./a:b.txt", "line": 2, "text": "needle: here"}]
+    assert not matches.truncated
+
+    sandbox.grep_max_matches = 10
+    matches = sandbox.grep_raw("needle", path=str(tmp_path / "many.log"))
+    assert [m["line"] for m in matches] == list(range(1, 11))
+    assert matches.truncated
+
+    sandbox.grep_max_matches = None
+    sandbox.grep_max_output_bytes = 200
+    matches = sandbox.grep_raw("needle", path=str(tmp_path / "many.log"))
+    assert matches.truncated
+    assert 0 < len(matches) < 50
+    assert all(m["text"] == f"needle {m['line'] - 1}" for m in matches)
+
+    sandbox.grep_max_output_bytes = None
+    assert len(sandbox.grep_raw("needle", path=str(tmp_path / "many.log"))) == 50
+
+
+def test_grep_parses_ripgrep_json():
+    def event(kind: str, data: dict) -> str:
+        return json.dumps({"type": kind, "data": data})
+
+    output = "\n".join(
+        [
+            "rg",
+            event("match", {"path": {"text": "./a:b.py"}, "lines": {"text": "x = 1\n"}, "line_number": 3}),
+            event(
+                "match",
+                {
+                    "path": {"bytes": base64.b64encode(b"./bin\xff").decode()},
+                    "lines": {"bytes": base64.b64encode(b"x\xfe\n").decode()},
+                    "line_number": 7,
+                },
+            ),
+            event("match", {"path": {"text": "./c.py"}, "lines": {"text": "x = 2\n"}, "line_number": 1}),
+            "",
+        ]
+    )
+    matches = _parse_grep(2, None, ExecuteResponse(output=output, exit_code=0))
+    assert list(matches) == [
+        {"path": "./a:b.py", "line": 3, "text": "x = 1"},
+        {"path": "./bin�", "line": 7, "text": "x�"},
+    ]
+    assert matches.truncated
@@ -0,0 +1,46 @@
+"""Async tests for BaseSandbox."""
+
+import asyncio
+from pathlib import Path
+
+from tests.unit_tests.backends.test_sandbox_backend import LocalSandbox
+
+
+async def test_concurrent_calls_coalesce_into_one_execute_async(tmp_path: Path):
+    sandbox = LocalSandbox(tmp_path)
+    assert sandbox.write(str(tmp_path / "a.txt"), "alpha\n").error is None
+    sandbox.commands.clear()
+
+    read, listing, globbed, grepped = await asyncio.gather(
+        sandbox.aread(str(tmp_path / "a.txt")),
+        sandbox.als_info(str(tmp_path)),
+        sandbox.aglob_info("*.txt", path=str(tmp_path)),
+        sandbox.agrep_raw("alpha", path=str(tmp_path)),
+    )
+    assert read == "     1\talpha"
+    assert [i["path"] for i in listing] == ["a.txt"]
+    assert [i["path"] for i in globbed] == ["a.txt"]
+    assert grepped == [{"path": str(tmp_path / "a.txt"), "line": 1, "text": "alpha"}]
+    assert len(sandbox.commands) == 1
+
+    # A lone call is not wrapped in a batch
+    assert await sandbox.aread(str(tmp_path / "a.txt")) == read
+    assert "__deepagents_batch_" not in sandbox.commands[-1]
+
+
+async def test_coalescing_can_be_disabled_async(tmp_path: Path):
+    sandbox = LocalSandbox(tmp_path)
+    sandbox.batch_window = None
+    await asyncio.gather(*(sandbox.aread(str(tmp_path / f"{i}.txt")) for i in range(3)))
+    assert len(sandbox.commands) == 3
+
+
+async def test_overridden_methods_are_not_coalesced_async(tmp_path: Path):
+    class CustomRead(LocalSandbox):
+        def read(self, file_path: str, offset: int = 0, limit: int = 2000) -> str:
+            return f"custom {file_path}"
+
+    sandbox = CustomRead(tmp_path)
+    results = await asyncio.gather(sandbox.aread("/a"), sandbox.aread("/b"), sandbox.als_info(str(tmp_path)))
+    assert results == ["custom /a", "custom /b", []]
+    assert len(sandbox.commands) == 1
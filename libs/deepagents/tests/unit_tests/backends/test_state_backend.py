@@ -1,8 +1,19 @@
+import gc
+import re
+import weakref
+
+import pytest
+import wcmatch.glob as wcglob
 from langchain.tools import ToolRuntime
 from langchain_core.messages import ToolMessage
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.store.memory import InMemoryStore
 
+from deepagents.backends.blobs import InMemoryBlobStore, StoreBlobStore, blob_digest
+from deepagents.backends.path_index import PathIndex, get_path_index
 from deepagents.backends.protocol import EditResult, WriteResult
 from deepagents.backends.state import StateBackend
+from deepagents.backends.utils import create_file_data, file_data_to_string, grep_file_data, grep_matches_from_files
 
 
 def make_runtime(files=None):
@@ -159,3 +170,258 @@ def test_state_backend_intercept_large_tool_result():
     assert "/large_tool_results/test_123" in result.update["files"]
     assert result.update["files"]["/large_tool_results/test_123"]["content"] == [large_content]
     assert "Tool result too large" in result.update["messages"][0].content
+
+
+@pytest.mark.parametrize("compression", [None, "zstd"])
+def test_state_backend_compact_file_data_matches_legacy(compression):
+    content = "\n".join(f"line {i}\r" if i % 7 == 0 else f"line {i}" for i in range(300)) + "\n\x0cform feed\n"
+    legacy_rt = make_runtime()
+    compact_rt = make_runtime()
+    legacy = StateBackend(legacy_rt)
+    compact = StateBackend(compact_rt, file_format="v2", compression=compression)
+    for be, rt in ((legacy, legacy_rt), (compact, compact_rt)):
+        res = be.write("/dir/big.txt", content)
+        rt.state["files"].update(res.files_update)
+
+    fd = compact_rt.state["files"]["/dir/big.txt"]
+    assert fd["version"] == 2
+    assert fd["encoding"] == (compression or "utf-8")
+    assert isinstance(fd["created_at"], int)
+    assert file_data_to_string(fd) == content
+
+    for offset, limit in [(0, 2000), (5, 10), (299, 5), (301, 1), (302, 1), (500, 3)]:
+        assert compact.read("/dir/big.txt", offset=offset, limit=limit) == legacy.read("/dir/big.txt", offset=offset, limit=limit)
+    assert compact.grep_raw("line 1\\d", "/") == legacy.grep_raw("line 1\\d", "/")
+    assert [i["size"] for i in compact.ls_info("/dir")] == [i["size"] for i in legacy.ls_info("/dir")]
+    assert [i["size"] for i in compact.glob_info("**/*.txt")] == [i["size"] for i in legacy.glob_info("**/*.txt")]
+
+    res = compact.edit("/dir/big.txt", "line 299", "last line")
+    assert res.error is None
+    assert file_data_to_string(res.files_update["/dir/big.txt"]).count("last line") == 1
+    assert res.files_update["/dir/big.txt"]["created_at"] == fd["created_at"]
+
+
+def test_state_backend_compact_reads_legacy_files():
+    legacy_fd = create_file_data("alpha\nbeta")
+    rt = make_runtime({"/old.txt": legacy_fd})
+    be = StateBackend(rt, file_format="v2")
+    res = be.write("/new.txt", "gamma")
+    rt.state["files"].update(res.files_update)
+
+    assert "beta" in be.read("/old.txt")
+    assert [i["path"] for i in be.ls_info("/")] == ["/new.txt", "/old.txt"]
+    # Mixed ISO and integer timestamps sort together, newest first
+    assert [i["path"] for i in be.glob_info("*.txt")] == ["/new.txt", "/old.txt"]
+    assert all(isinstance(i["modified_at"], str) for i in be.ls_info("/"))
+
+    # Editing a legacy file rewrites it in the backend's encoding
+    res = be.edit("/old.txt", "beta", "delta")
+    new_fd = res.files_update["/old.txt"]
+    assert new_fd["version"] == 2
+    assert file_data_to_string(new_fd) == "alpha\ndelta"
+    assert be.read("/old.txt") == StateBackend(make_runtime({"/old.txt": legacy_fd})).read("/old.txt")
+
+
+def test_state_backend_compact_checkpoint_is_smaller():
+    content = "\n".join(f"def function_{i}(x):\n    return x + {i}" for i in range(5000))
+    serde = JsonPlusSerializer()
+    sizes = {}
+    for name, kwargs in {"v1": {}, "v2": {"file_format": "v2"}, "zstd": {"file_format": "v2", "compression": "zstd"}}.items():
+        fd = StateBackend(make_runtime(), **kwargs).write("/big.py", content).files_update
+        sizes[name] = len(serde.dumps_typed(fd)[1])
+    assert sizes["v2"] < sizes["v1"]
+    assert sizes["zstd"] * 4 < sizes["v1"]
+
+
+def test_state_backend_rejects_invalid_file_format():
+    with pytest.raises(ValueError, match="requires"):
+        StateBackend(make_runtime(), compression="zstd")
+    with pytest.raises(ValueError, match="Unknown"):
+        StateBackend(make_runtime(), file_format="v3")
+
+
+@pytest.mark.parametrize("blob_store_factory", [InMemoryBlobStore, lambda: StoreBlobStore(InMemoryStore())])
+def test_state_backend_blob_store_matches_inline(blob_store_factory):
+    blobs = blob_store_factory()
+    inline_rt = make_runtime()
+    blob_rt = make_runtime()
+    inline = StateBackend(inline_rt)
+    backed = StateBackend(blob_rt, blob_store=blobs)
+    content = "\n".join(f"entry {i}" for i in range(2000))
+    for be, rt in ((inline, inline_rt), (backed, blob_rt)):
+        for path, text in (("/a/big.txt", content), ("/a/copy.txt", content), ("/b/small.md", "hello blob")):
+            rt.state["files"].update(be.write(path, text).files_update)
+
+    big = blob_rt.state["files"]["/a/big.txt"]
+    assert big["encoding"] == "blob"
+    assert big["content"] == blob_digest(content)
+    # Identical contents share one blob
+    assert blob_rt.state["files"]["/a/copy.txt"]["content"] == big["content"]
+
+    assert backed.read("/a/big.txt", offset=100, limit=20) == inline.read("/a/big.txt", offset=100, limit=20)
+    assert backed.grep_raw("entry 19\\d\\b", "/a") == inline.grep_raw("entry 19\\d\\b", "/a")
+    assert [(i["path"], i["size"]) for i in backed.ls_info("/a")] == [(i["path"], i["size"]) for i in inline.ls_info("/a")]
+    assert [i["path"] for i in backed.glob_info("**/*.md")] == [i["path"] for i in inline.glob_info("**/*.md")]
+
+    res = backed.edit("/b/small.md", "blob", "world")
+    assert res.error is None
+    edited = res.files_update["/b/small.md"]
+    assert edited["encoding"] == "blob"
+    assert blobs.get(edited["content"]) == "hello world"
+    blob_rt.state["files"].update(res.files_update)
+    assert "hello world" in backed.read("/b/small.md")
+
+    serde = JsonPlusSerializer()
+    assert len(serde.dumps_typed(blob_rt.state["files"])[1]) * 20 < len(serde.dumps_typed(inline_rt.state["files"])[1])
+
+
+def test_state_backend_blob_ref_without_content():
+    blobs = InMemoryBlobStore()
+    rt = make_runtime()
+    rt.state["files"].update(StateBackend(rt, blob_store=blobs).write("/x.txt", "needle").files_update)
+
+    # A backend without the blob store (or one missing the blob) reports an error instead of the digest
+    for be in (StateBackend(rt), StateBackend(rt, blob_store=InMemoryBlobStore())):
+        assert be.read("/x.txt").startswith("Error:")
+        assert be.edit("/x.txt", "needle", "pin").error is not None
+        assert be.grep_raw("needle") == []
+    assert [i["path"] for i in StateBackend(rt).ls_info("/")] == ["/x.txt"]
+
+    with pytest.raises(ValueError, match="blob_store"):
+        StateBackend(rt, compression="zstd", blob_store=blobs)
+
+
+def test_path_index_lists_directories_by_prefix():
+    keys = ["/a-b", "/a.txt", "/a/x", "/a/y/z", "/a0", "/b/c/d/e.txt", "/top.md"]
+    index = PathIndex(dict.fromkeys(keys, {}))
+    assert index.list_dir("/") == (["/a-b", "/a.txt", "/a0", "/top.md"], ["/a/", "/b/"])
+    assert index.list_dir("/a/") == (["/a/x"], ["/a/y/"])
+    assert index.list_dir("/missing/") == ([], [])
+    assert index.with_prefix("/a/") == ["/a/x", "/a/y/z"]
+    assert index.with_prefix("/b/c/") == ["/b/c/d/e.txt"]
+
+
+def test_path_index_cache_follows_state_changes():
+    files = {"/one.txt": create_file_data("1")}
+    index = get_path_index(files)
+    assert get_path_index(files) is index
+    assert get_path_index(dict(files)) is not index
+
+    # In-place additions (as CompositeBackend makes) rebuild the index
+    files["/two.txt"] = create_file_data("22")
+    assert get_path_index(files) is not index
+    be = StateBackend(make_runtime(files))
+    assert [i["path"] for i in be.ls_info("/")] == ["/one.txt", "/two.txt"]
+
+    # In-place edits are picked up
+    files["/two.txt"] = create_file_data("333")
+    assert [i["size"] for i in be.ls_info("/")] == [1, 3]
+
+    # A same-size change of keys also rebuilds the index
+    index = get_path_index(files)
+    del files["/one.txt"]
+    files["/three.txt"] = create_file_data("4444")
+    assert get_path_index(files) is not index
+    assert [i["path"] for i in be.ls_info("/")] == ["/three.txt", "/two.txt"]
+    assert [i["path"] for i in be.glob_info("*.txt")] == ["/three.txt", "/two.txt"]
+    assert [m["path"] for m in be.grep_raw("4")] == ["/three.txt"]
+
+    # Indexes keep no reference to the state they describe
+    class Files(dict):
+        pass
+
+    state = Files({"/x.txt": create_file_data("x")})
+    get_path_index(state)
+    ref = weakref.ref(state)
+    del state
+    gc.collect()
+    assert ref() is None
+
+
+def _brute_force_ls(files, path):
+    prefix = path if path.endswith("/") else path + "/"
+    entries = set()
+    for key in files:
+        if key.startswith(prefix):
+            rest = key[len(prefix) :]
+            entries.add(prefix + rest.split("/")[0] + "/" if "/" in rest else key)
+    return sorted(entries)
+
+
+def _brute_force_glob(files, pattern, path):
+    prefix = path.rstrip("/") + "/"
+    return sorted(p for p in files if p.startswith(prefix) and wcglob.globmatch(p[len(prefix) :], pattern, flags=wcglob.BRACE | wcglob.GLOBSTAR))
+
+
+def test_state_backend_indexed_listing_matches_brute_force():
+    files = {}
+    for i in range(300):
+        path = f"/pkg{i % 7}/mod{i % 5}/file{i}.py" if i % 3 else f"/pkg{i % 7}/file{i}.txt"
+        files[path] = create_file_data(f"value = {i}\n")
+    files["/large_tool_results/call_1"] = create_file_data("x" * 100)
+    be = StateBackend(make_runtime(files))
+
+    for path in ["/", "/pkg3", "/pkg3/", "/pkg3/mod2/", "/large_tool_results/", "/nope/"]:
+        assert [i["path"] for i in be.ls_info(path)] == _brute_force_ls(files, path)
+    for pattern, path in [("**/*.py", "/"), ("pkg2/mod1/*.py", "/"), ("mod4/file1*.py", "/pkg1"), ("*.txt", "/pkg0"), ("pkg{1,2}/*.txt", "/")]:
+        expected = _brute_force_glob(files, pattern, path)
+        assert sorted(i["path"] for i in be.glob_info(pattern, path)) == expected
+    matches = be.grep_raw("value = 1\\d$", "/pkg3")
+    assert {m["path"] for m in matches} == {p for p in files if p.startswith("/pkg3/") and re.search(r"value = 1\d$", files[p]["content"][0])}
+
+
+GREP_PARITY_PATTERNS = [
+    "foo",
+    "^foo",
+    "bar$",
+    r"\bfoo\b",
+    "o+",
+    "x*",
+    "^$",
+    r"foo\s+bar",
+    r"[^a]+b",
+    "(?s)o.b",
+    "(?i)FOO",
+    r"(?m)^\w+$",
+    r"\Afoo",
+    r"bar\Z",
+    r"\b",
+    r"\B",
+    r"(?<=o)b",
+    "foo(?=\n)",
+    r"\d{2,}",
+    r"(a|b)\1",
+    r"[\r]$",
+    "o\nb",
+]
+GREP_PARITY_CONTENTS = [
+    "foo bar\nbaz foo\n\nfoo\nbar",
+    "foo\n",
+    "\n\nfoo\n\n",
+    "",
+    "foobar\r\nbar\r\nxx 42 aa bb\n",
+    "no match here",
+    "ab\n\nab\n",
+    "a" * 50 + "b\nfoo  bar foo\tbar\n",
+]
+
+
+@pytest.mark.parametrize("pattern", GREP_PARITY_PATTERNS)
+def test_grep_buffer_engine_matches_per_line_search(pattern):
+    regex = re.compile(pattern)
+    for content in GREP_PARITY_CONTENTS:
+        expected = [(i, line) for i, line in enumerate(content.split("\n"), 1) if regex.search(line)]
+        for file_format in ("v1", "v2"):
+            fd = create_file_data(content, file_format=file_format)
+            assert grep_file_data(fd, pattern) == expected, (pattern, content, file_format)
+    # Legacy lines holding embedded newlines are still searched one by one
+    lines = ["foo\nbar", "baz"]
+    assert grep_file_data({"content": lines}, pattern) == [(i, line) for i, line in enumerate(lines, 1) if regex.search(line)]
+
+
+def test_grep_non_boundary_does_not_match_empty_lines():
+    # \B never matches an empty line on its own, but does between two newlines of a buffer
+    files = {"/a.txt": create_file_data("ab\n\nab\n")}
+    matches = grep_matches_from_files(files, r"\B")
+    assert isinstance(matches, list)
+    assert [m["line"] for m in matches] == [1, 3]
@@ -1,8 +1,11 @@
+import pytest
 from langchain.tools import ToolRuntime
 from langgraph.store.memory import InMemoryStore
 
+from deepagents.backends.grep_index import rebuild_store_grep_index, required_trigrams
 from deepagents.backends.protocol import EditResult, WriteResult
 from deepagents.backends.store import StoreBackend
+from deepagents.backends.utils import create_file_data
 
 
 def make_runtime():
@@ -133,3 +136,280 @@ def test_store_backend_intercept_large_tool_result():
     stored_content = rt.store.get(("filesystem",), "/large_tool_results/test_456")
     assert stored_content is not None
     assert stored_content.value["content"] == [large_content]
+
+
+def test_store_backend_upload_download_batched():
+    calls = []
+
+    class CountingStore(InMemoryStore):
+        def batch(self, ops):
+            ops = list(ops)
+            calls.append(len(ops))
+            return super().batch(ops)
+
+    rt = make_runtime()
+    rt.store = CountingStore()
+    be = StoreBackend(rt)
+
+    files = [(f"/f{i}.txt", f"line {i}\nnext".encode()) for i in range(25)]
+    responses = be.upload_files(files)
+    assert [r.path for r in responses] == [p for p, _ in files]
+    assert all(r.error is None for r in responses)
+
+    paths = ["/missing.txt", *(p for p, _ in files)]
+    downloads = be.download_files(paths)
+    assert [r.path for r in downloads] == paths
+    assert downloads[0].error == "file_not_found"
+    assert [r.content for r in downloads[1:]] == [c for _, c in files]
+    assert calls == [25, 26]
+
+
+@pytest.mark.parametrize("compression", [None, "zstd"])
+def test_store_backend_compact_file_data(compression):
+    rt = make_runtime()
+    legacy = StoreBackend(rt)
+    compact = StoreBackend(rt, file_format="v2", compression=compression)
+    content = "\n".join(f"row {i}" for i in range(500))
+
+    legacy.write("/old.txt", content)
+    compact.write("/new.txt", content)
+    value = rt.store.get(("filesystem",), "/new.txt").value
+    assert value["version"] == 2
+    # Store values must stay JSON-serializable
+    assert isinstance(value["content"], str)
+    assert value["encoding"] == (compression or "utf-8")
+
+    assert compact.read("/new.txt", offset=10, limit=5) == legacy.read("/old.txt", offset=10, limit=5)
+    assert compact.read("/old.txt") == legacy.read("/new.txt")
+    sizes = {i["path"]: i["size"] for i in compact.ls_info("/")}
+    assert sizes["/old.txt"] == sizes["/new.txt"] == len(content)
+    assert {m["path"] for m in legacy.grep_raw("row 42\\b")} == {"/old.txt", "/new.txt"}
+    assert compact.download_files(["/new.txt"])[0].content == content.encode("utf-8")
+
+    res = compact.edit("/old.txt", "row 7\n", "row seven\n")
+    assert res.error is None
+    assert rt.store.get(("filesystem",), "/old.txt").value["version"] == 2
+    assert "row seven" in legacy.read("/old.txt")
+
+
+class RecordingStore(InMemoryStore):
+    """InMemoryStore that records the namespaces searched, the items returned and the gets."""
+
+    def __init__(self):
+        super().__init__()
+        self.searches = []
+        self.items_returned = 0
+        self.gets = 0
+
+    def batch(self, ops):
+        results = super().batch(ops)
+        for op, result in zip(ops, results, strict=True):
+            if type(op).__name__ == "SearchOp":
+                self.searches.append(op.namespace_prefix)
+                self.items_returned += len(result)
+            elif type(op).__name__ == "GetOp":
+                self.gets += 1
+        return results
+
+
+def _store_runtime(store):
+    return ToolRuntime(state={"messages": []}, context=None, tool_call_id="t", store=store, stream_writer=lambda _: None, config={})
+
+
+def test_store_backend_metadata_index_matches_full_scan():
+    store = RecordingStore()
+    plain = StoreBackend(_store_runtime(store))
+    indexed = StoreBackend(_store_runtime(store), metadata_index=True)
+    for i in range(60):
+        indexed.write(f"/notes/day{i % 6}/entry{i}.md", f"note {i}\nkeyword {i % 4}")
+    indexed.write("/v1.2/release.notes.txt", "dotted\nkeyword 1")
+    indexed.write("/top.txt", "keyword 3")
+    indexed.edit("/top.txt", "keyword 3", "keyword 1")
+    indexed.upload_files([("/uploads/a.bin.txt", b"keyword 1")])
+
+    for path in ["/", "/notes", "/notes/day3/", "/v1.2/", "/missing/"]:
+        assert indexed.ls_info(path) == plain.ls_info(path)
+    for pattern, path in [("**/*.md", "/"), ("day2/*.md", "/notes"), ("v1.2/*.txt", "/"), ("*.txt", "/")]:
+        assert sorted(i["path"] for i in indexed.glob_info(pattern, path)) == sorted(i["path"] for i in plain.glob_info(pattern, path))
+    for pattern, path, glob in [("keyword 1", "/", None), ("keyword 1", "/notes/day1", None), ("keyword", "/", "*.txt"), ("(", "/", None)]:
+        expected = plain.grep_raw(pattern, path, glob)
+        actual = indexed.grep_raw(pattern, path, glob)
+        if isinstance(expected, str):
+            assert actual == expected
+        else:
+            assert sorted((m["path"], m["line"], m["text"]) for m in actual) == sorted((m["path"], m["line"], m["text"]) for m in expected)
+
+    # Listings only touch the metadata namespace under the requested directory
+    store.searches.clear()
+    store.items_returned = 0
+    indexed.ls_info("/notes/day3/")
+    assert store.searches == [("filesystem_meta", "notes", "day3")]
+    assert store.items_returned == 10
+
+
+def test_store_backend_build_metadata_index_for_existing_files():
+    store = InMemoryStore()
+    StoreBackend(_store_runtime(store)).write("/old/a.txt", "before the index")
+    indexed = StoreBackend(_store_runtime(store), metadata_index=True)
+    assert indexed.ls_info("/old/") == []
+    assert indexed.build_metadata_index() == 1
+    assert [(i["path"], i["size"]) for i in indexed.ls_info("/old/")] == [("/old/a.txt", len("before the index"))]
+
+
+def test_store_backend_pagination_grows_page_size():
+    store = RecordingStore()
+    be = StoreBackend(_store_runtime(store))
+    be.upload_files([(f"/f{i}.txt", b"x") for i in range(1000)])
+    store.searches.clear()
+    assert len(be.ls_info("/")) == 1000
+    # 100 + 200 + 400 + 800 covers 1000 items in four requests instead of ten
+    assert len(store.searches) == 4
+
+
+def test_store_backend_read_through_cache():
+    store = RecordingStore()
+    be = StoreBackend(_store_runtime(store), cache_size=128)
+    be.write("/memories/notes.md", "remember this")
+    store.gets = 0
+    for _ in range(3):
+        assert "remember this" in be.read("/memories/notes.md")
+    assert be.edit("/memories/notes.md", "this", "that").error is None
+    assert "remember that" in be.read("/memories/notes.md")
+    assert store.gets == 0
+    # The write's existence check was the only miss
+    assert (be.cache_hits, be.cache_misses) == (5, 1)
+
+    # Backends created later on the same store share the cache and see each other's writes
+    other = StoreBackend(_store_runtime(store), file_format="v2", cache_size=128)
+    assert "remember that" in other.read("/memories/notes.md")
+    assert other.edit("/memories/notes.md", "that", "everything").error is None
+    assert "remember everything" in be.read("/memories/notes.md")
+    assert other.write("/memories/notes.md", "x").error is not None
+    assert store.gets == 0
+
+    # A miss goes to the store once, then the file is cached
+    store.put(("filesystem",), "/outside.md", create_file_data("v1"))
+    assert "v1" in be.read("/outside.md")
+    assert "v1" in be.read("/outside.md")
+    assert store.gets == 1
+
+    # Outside writes are picked up when a scan returns a newer updated_at
+    store.put(("filesystem",), "/outside.md", create_file_data("v2"))
+    assert [m["path"] for m in be.grep_raw("v2")] == ["/outside.md"]
+    assert "v2" in be.read("/outside.md")
+
+
+def test_store_backend_cache_disabled_and_bounded():
+    store = RecordingStore()
+    # The cache is off by default
+    uncached = StoreBackend(_store_runtime(store))
+    uncached.write("/a.txt", "a")
+    uncached.read("/a.txt")
+    uncached.read("/a.txt")
+    assert store.gets == 3
+    assert (uncached.cache_hits, uncached.cache_misses) == (0, 0)
+
+    small = StoreBackend(_store_runtime(InMemoryStore()), cache_size=2)
+    for name in "abc":
+        small.write(f"/{name}.txt", name)
+    small.read("/a.txt")
+    small.read("/c.txt")
+    # Three existence checks on write, then /a.txt was evicted and /c.txt was not
+    assert (small.cache_hits, small.cache_misses) == (1, 4)
+
+
+def test_store_backend_failed_upload_leaves_cache_untouched():
+    store = InMemoryStore()
+    be = StoreBackend(_store_runtime(store), cache_size=16)
+    be.write("/a.txt", "old")
+    with pytest.raises(UnicodeDecodeError):
+        be.upload_files([("/a.txt", b"new"), ("/b.txt", b"\xff")])
+    assert "old" in be.read("/a.txt")
+    assert be.read("/b.txt").startswith("Error")
+
+    be.upload_files([("/a.txt", b"new")])
+    store.put(("filesystem",), "/a.txt", create_file_data("outside"))
+    # Served from the cache filled after the successful batch
+    assert "new" in be.read("/a.txt")
+
+
+@pytest.mark.parametrize(
+    ("pattern", "expected"),
+    [
+        ("needle_\\w+", ["nee", "dle", "eed", "le_", "edl"]),
+        ("(?i)KiloByte", ["lob", "yte", "oby", "byt"]),
+        ("x{2}yyy", ["yyy"]),
+        ("(abc)+d", ["abc"]),
+        ("abc|def", None),
+        ("a.c", None),
+        ("(?:abc)?", None),
+        ("(", None),
+    ],
+)
+def test_required_trigrams(pattern, expected):
+    assert required_trigrams(pattern) == expected
+
+
+def _grep_key(matches):
+    return matches if isinstance(matches, str) else sorted((m["path"], m["line"], m["text"]) for m in matches)
+
+
+def test_store_backend_grep_index_matches_full_scan():
+    store = RecordingStore()
+    plain = StoreBackend(_store_runtime(store), cache_size=0)
+    indexed = StoreBackend(_store_runtime(store), grep_index=True, cache_size=0)
+    for i in range(40):
+        indexed.write(f"/mem/topic{i % 4}/note{i}.md", f"Note {i}\nTODO: follow up on item_{i}\nKelvin {i % 3}")
+    indexed.write("/mem/Å.txt", "Ångström unit\nTODO later")
+    indexed.edit("/mem/topic1/note1.md", "TODO: follow up", "DONE")
+    indexed.upload_files([("/mem/up.txt", b"uploaded item_99"), ("/mem/topic1/note5.md", b"rewritten")])
+
+    cases = [
+        ("item_1\\b", "/", None),
+        ("follow up", "/mem/topic1", None),
+        ("(?i)todo", "/", "*.txt"),
+        ("(?i)kelvin 2", "/", None),
+        ("Ångström", "/", None),
+        ("item_\\d+", "/", None),
+        ("^Note 3$", "/", None),
+        ("nowhere to be found", "/", None),
+        ("(", "/", None),
+    ]
+    for pattern, path, glob in cases:
+        assert _grep_key(indexed.grep_raw(pattern, path, glob)) == _grep_key(plain.grep_raw(pattern, path, glob)), pattern
+    assert [m["path"] for m in indexed.grep_raw("follow up", "/mem/topic1")] == [
+        "/mem/topic1/note13.md",
+        "/mem/topic1/note17.md",
+        "/mem/topic1/note21.md",
+        "/mem/topic1/note25.md",
+        "/mem/topic1/note29.md",
+        "/mem/topic1/note33.md",
+        "/mem/topic1/note37.md",
+        "/mem/topic1/note9.md",
+    ]
+
+    # Only candidates are fetched; the files namespace is never scanned
+    store.searches.clear()
+    store.gets = 0
+    assert [m["path"] for m in indexed.grep_raw("item_17\\b")] == ["/mem/topic1/note17.md"]
+    assert ("filesystem",) not in store.searches
+    assert store.gets == 1
+
+
+def test_rebuild_store_grep_index():
+    store = InMemoryStore()
+    plain = StoreBackend(_store_runtime(store))
+    plain.write("/a.txt", "alpha bravo")
+    plain.write("/b.txt", "charlie delta")
+    indexed = StoreBackend(_store_runtime(store), grep_index=True)
+    assert indexed.grep_raw("bravo") == []
+
+    assert indexed.build_grep_index() == 2
+    assert [m["path"] for m in indexed.grep_raw("bravo")] == ["/a.txt"]
+
+    # Files removed behind the backend's back are dropped from the index
+    store.delete(("filesystem",), "/a.txt")
+    store.put(("filesystem",), "/c.txt", create_file_data("bravo again"))
+    assert rebuild_store_grep_index(store) == 2
+    assert [m["path"] for m in indexed.grep_raw("bravo")] == ["/c.txt"]
+    assert [item.key for item in store.search(("filesystem_grep", "t", b"bra".hex()))] == ["/c.txt"]
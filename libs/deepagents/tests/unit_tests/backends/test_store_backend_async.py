@@ -1,5 +1,6 @@
 """Async tests for StoreBackend."""
 
+import pytest
 from langchain.tools import ToolRuntime
 from langgraph.store.memory import InMemoryStore
 
@@ -294,3 +295,87 @@ async def test_store_backend_intercept_large_tool_result_async():
     stored_content = rt.store.get(("filesystem",), "/large_tool_results/test_456")
     assert stored_content is not None
     assert stored_content.value["content"] == [large_content]
+
+
+def _store_runtime(store):
+    return ToolRuntime(state={"messages": []}, context=None, tool_call_id="t", store=store, stream_writer=lambda _: None, config={})
+
+
+class AsyncOnlyStore(InMemoryStore):
+    """InMemoryStore recording async searches, whose sync API can be switched off to catch blocking calls."""
+
+    def __init__(self):
+        super().__init__()
+        self.searches = []
+        self.sync_allowed = True
+
+    def batch(self, ops):
+        assert self.sync_allowed, "sync store call from an async backend method"
+        return super().batch(ops)
+
+    async def abatch(self, ops):
+        ops = list(ops)
+        results = await super().abatch(ops)
+        for op, result in zip(ops, results, strict=True):
+            if type(op).__name__ == "SearchOp":
+                self.searches.append(op.namespace_prefix)
+        return results
+
+
+@pytest.mark.parametrize("metadata_index", [False, True])
+async def test_store_backend_async_methods_use_native_async_api(metadata_index):
+    store = AsyncOnlyStore()
+    be = StoreBackend(_store_runtime(store), metadata_index=metadata_index)
+    store.sync_allowed = False
+    for i in range(30):
+        assert (await be.awrite(f"/src/pkg{i % 3}/mod{i}.py", f"value = {i}\nother")).error is None
+    assert (await be.awrite("/src/pkg0/mod0.py", "again")).error is not None
+    await be.aupload_files([("/README.md", b"value = readme")])
+    res = await be.aedit("/src/pkg1/mod1.py", "value = 1", "value = one")
+    assert res.error is None and res.occurrences == 1
+    assert (await be.aedit("/missing.py", "a", "b")).error == "Error: File '/missing.py' not found"
+
+    ls_root = await be.als_info("/")
+    ls_pkg = await be.als_info("/src/pkg1/")
+    globbed = await be.aglob_info("**/*.py", "/src")
+    grepped = await be.agrep_raw("value = (one|2)\\b", "/src")
+    read = await be.aread("/src/pkg1/mod1.py")
+    downloaded = await be.adownload_files(["/README.md", "/nope"])
+    invalid = await be.agrep_raw("(")
+
+    store.sync_allowed = True
+    assert ls_root == be.ls_info("/")
+    assert ls_pkg == be.ls_info("/src/pkg1/")
+    assert globbed == be.glob_info("**/*.py", "/src")
+    assert sorted((m["path"], m["line"]) for m in grepped) == [("/src/pkg1/mod1.py", 1), ("/src/pkg2/mod2.py", 1)]
+    assert "value = one" in read
+    assert [r.content for r in downloaded] == [b"value = readme", None]
+    assert invalid == be.grep_raw("(")
+    assert isinstance(invalid, str)
+
+
+async def test_store_backend_async_pagination_prefetches_pages():
+    store = AsyncOnlyStore()
+    be = StoreBackend(_store_runtime(store))
+    be.upload_files([(f"/f{i:04d}.txt", b"x") for i in range(1000)])
+    store.searches.clear()
+    store.sync_allowed = False
+    infos = await be.als_info("/")
+    assert [i["path"] for i in infos] == [f"/f{i:04d}.txt" for i in range(1000)]
+    # One first page of 100, then 200 + 400 + 800 + 1600 requested together
+    assert len(store.searches) == 5
+
+
+async def test_store_backend_agrep_uses_grep_index():
+    store = AsyncOnlyStore()
+    be = StoreBackend(_store_runtime(store), grep_index=True)
+    store.sync_allowed = False
+    for i in range(20):
+        await be.awrite(f"/notes/n{i}.md", f"entry {i}\nmarker_{i % 5}")
+    await be.aedit("/notes/n3.md", "marker_3", "gone")
+    await be.aupload_files([("/notes/extra.md", b"marker_3 uploaded")])
+    store.searches.clear()
+    matches = await be.agrep_raw("marker_3")
+    assert sorted(m["path"] for m in matches) == ["/notes/extra.md", "/notes/n13.md", "/notes/n18.md", "/notes/n8.md"]
+    assert ("filesystem",) not in store.searches
+    assert await be.agrep_raw("marker_\\d", glob="n1*.md") != []
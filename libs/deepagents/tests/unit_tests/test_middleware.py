@@ -619,6 +619,26 @@ class TestFilesystemMiddleware:
         )
         assert "Invalid regex pattern" in result
 
+    def test_glob_and_grep_report_unavailable_routes(self):
+        class BrokenBackend(StateBackend):
+            def grep_raw(self, pattern, path=None, glob=None):
+                raise RuntimeError("down")
+
+            def glob_info(self, pattern, path="/"):
+                raise RuntimeError("down")
+
+        state = FilesystemState(
+            messages=[], files={"/test.py": FileData(content=["print('hello')"], modified_at="2021-01-01", created_at="2021-01-01")}
+        )
+        middleware = FilesystemMiddleware(backend=lambda rt: CompositeBackend(default=StateBackend(rt), routes={"/broken/": BrokenBackend(rt)}))
+        runtime = ToolRuntime(state=state, context=None, tool_call_id="", store=None, stream_writer=lambda _: None, config={})
+        tools = {tool.name: tool for tool in middleware.tools}
+
+        note = "... [results incomplete, these locations could not be searched: /broken/]"
+        assert tools["glob"].invoke({"pattern": "*.py", "runtime": runtime}) == str(["/test.py", note])
+        assert tools["grep"].invoke({"pattern": "hello", "runtime": runtime}) == "/test.py\n" + note
+        assert tools["grep"].invoke({"pattern": "missing", "runtime": runtime}) == "No matches found\n" + note
+
     def test_search_store_paginated_empty(self):
         """Test pagination with no items."""
         store = InMemoryStore()